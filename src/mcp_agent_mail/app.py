@@ -4,17 +4,18 @@
 from __future__ import annotations
 
 import asyncio
+import base64
 import contextlib
-import fnmatch
 import functools
 import hashlib
+import heapq
 import inspect
 import json
 import logging
 import re
 import time
 from collections import defaultdict, deque
-from collections.abc import AsyncIterator, Sequence
+from collections.abc import AsyncIterator, Iterator, Sequence
 from contextlib import asynccontextmanager, suppress
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
@@ -24,22 +25,35 @@ from pathlib import Path
 from typing import Any, AsyncContextManager, Callable, Optional, cast
 from urllib.parse import parse_qsl
 import uuid
+import weakref
 
 from fastmcp import Context, FastMCP
 from git import Repo
 from git.exc import InvalidGitRepositoryError, NoSuchPathError
-from sqlalchemy import asc as _sa_asc, bindparam, desc as _sa_desc, func, or_ as _sa_or, select as _sa_select, text, update as _sa_update
+from sqlalchemy import and_ as _sa_and, asc as _sa_asc, bindparam, desc as _sa_desc, func, or_ as _sa_or, select as _sa_select, text, update as _sa_update
 from sqlalchemy.exc import IntegrityError, NoResultFound, OperationalError
-from sqlalchemy.orm import aliased
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, defer
 
 from . import rich_logger
 from .config import Settings, get_settings
 from .db import (
+    archive_queue_stats,
     ensure_schema,
+    fts_project_query,
     get_engine,
+    get_inbox_at,
+    get_message_archive_ref,
+    get_query_profiler,
     get_query_tracker,
+    get_read_engine,
     get_session,
     init_engine,
+    message_preview,
+    query_cold_tier,
+    record_message_archive_refs,
+    run_write,
+    shutdown_group_writer,
     start_query_tracking,
     stop_query_tracking,
 )
@@ -48,7 +62,11 @@ from .llm import complete_system_user
 from .models import (
     Agent,
     AgentLink,
+    ArchiveJob,
     FileReservation,
+    FileReservationVersion,
+    InboxEntry,
+    MailboxCounter,
     Message,
     MessageRecipient,
     Project,
@@ -58,13 +76,18 @@ from .models import (
 )
 from .storage import (
     ProjectArchive,
+    archive_maintenance_stats,
+    archive_object_cache_stats,
     archive_write_lock,
     clear_repo_cache,
     collect_lock_status,
+    deferred_archive_commits,
     emit_notification_signal,
     ensure_archive,
+    get_archive_path_commit_sha,
     heal_archive_locks,
     process_attachments,
+    run_archive_maintenance,
     write_agent_profile,
     write_file_reservation_records,
     write_message_bundle,
@@ -104,6 +127,10 @@ def or_(*clauses: Any) -> Any:
     return _sa_or(*clauses)
 
 
+def and_(*clauses: Any) -> Any:
+    return _sa_and(*clauses)
+
+
 def asc(value: Any) -> Any:
     return _sa_asc(value)
 
@@ -689,11 +716,29 @@ def _lifespan_factory(settings: Settings) -> Callable[[FastMCP], AsyncContextMan
                 },
             )
         await ensure_schema(settings)
+        if settings.storage.archive_outbox_enabled:
+            # Replay archive writes left behind by a previous run
+            _kick_archive_outbox()
+        if settings.storage.maintenance_enabled:
+            _start_archive_maintenance(settings)
+        _start_file_reservation_sweeper(settings)
         try:
             yield
         finally:
             cancelled: BaseException | None = None
             dispose_task: asyncio.Task[None] | None = None
+            with suppress(Exception):
+                await _shutdown_archive_outbox()
+            with suppress(Exception):
+                await _shutdown_archive_maintenance()
+            with suppress(Exception):
+                await _shutdown_file_reservation_sweeper()
+            with suppress(Exception):
+                await shutdown_group_writer()
+            with suppress(Exception):
+                read_engine = get_read_engine()
+                if read_engine is not None:
+                    await asyncio.shield(read_engine.dispose())
             with suppress(Exception):
                 engine = get_engine()
                 dispose_task = asyncio.create_task(engine.dispose())
@@ -1004,6 +1049,67 @@ def _validate_iso_timestamp(raw_value: Optional[str], param_name: str = "timesta
         ) from None
 
 
+def _encode_cursor(kind: str, key: Sequence[Any]) -> str:
+    """Return an opaque, URL-safe keyset cursor for the last row of a page.
+
+    The token is base64url(JSON) of ``{"k": kind, "v": key}``; `kind` guards
+    against replaying e.g. a search cursor into an inbox listing.
+    """
+    raw = json.dumps({"k": kind, "v": list(key)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(token: str, kind: str) -> list[Any]:
+    """Decode a cursor produced by `_encode_cursor`, raising INVALID_CURSOR on mismatch."""
+    try:
+        padded = token.strip() + "=" * (-len(token.strip()) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+        if not isinstance(payload, dict) or payload.get("k") != kind or not isinstance(payload.get("v"), list):
+            raise ValueError(kind)
+        return list(payload["v"])
+    except Exception:
+        raise ToolExecutionError(
+            error_type="INVALID_CURSOR",
+            message=(
+                f"Invalid cursor '{token}'. Pass the `next_cursor` value returned by the previous page unchanged, "
+                f"or omit `cursor` to start from the newest results."
+            ),
+            recoverable=True,
+            data={"provided": token, "expected_kind": kind},
+        ) from None
+
+
+def _encode_ts_cursor(item: dict[str, Any]) -> str:
+    """Cursor on (created_ts, id) taken from a serialized message payload."""
+    return _encode_cursor("ts", [item["created_ts"], item["id"]])
+
+
+def _decode_ts_cursor(token: str) -> tuple[datetime, int]:
+    """Decode a (created_ts, id) cursor into a naive-UTC timestamp and message id."""
+    values = _decode_cursor(token, "ts")
+    parsed = _parse_iso(str(values[0])) if len(values) == 2 else None
+    if parsed is None or not isinstance(values[1], int):
+        raise ToolExecutionError(
+            error_type="INVALID_CURSOR",
+            message=f"Invalid cursor '{token}': malformed (created_ts, id) key.",
+            recoverable=True,
+            data={"provided": token, "expected_kind": "ts"},
+        )
+    return _naive_utc(parsed), int(values[1])
+
+
+def _keyset_before(ts_column: Any, id_column: Any, key: tuple[datetime, int]) -> Any:
+    """Row-value predicate ``(ts, id) < key`` for newest-first keyset pages."""
+    ts, ident = key
+    return or_(ts_column < ts, and_(ts_column == ts, id_column < ident))
+
+
+def _keyset_after(ts_column: Any, id_column: Any, key: tuple[datetime, int]) -> Any:
+    """Row-value predicate ``(ts, id) > key`` for oldest-first keyset pages."""
+    ts, ident = key
+    return or_(ts_column > ts, and_(ts_column == ts, id_column > ident))
+
+
 def _validate_program_model(program: str, model: str) -> None:
     """Validate that program and model are non-empty strings.
 
@@ -1189,6 +1295,30 @@ def _agent_to_dict(agent: Agent) -> dict[str, Any]:
     }
 
 
+def _defer_body(stmt: Any) -> Any:
+    """Leave messages.body_md unloaded for metadata listings; payloads carry the stored preview."""
+    return stmt.options(defer(cast(Any, Message.body_md)))
+
+
+def _cold_row_to_message(row: dict[str, Any]) -> Message:
+    """Rebuild a Message from a cold-tier row (raw sqlite3 values)."""
+    attachments = row.get("attachments") or "[]"
+    return Message(
+        id=row["id"],
+        project_id=row["project_id"],
+        sender_id=row["sender_id"],
+        thread_id=row.get("thread_id"),
+        subject=row["subject"],
+        body_md=row.get("body_md") or "",
+        preview=row.get("preview") or "",
+        body_len=int(row.get("body_len") or 0),
+        importance=row.get("importance") or "normal",
+        ack_required=bool(row.get("ack_required")),
+        created_ts=datetime.fromisoformat(str(row["created_ts"])),
+        attachments=json.loads(attachments) if isinstance(attachments, str) else attachments,
+    )
+
+
 def _message_to_dict(message: Message, include_body: bool = True) -> dict[str, Any]:
     data = {
         "id": message.id,
@@ -1203,6 +1333,9 @@ def _message_to_dict(message: Message, include_body: bool = True) -> dict[str, A
     }
     if include_body:
         data["body_md"] = message.body_md
+    else:
+        data["preview"] = message.preview
+        data["body_len"] = message.body_len
     return data
 
 
@@ -1966,7 +2099,8 @@ def _canonical_project_pair(a_id: int, b_id: int) -> tuple[int, int]:
 @asynccontextmanager
 async def _archive_write_lock(archive: ProjectArchive, *, timeout_seconds: float = 60.0) -> AsyncIterator[None]:
     try:
-        async with archive_write_lock(archive, timeout_seconds=timeout_seconds):
+        # Coalesced archive commits are awaited after the lock is released (see deferred_archive_commits)
+        async with deferred_archive_commits(), archive_write_lock(archive, timeout_seconds=timeout_seconds):
             yield
     except TimeoutError as exc:
         raise ToolExecutionError(
@@ -2722,18 +2856,30 @@ async def _create_message(
     ack_required: bool,
     thread_id: Optional[str],
     attachments: Sequence[dict[str, Any]],
+    *,
+    archive_job: Callable[[Message], dict[str, Any]] | None = None,
 ) -> Message:
+    """Insert a message and its recipient rows in one transaction.
+
+    With ``archive_job`` the transaction also records an ``archive_jobs`` row whose
+    payload is built from the flushed message, for the archive outbox to replay.
+    """
     if project.id is None:
         raise ValueError("Project must have an id before creating messages.")
     if sender.id is None:
         raise ValueError("Sender must have an id before sending messages.")
     await ensure_schema()
-    async with get_session() as session:
+    sender_id = sender.id
+    last_active = _naive_utc()
+
+    async def _insert(session: AsyncSession) -> Message:
         message = Message(
             project_id=project.id,
-            sender_id=sender.id,
+            sender_id=sender_id,
             subject=subject,
             body_md=body_md,
+            preview=message_preview(body_md),
+            body_len=len(body_md),
             importance=importance,
             ack_required=ack_required,
             thread_id=thread_id,
@@ -2744,13 +2890,210 @@ async def _create_message(
         for recipient, kind in recipients:
             entry = MessageRecipient(message_id=message.id, agent_id=recipient.id, kind=kind)
             session.add(entry)
-        sender.last_active_ts = _naive_utc()
-        session.add(sender)
-        await session.commit()
-        await session.refresh(message)
+        # Touch the sender via UPDATE so concurrent writes batched into one session
+        # never try to attach two instances of the same Agent row.
+        await session.execute(
+            update(Agent).where(cast(Any, Agent.id == sender_id)).values(last_active_ts=last_active)
+        )
+        if archive_job is not None:
+            session.add(ArchiveJob(project_id=project.id, message_id=message.id, payload=archive_job(message)))
+        await session.flush()
+        return message
+
+    message = await run_write(_insert)
+    sender.last_active_ts = last_active
     return message
 
 
+_ARCHIVE_OUTBOX_BATCH = 64
+_ARCHIVE_OUTBOX_RETRY_SECONDS = 5.0
+
+
+async def drain_archive_outbox(*, limit: int = _ARCHIVE_OUTBOX_BATCH) -> int:
+    """Write and commit up to ``limit`` pending archive jobs; return how many completed.
+
+    Jobs are grouped per project and written under that project's archive lock, so
+    with STORAGE_COMMIT_MODE=coalesce each group lands in a single commit. A group
+    that fails keeps its rows (``attempts``/``last_error`` bumped) and is retried
+    after jobs that have not failed yet; rewriting a message is idempotent.
+    """
+    await ensure_schema()
+    async with get_session() as session:
+        rows = (
+            await session.execute(
+                select(ArchiveJob, Project.slug)
+                .join(Project, cast(Any, Project.id) == ArchiveJob.project_id)
+                .order_by(cast(Any, ArchiveJob.attempts), cast(Any, ArchiveJob.id))
+                .limit(limit)
+            )
+        ).all()
+    groups: dict[str, list[ArchiveJob]] = {}
+    for job, slug in rows:
+        groups.setdefault(slug, []).append(job)
+    settings = get_settings()
+    completed = 0
+    for slug, jobs in groups.items():
+        error: Exception | None = None
+        refs: list[tuple[int, int, str, str | None]] = []
+        try:
+            archive = await ensure_archive(settings, slug)
+            async with _archive_write_lock(archive):
+                for job in jobs:
+                    payload = job.payload
+                    archived = await write_message_bundle(
+                        archive,
+                        payload["frontmatter"],
+                        payload["body_md"],
+                        payload["sender"],
+                        payload["recipients"],
+                        payload.get("extra_paths") or [],
+                    )
+                    refs.append((job.message_id, job.project_id, archived.path, archived.commit_sha))
+        except Exception as exc:
+            error = exc
+            logger.warning("archive_outbox.write_failed", extra={"project": slug, "jobs": len(jobs), "error": str(exc)})
+        params = {"ids": [job.id for job in jobs]}
+        async with get_session() as session:
+            if error is None:
+                await session.execute(
+                    text("DELETE FROM archive_jobs WHERE id IN :ids").bindparams(bindparam("ids", expanding=True)),
+                    params,
+                )
+                await record_message_archive_refs(refs, session=session)
+            else:
+                await session.execute(
+                    text(
+                        "UPDATE archive_jobs SET attempts = attempts + 1, last_error = :error WHERE id IN :ids"
+                    ).bindparams(bindparam("ids", expanding=True)),
+                    {**params, "error": str(error)[:1024]},
+                )
+            await session.commit()
+        if error is None:
+            completed += len(jobs)
+    return completed
+
+
+class _ArchiveOutboxWorker:
+    """Per-event-loop task that drains ``archive_jobs`` whenever a send is queued.
+
+    It also wakes every ``_ARCHIVE_OUTBOX_RETRY_SECONDS`` to retry failed jobs and
+    to pick up rows queued by other processes.
+    """
+
+    def __init__(self) -> None:
+        self.loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+
+    def kick(self) -> None:
+        self._wake.set()
+        if self._task is None or self._task.done():
+            self._task = self.loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            try:
+                while await drain_archive_outbox() > 0:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("archive_outbox.drain_failed", extra={"error": str(exc)})
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), timeout=_ARCHIVE_OUTBOX_RETRY_SECONDS)
+
+    async def close(self) -> None:
+        task = self._task
+        self._task = None
+        if task is None or task.done():
+            return
+        task.cancel()
+        with suppress(BaseException):
+            await task
+
+
+_archive_outbox: _ArchiveOutboxWorker | None = None
+
+
+def _kick_archive_outbox() -> None:
+    global _archive_outbox
+    worker = _archive_outbox
+    if worker is None or worker.loop is not asyncio.get_running_loop():
+        worker = _archive_outbox = _ArchiveOutboxWorker()
+    worker.kick()
+
+
+async def _shutdown_archive_outbox() -> None:
+    global _archive_outbox
+    worker = _archive_outbox
+    _archive_outbox = None
+    if worker is None or worker.loop is not asyncio.get_running_loop():
+        return
+    await worker.close()
+
+
+class _ArchiveMaintenanceWorker:
+    """Per-event-loop task that runs git maintenance on archive repos that are due.
+
+    Checks every ``STORAGE_MAINTENANCE_INTERVAL_SECONDS`` at first; the wait halves
+    after a pass that maintained something and doubles (up to 8x) while nothing is
+    due, so busy archives are checked more often than idle ones.
+    """
+
+    def __init__(self, settings: Settings) -> None:
+        self.loop = asyncio.get_running_loop()
+        self.settings = settings
+        self._task: asyncio.Task[None] = self.loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        base = float(self.settings.storage.maintenance_interval_seconds)
+        delay = base
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                results = await run_archive_maintenance(self.settings)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("archive.maintenance_failed", extra={"error": str(exc)})
+                results = []
+            if results:
+                logger.info(
+                    "archive.maintenance",
+                    extra={"repos": len(results), "duration_ms": sum(r["duration_ms"] for r in results)},
+                )
+                delay = max(base / 8, delay / 2)
+            else:
+                delay = min(base * 8, delay * 2)
+
+    async def close(self) -> None:
+        if self._task.done():
+            return
+        self._task.cancel()
+        with suppress(BaseException):
+            await self._task
+
+
+_archive_maintenance: _ArchiveMaintenanceWorker | None = None
+
+
+def _start_archive_maintenance(settings: Settings) -> None:
+    global _archive_maintenance
+    worker = _archive_maintenance
+    if worker is None or worker.loop is not asyncio.get_running_loop():
+        _archive_maintenance = _ArchiveMaintenanceWorker(settings)
+
+
+async def _shutdown_archive_maintenance() -> None:
+    global _archive_maintenance
+    worker = _archive_maintenance
+    _archive_maintenance = None
+    if worker is None or worker.loop is not asyncio.get_running_loop():
+        return
+    await worker.close()
+
+
 async def _create_file_reservation(
     project: Project,
     agent: Agent,
@@ -2763,7 +3106,8 @@ async def _create_file_reservation(
         raise ValueError("Project and agent must have ids before creating file_reservations.")
     expires = _naive_utc() + timedelta(seconds=ttl_seconds)
     await ensure_schema()
-    async with get_session() as session:
+
+    async def _insert(session: AsyncSession) -> FileReservation:
         file_reservation = FileReservation(
             project_id=project.id,
             agent_id=agent.id,
@@ -2773,8 +3117,11 @@ async def _create_file_reservation(
             expires_ts=expires,
         )
         session.add(file_reservation)
-        await session.commit()
-        await session.refresh(file_reservation)
+        await session.flush()
+        return file_reservation
+
+    file_reservation = await run_write(_insert)
+    _schedule_file_reservation_expiry(project.id, expires)
     return file_reservation
 
 
@@ -3081,6 +3428,139 @@ async def _expire_stale_file_reservations(
     return stale_statuses
 
 
+# Backoff before re-sweeping a project whose last sweep failed, so a broken archive
+# does not turn an already-due heap entry into a busy loop.
+_RESERVATION_SWEEP_RETRY_SECONDS = 5.0
+
+
+class _FileReservationSweeper:
+    """Per-event-loop task that releases expired and stale file reservations.
+
+    Keeps a heap of ``(next expiry, project_id)`` so a project is swept as soon as
+    its earliest reservation lapses, and rescans every project holding active
+    reservations each ``FILE_RESERVATIONS_CLEANUP_INTERVAL_SECONDS`` to release
+    stale holds and pick up grants made by other processes. Each project's
+    releases from one sweep land in a single archive commit, so request paths
+    never pay for expiry while holding the archive lock.
+    """
+
+    def __init__(self, settings: Settings) -> None:
+        self.loop = asyncio.get_running_loop()
+        self.settings = settings
+        self._heap: list[tuple[datetime, int]] = []
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task[None] = self.loop.create_task(self._run())
+
+    def schedule(self, project_id: int, expires_ts: datetime) -> None:
+        """Note a new grant so its expiry is swept on time, waking the task if it is now first."""
+        entry = (_naive_utc(expires_ts), project_id)
+        heapq.heappush(self._heap, entry)
+        if self._heap[0] is entry:
+            self._wake.set()
+
+    async def _reload(self, failed: frozenset[int] = frozenset()) -> list[int]:
+        """Rebuild the heap from the database and return the projects with active reservations."""
+        async with get_session() as session:
+            rows = (
+                await session.execute(
+                    select(FileReservation.project_id, func.min(FileReservation.expires_ts))
+                    .where(cast(Any, FileReservation.released_ts).is_(None))
+                    .group_by(FileReservation.project_id)
+                )
+            ).all()
+        retry_at = _naive_utc() + timedelta(seconds=_RESERVATION_SWEEP_RETRY_SECONDS)
+        heap = [
+            (max(_naive_utc(expires), retry_at) if pid in failed else _naive_utc(expires), pid)
+            for pid, expires in rows
+            if pid is not None and expires is not None
+        ]
+        heapq.heapify(heap)
+        self._heap = heap
+        return [pid for _, pid in heap]
+
+    async def sweep(self, project_ids: Sequence[int]) -> frozenset[int]:
+        """Release expired/stale reservations for ``project_ids``; return the projects that failed."""
+        failed: set[int] = set()
+        stale_released = 0
+        for project_id in sorted(set(project_ids)):
+            try:
+                stale_released += len(await _expire_stale_file_reservations(project_id))
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                failed.add(project_id)
+                logger.warning(
+                    "file_reservations.sweep_failed", extra={"project_id": project_id, "error": str(exc)}
+                )
+        logger.debug(
+            "file_reservations.sweep",
+            extra={"projects": len(project_ids), "stale_released": stale_released, "failed": len(failed)},
+        )
+        return frozenset(failed)
+
+    async def _run(self) -> None:
+        interval = float(max(1, self.settings.file_reservations_cleanup_interval_seconds))
+        # Seed from the database; anything already past due is swept on the first pass.
+        await self._reload()
+        next_scan = self.loop.time() + interval
+        while True:
+            self._wake.clear()
+            try:
+                now = _naive_utc()
+                due: set[int] = set()
+                while self._heap and self._heap[0][0] <= now:
+                    due.add(heapq.heappop(self._heap)[1])
+                full_scan = self.loop.time() >= next_scan
+                if full_scan:
+                    due.update(await self._reload())
+                    next_scan = self.loop.time() + interval
+                if due:
+                    # Renewals and releases made elsewhere leave outdated heap entries behind;
+                    # rebuilding after each sweep drops them.
+                    await self._reload(await self.sweep(sorted(due)))
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("file_reservations.sweeper_failed", extra={"error": str(exc)})
+            timeout = next_scan - self.loop.time()
+            if self._heap:
+                timeout = min(timeout, (self._heap[0][0] - _naive_utc()).total_seconds())
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), timeout=max(0.0, timeout))
+
+    async def close(self) -> None:
+        if self._task.done():
+            return
+        self._task.cancel()
+        with suppress(BaseException):
+            await self._task
+
+
+_file_reservation_sweeper: _FileReservationSweeper | None = None
+
+
+def _start_file_reservation_sweeper(settings: Settings) -> None:
+    global _file_reservation_sweeper
+    worker = _file_reservation_sweeper
+    if worker is None or worker.loop is not asyncio.get_running_loop():
+        _file_reservation_sweeper = _FileReservationSweeper(settings)
+
+
+async def _shutdown_file_reservation_sweeper() -> None:
+    global _file_reservation_sweeper
+    worker = _file_reservation_sweeper
+    _file_reservation_sweeper = None
+    if worker is None or worker.loop is not asyncio.get_running_loop():
+        return
+    await worker.close()
+
+
+def _schedule_file_reservation_expiry(project_id: int, expires_ts: datetime) -> None:
+    worker = _file_reservation_sweeper
+    if worker is not None and worker.loop is asyncio.get_running_loop():
+        worker.schedule(project_id, expires_ts)
+
+
 def _file_reservations_conflict(existing: FileReservation, candidate_path: str, candidate_exclusive: bool, candidate_agent: Agent) -> bool:
     if existing.released_ts is not None:
         return False
@@ -3088,23 +3568,17 @@ def _file_reservations_conflict(existing: FileReservation, candidate_path: str,
         return False
     if not existing.exclusive and not candidate_exclusive:
         return False
-    # Git wildmatch semantics; treat inputs as repo-root relative forward-slash paths
-    def _normalize(p: str) -> str:
-        return p.replace("\\", "/").lstrip("/")
-    if PathSpec is not None and GitWildMatchPattern is not None:
-        spec = _compile_pathspec(_normalize_pathspec_pattern(existing.path_pattern))
-        if spec is not None:
-            return spec.match_file(_normalize(candidate_path))
-    # Fallback to conservative fnmatch if pathspec not available
-    pat = existing.path_pattern
-    a = _normalize(candidate_path)
-    b = _normalize(pat)
-    return fnmatch.fnmatchcase(a, b) or fnmatch.fnmatchcase(b, a) or (a == b)
+    # Git wildmatch semantics on repo-root relative paths; a glob candidate conflicts
+    # if any path it covers is also covered by the existing reservation.
+    return _patterns_overlap(existing.path_pattern, candidate_path)
 
 
 def _normalize_pathspec_pattern(pattern: str) -> str:
-    """Normalize a pattern for PathSpec caching (slash normalization + leading slash strip)."""
-    return pattern.replace("\\", "/").lstrip("/")
+    """Normalize a pattern for PathSpec caching (slash normalization + leading ``/``/``./`` strip)."""
+    normalized = pattern.replace("\\", "/").lstrip("/")
+    while normalized.startswith("./"):
+        normalized = normalized[2:].lstrip("/")
+    return normalized
 
 
 @functools.lru_cache(maxsize=1024)
@@ -3118,27 +3592,259 @@ def _compile_pathspec(pattern: str) -> "PathSpec | None":
     return PathSpec.from_lines("gitwildmatch", [pattern])
 
 
+# Glob automata: a gitwildmatch pattern compiles to an NFA over characters whose
+# edges carry a character set (sorted codepoint ranges, optionally negated).
+# Two patterns overlap iff the product of their automata reaches a pair of
+# accepting states (some path matches both), or a directory one of them names
+# is one the other explicitly continues beneath.
+_GlobCharset = tuple[tuple[tuple[int, int], ...], bool]
+_GLOB_SLASH = ord("/")
+_GLOB_ANY: _GlobCharset = ((), True)
+_GLOB_NOT_SLASH: _GlobCharset = (((_GLOB_SLASH, _GLOB_SLASH),), True)
+
+
+def _glob_char(ch: str) -> _GlobCharset:
+    return (((ord(ch), ord(ch)),), False)
+
+
+def _glob_ranges_uncovered(ranges: tuple[tuple[int, int], ...], holes: tuple[tuple[int, int], ...]) -> bool:
+    """True if some codepoint in ``ranges`` lies outside every range in ``holes``."""
+    for lo, hi in ranges:
+        point = lo
+        for hole_lo, hole_hi in holes:
+            if hole_lo <= point <= hole_hi:
+                point = hole_hi + 1
+        if point <= hi:
+            return True
+    return False
+
+
+def _glob_charsets_intersect(a: _GlobCharset, b: _GlobCharset) -> bool:
+    (a_ranges, a_negated), (b_ranges, b_negated) = a, b
+    if a_negated and b_negated:
+        return True  # the complement of two finite sets is never empty
+    if a_negated:
+        return _glob_ranges_uncovered(b_ranges, a_ranges)
+    if b_negated:
+        return _glob_ranges_uncovered(a_ranges, b_ranges)
+    return any(lo <= b_hi and b_lo <= hi for lo, hi in a_ranges for b_lo, b_hi in b_ranges)
+
+
+def _glob_bracket(segment: str, start: int) -> tuple[_GlobCharset, int] | None:
+    """Parse a ``[...]`` class at ``segment[start]``; None when it is unterminated (a literal ``[``)."""
+    i = start + 1
+    negated = i < len(segment) and segment[i] in "!^"
+    if negated:
+        i += 1
+    ranges: list[tuple[int, int]] = []
+    first = True
+    while i < len(segment):
+        ch = segment[i]
+        if ch == "]" and not first:
+            merged = tuple(sorted(ranges))
+            if negated:
+                # Classes never match the separator.
+                return (tuple(sorted((*merged, (_GLOB_SLASH, _GLOB_SLASH)))), True), i + 1
+            return (merged, False), i + 1
+        if i + 2 < len(segment) and segment[i + 1] == "-" and segment[i + 2] != "]":
+            if ord(ch) <= ord(segment[i + 2]):
+                ranges.append((ord(ch), ord(segment[i + 2])))
+            i += 3
+        else:
+            ranges.append((ord(ch), ord(ch)))
+            i += 1
+        first = False
+    return None
+
+
+class _GlobAutomaton:
+    """Epsilon-NFA for one normalized gitwildmatch pattern (state 0 is the start state).
+
+    ``accepting`` states end a path the pattern matches outright; ``core`` states
+    end the name the pattern spells (a directory it names covers everything
+    beneath); ``boundaries`` are the directory ends inside the pattern's own
+    segments, where it explicitly continues beneath a directory.
+    """
+
+    __slots__ = ("accepting", "boundaries", "core", "edges", "epsilon", "_closures")
+
+    def __init__(self) -> None:
+        self.edges: list[list[tuple[_GlobCharset, int]]] = [[]]
+        self.epsilon: list[list[int]] = [[]]
+        self.accepting: set[int] = set()
+        self.core: set[int] = set()
+        self.boundaries: set[int] = set()
+        self._closures: dict[int, frozenset[int]] = {}
+
+    def state(self) -> int:
+        self.edges.append([])
+        self.epsilon.append([])
+        return len(self.edges) - 1
+
+    def step(self, src: int, charset: _GlobCharset) -> int:
+        dst = self.state()
+        self.edges[src].append((charset, dst))
+        return dst
+
+    def repeat(self, src: int, charset: _GlobCharset, *, at_least_one: bool) -> int:
+        """``charset*`` (or ``charset+``) from ``src``; returns the state after it."""
+        dst = self.step(src, charset) if at_least_one else src
+        loop = self.state()
+        self.epsilon[dst].append(loop)
+        self.edges[loop].append((charset, loop))
+        return loop
+
+    def closure(self, state: int) -> frozenset[int]:
+        cached = self._closures.get(state)
+        if cached is None:
+            seen = {state}
+            stack = [state]
+            while stack:
+                for nxt in self.epsilon[stack.pop()]:
+                    if nxt not in seen:
+                        seen.add(nxt)
+                        stack.append(nxt)
+            cached = self._closures[state] = frozenset(seen)
+        return cached
+
+
+def _glob_segment(nfa: _GlobAutomaton, state: int, segment: str) -> int:
+    if set(segment) == {"*"}:
+        # A lone ``*`` segment stands for a whole (non-empty) path component.
+        return nfa.repeat(state, _GLOB_NOT_SLASH, at_least_one=True)
+    i = 0
+    while i < len(segment):
+        ch = segment[i]
+        if ch == "*":
+            while i < len(segment) and segment[i] == "*":
+                i += 1
+            state = nfa.repeat(state, _GLOB_NOT_SLASH, at_least_one=False)
+            continue
+        if ch == "?":
+            state = nfa.step(state, _GLOB_NOT_SLASH)
+        elif ch == "[" and (parsed := _glob_bracket(segment, i)) is not None:
+            charset, i = parsed
+            state = nfa.step(state, charset)
+            continue
+        else:
+            state = nfa.step(state, _glob_char(ch))
+        i += 1
+    return state
+
+
+@functools.lru_cache(maxsize=4096)
+def _compile_glob_automaton(pattern: str) -> _GlobAutomaton:
+    """Compile a normalized gitwildmatch pattern (see ``_patterns_overlap`` for the semantics).
+
+    Mirrors pathspec's translation: patterns without an inner slash float to any
+    depth, ``**`` spans directories and a lone ``*`` segment is one non-empty
+    component. Negated and comment patterns reserve nothing.
+    """
+    nfa = _GlobAutomaton()
+    if not pattern or pattern.startswith(("!", "#")):
+        return nfa
+    segments = pattern.split("/")
+    dir_only = segments[-1] == ""
+    collapsed: list[str] = []
+    for seg in segments:
+        if seg and not (seg == "**" and collapsed and collapsed[-1] == "**"):
+            collapsed.append(seg)
+    segments = collapsed
+    state = 0
+    if segments == ["**"]:
+        everything = nfa.repeat(state, _GLOB_ANY, at_least_one=True)
+        nfa.accepting.add(everything)
+        nfa.core.add(everything)
+        return nfa
+    if len(segments) == 1 or segments[0] == "**":
+        # Floating: optionally preceded by any directories.
+        if segments[0] == "**":
+            segments = segments[1:]
+        after = nfa.state()
+        nfa.epsilon[state].append(after)
+        nfa.edges[nfa.repeat(state, _GLOB_ANY, at_least_one=True)].append((_glob_char("/"), after))
+        state = after
+    for idx, seg in enumerate(segments):
+        if seg == "**":
+            slash = nfa.step(state, _glob_char("/"))
+            if idx == len(segments) - 1:
+                # ``dir/**``: anything strictly beneath dir.
+                beneath = nfa.repeat(slash, _GLOB_ANY, at_least_one=True)
+                nfa.accepting.add(beneath)
+                nfa.core.add(beneath)
+                return nfa
+            # ``a/**/b``: zero or more directories between a and b.
+            state = nfa.state()
+            nfa.epsilon[slash].append(state)
+            dirs = nfa.repeat(slash, _GLOB_ANY, at_least_one=True)
+            nfa.edges[dirs].append((_glob_char("/"), state))
+            nfa.boundaries.add(dirs)
+            continue
+        if idx > 0 and segments[idx - 1] != "**":
+            nfa.boundaries.add(state)
+            state = nfa.step(state, _glob_char("/"))
+        state = _glob_segment(nfa, state, seg)
+    nfa.core.add(state)
+    if dir_only:
+        # ``dir/`` reserves the directory's contents, never a file of that name.
+        nfa.boundaries.add(state)
+        nfa.accepting.add(nfa.repeat(nfa.step(state, _glob_char("/")), _GLOB_ANY, at_least_one=True))
+    else:
+        nfa.accepting.add(state)
+    return nfa
+
+
+@functools.lru_cache(maxsize=65536)
+def _glob_automata_intersect(a: str, b: str) -> bool:
+    """Emptiness test on the product of two compiled patterns (memoized per normalized pair)."""
+    left, right = _compile_glob_automaton(a), _compile_glob_automaton(b)
+    if not left.accepting or not right.accepting:
+        return False
+    seen: set[tuple[int, int]] = set()
+    stack = [(p, q) for p in left.closure(0) for q in right.closure(0)]
+    while stack:
+        pair = stack.pop()
+        if pair in seen:
+            continue
+        seen.add(pair)
+        p, q = pair
+        if (
+            (p in left.accepting and q in right.accepting)
+            or (p in left.core and q in right.boundaries)
+            or (p in left.boundaries and q in right.core)
+        ):
+            return True
+        for p_set, p_next in left.edges[p]:
+            for q_set, q_next in right.edges[q]:
+                if _glob_charsets_intersect(p_set, q_set):
+                    stack.extend(
+                        (pn, qn) for pn in left.closure(p_next) for qn in right.closure(q_next) if (pn, qn) not in seen
+                    )
+    return False
+
+
 def _patterns_overlap(a: str, b: str) -> bool:
-    # Overlap if any file could be matched by both patterns (approximate by cross-matching)
+    """True if some repo path is reserved by both gitwildmatch patterns.
+
+    A pattern reserves the paths it matches; a name it matches also reserves
+    everything beneath it when the other pattern explicitly continues below that
+    directory (``src`` vs ``src/app.py``) or the pattern is written as a
+    directory (``docs/``, ``docs/**``). Floating patterns are not assumed to nest
+    under each other's file names, so ``README.md`` and ``LICENSE`` stay apart.
+    """
     a_norm = _normalize_pathspec_pattern(a)
     b_norm = _normalize_pathspec_pattern(b)
-
-    a_spec = _compile_pathspec(a_norm)
-    b_spec = _compile_pathspec(b_norm)
-
-    if a_spec is not None and b_spec is not None:
-        # Heuristic: check direct cross-matches on normalized patterns
-        return a_spec.match_file(b_norm) or b_spec.match_file(a_norm)
-    # Fallback approximate
-    return fnmatch.fnmatchcase(a_norm, b_norm) or fnmatch.fnmatchcase(b_norm, a_norm) or (a_norm == b_norm)
+    if a_norm == b_norm:
+        return bool(_compile_glob_automaton(a_norm).accepting)
+    # Anchored patterns whose literal leading directories diverge cannot meet.
+    a_prefix, b_prefix = _reservation_literal_prefix(a_norm), _reservation_literal_prefix(b_norm)
+    if any(x != y for x, y in zip(a_prefix, b_prefix)):
+        return False
+    return _glob_automata_intersect(*sorted((a_norm, b_norm)))
 
 
 def _file_reservations_patterns_overlap(paths_a: Sequence[str], paths_b: Sequence[str]) -> bool:
-    for pa in paths_a:
-        for pb in paths_b:
-            if _patterns_overlap(pa, pb):
-                return True
-    return False
+    return any(_patterns_overlap(pa, pb) for pa in paths_a for pb in paths_b)
 
 
 def _build_reservation_union_spec(
@@ -3197,6 +3903,147 @@ def _build_reservation_union_spec(
     return PathSpec.from_lines("gitwildmatch", patterns)
 
 
+_RESERVATION_GLOB_CHARS = frozenset("*?[")
+
+
+def _reservation_literal_prefix(pattern: str) -> tuple[str, ...]:
+    """Leading literal directories every path reserved by ``pattern`` starts with.
+
+    Under gitwildmatch only patterns containing an inner slash are anchored to
+    the root; everything else (``*.py``, ``build/``, ``**/x``) can match at any
+    depth and gets the empty prefix.
+    """
+    normalized = _normalize_pathspec_pattern(pattern)
+    anchored = normalized.rstrip("/")
+    if normalized.startswith("!") or "/" not in anchored:
+        return ()
+    prefix: list[str] = []
+    for segment in anchored.split("/"):
+        if not segment or _RESERVATION_GLOB_CHARS.intersection(segment):
+            break
+        prefix.append(segment)
+    return tuple(prefix)
+
+
+class _ReservationTrieNode:
+    __slots__ = ("children", "entries")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _ReservationTrieNode] = {}
+        self.entries: list[tuple[FileReservation, str]] = []
+
+
+class _ReservationIndex:
+    """Active reservations of one project, bucketed in a trie by literal directory prefix.
+
+    A candidate pattern only has to be checked against the buckets its literal
+    prefix can reach, so conflict checks touch the reservations that could
+    overlap it rather than every active reservation in the project. ``version``
+    is the ``file_reservation_versions`` counter the index was built from.
+    """
+
+    def __init__(self, version: int, rows: Sequence[tuple[FileReservation, str]] = ()) -> None:
+        self.version = version
+        self.size = 0
+        self._root = _ReservationTrieNode()
+        for row in rows:
+            self.add(*row)
+
+    def add(self, reservation: FileReservation, holder_name: str) -> None:
+        node = self._root
+        for segment in _reservation_literal_prefix(reservation.path_pattern):
+            node = node.children.setdefault(segment, _ReservationTrieNode())
+        node.entries.append((reservation, holder_name))
+        self.size += 1
+
+    def candidates(self, pattern: str) -> Iterator[tuple[FileReservation, str]]:
+        """Yield reservations whose literal prefix is compatible with ``pattern``'s.
+
+        Two anchored patterns can only overlap when one literal prefix extends
+        the other: that is the buckets on ``pattern``'s own walk from the root
+        plus the whole subtree where its literal prefix ends.
+        """
+        node = self._root
+        for segment in _reservation_literal_prefix(pattern):
+            yield from node.entries
+            child = node.children.get(segment)
+            if child is None:
+                return
+            node = child
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            yield from current.entries
+            stack.extend(current.children.values())
+
+    def conflicts(
+        self, path: str, exclusive: bool, agent: Agent, *, now: datetime
+    ) -> list[tuple[FileReservation, str]]:
+        """Return the unexpired reservations held by others that conflict with ``path``."""
+        return [
+            (reservation, holder_name)
+            for reservation, holder_name in self.candidates(path)
+            if _naive_utc(reservation.expires_ts) > now
+            and _file_reservations_conflict(reservation, path, exclusive, agent)
+        ]
+
+
+# Keyed by engine so a reset or re-pointed database never serves another database's index.
+_RESERVATION_INDEXES: "weakref.WeakKeyDictionary[Any, dict[int, _ReservationIndex]]" = weakref.WeakKeyDictionary()
+
+
+def _reservation_indexes() -> dict[int, _ReservationIndex]:
+    return _RESERVATION_INDEXES.setdefault(get_engine(), {})
+
+
+async def _file_reservation_version(session: AsyncSession, project_id: int) -> int:
+    row = await session.get(FileReservationVersion, project_id)
+    return int(row.version) if row else 0
+
+
+async def _reservation_index(project_id: int) -> _ReservationIndex:
+    """Return the project's reservation index, rebuilding it if any writer changed its reservations."""
+    await ensure_schema()
+    async with get_session() as session:
+        version = await _file_reservation_version(session, project_id)
+        cached = _reservation_indexes().get(project_id)
+        if cached is not None and cached.version == version:
+            return cached
+        rows = await session.execute(
+            select(FileReservation, Agent.name)
+            .join(Agent, cast(Any, FileReservation.agent_id) == Agent.id)
+            .where(
+                cast(Any, FileReservation.project_id) == project_id,
+                cast(Any, FileReservation.released_ts).is_(None),
+                cast(Any, FileReservation.expires_ts) > _naive_utc(),
+            )
+        )
+        index = _ReservationIndex(version, [(row[0], row[1]) for row in rows.all()])
+    _reservation_indexes()[project_id] = index
+    return index
+
+
+async def _adopt_reservation_grants(
+    project_id: int, index: _ReservationIndex, granted: Sequence[tuple[FileReservation, str]]
+) -> None:
+    """Fold reservations this process just inserted into ``index`` instead of rebuilding it.
+
+    Each insert bumps the project version once, so the index is only kept when
+    the counter moved by exactly that much (i.e. nobody else wrote meanwhile).
+    """
+    if not granted:
+        return
+    async with get_session() as session:
+        version = await _file_reservation_version(session, project_id)
+    indexes = _reservation_indexes()
+    if version != index.version + len(granted) or indexes.get(project_id) is not index:
+        indexes.pop(project_id, None)
+        return
+    for reservation, holder_name in granted:
+        index.add(reservation, holder_name)
+    index.version = version
+
+
 async def _list_inbox(
     project: Project,
     agent: Agent,
@@ -3204,63 +4051,111 @@ async def _list_inbox(
     urgent_only: bool,
     include_bodies: bool,
     since_ts: Optional[str],
+    cursor: Optional[tuple[datetime, int]] = None,
 ) -> list[dict[str, Any]]:
     if project.id is None or agent.id is None:
         raise ValueError("Project and agent must have ids before listing inbox.")
-    sender_alias = aliased(Agent)
     await ensure_schema()
-    async with get_session() as session:
+    async with get_session(readonly=True) as session:
+        # Served from inbox_entries: one range scan on (agent_id, project_id, created_ts DESC).
         stmt = (
-            select(Message, MessageRecipient.kind, sender_alias.name)
-            .join(MessageRecipient, MessageRecipient.message_id == Message.id)
-            .join(sender_alias, cast(Any, Message.sender_id == sender_alias.id))
+            select(InboxEntry)
             .where(
-                cast(Any, Message.project_id) == project.id,
-                MessageRecipient.agent_id == agent.id,
+                cast(Any, InboxEntry.agent_id) == agent.id,
+                cast(Any, InboxEntry.project_id) == project.id,
             )
-            .order_by(desc(Message.created_ts))
+            .order_by(desc(InboxEntry.created_ts), desc(InboxEntry.message_id))
             .limit(limit)
         )
         if urgent_only:
-            stmt = stmt.where(cast(Any, Message.importance).in_(["high", "urgent"]))
+            stmt = stmt.where(cast(Any, InboxEntry.importance).in_(["high", "urgent"]))
         if since_ts:
             since_dt = _parse_iso(since_ts)
             if since_dt:
-                stmt = stmt.where(Message.created_ts > _naive_utc(since_dt))
-        result = await session.execute(stmt)
-        rows = result.all()
+                stmt = stmt.where(InboxEntry.created_ts > _naive_utc(since_dt))
+        if cursor is not None:
+            stmt = stmt.where(_keyset_before(InboxEntry.created_ts, InboxEntry.message_id, cursor))
+        entries = list((await session.execute(stmt)).scalars().all())
+        # Attachments (and bodies on request) are fetched by primary key for this page only.
+        extra_columns: list[Any] = [Message.id, Message.attachments]
+        if include_bodies:
+            extra_columns.append(Message.body_md)
+        else:
+            extra_columns.extend([Message.preview, Message.body_len])
+        extras: dict[int, Any] = {}
+        if entries:
+            extra_rows = await session.execute(
+                select(*extra_columns).where(cast(Any, Message.id).in_([entry.message_id for entry in entries]))
+            )
+            extras = {row[0]: row for row in extra_rows.all()}
     messages: list[dict[str, Any]] = []
-    for message, recipient_kind, sender_name in rows:
-        payload = _message_to_dict(message, include_body=include_bodies)
-        payload["from"] = sender_name
-        payload["kind"] = recipient_kind
+    for entry in entries:
+        extra = extras.get(entry.message_id)
+        payload: dict[str, Any] = {
+            "id": entry.message_id,
+            "project_id": entry.project_id,
+            "sender_id": entry.sender_id,
+            "thread_id": entry.thread_id,
+            "subject": entry.subject,
+            "importance": entry.importance,
+            "ack_required": entry.ack_required,
+            "created_ts": _iso(entry.created_ts),
+            "attachments": (extra[1] if extra is not None else None) or [],
+        }
+        if include_bodies:
+            payload["body_md"] = extra[2] if extra is not None else ""
+        else:
+            payload["preview"] = extra[2] if extra is not None else ""
+            payload["body_len"] = extra[3] if extra is not None else 0
+        payload["from"] = entry.sender_name
+        payload["kind"] = entry.kind
         messages.append(payload)
     return messages
 
 
+async def _mailbox_counts(project: Project, agent: Agent) -> dict[str, int]:
+    """Return badge counters for an agent's mailbox via a single primary-key lookup."""
+    if project.id is None or agent.id is None:
+        raise ValueError("Project and agent must have ids before reading mailbox counts.")
+    await ensure_schema()
+    async with get_session(readonly=True) as session:
+        counter = await session.get(MailboxCounter, (project.id, agent.id))
+    return {
+        "total": int(counter.total) if counter else 0,
+        "unread": int(counter.unread) if counter else 0,
+        "urgent_unread": int(counter.urgent_unread) if counter else 0,
+        "ack_pending": int(counter.ack_pending) if counter else 0,
+    }
+
+
 async def _list_outbox(
     project: Project,
     agent: Agent,
     limit: int,
     include_bodies: bool,
     since_ts: Optional[str],
+    cursor: Optional[tuple[datetime, int]] = None,
 ) -> list[dict[str, Any]]:
-    """List messages sent by the agent (their outbox)."""
+    """List messages sent by the agent (their outbox), newest first."""
     if project.id is None or agent.id is None:
         raise ValueError("Project and agent must have ids before listing outbox.")
     await ensure_schema()
     messages: list[dict[str, Any]] = []
-    async with get_session() as session:
+    async with get_session(readonly=True) as session:
         stmt = (
             select(Message)
             .where(Message.project_id == project.id, Message.sender_id == agent.id)
-            .order_by(desc(Message.created_ts))
+            .order_by(desc(Message.created_ts), desc(Message.id))
             .limit(limit)
         )
         if since_ts:
             since_dt = _parse_iso(since_ts)
             if since_dt:
                 stmt = stmt.where(Message.created_ts > _naive_utc(since_dt))
+        if cursor is not None:
+            stmt = stmt.where(_keyset_before(Message.created_ts, Message.id, cursor))
+        if not include_bodies:
+            stmt = _defer_body(stmt)
         result = await session.execute(stmt)
         message_rows = result.scalars().all()
 
@@ -3339,17 +4234,41 @@ def _canonical_relpath_for_message(project: Project, message: Message, archive:
         return None
 
 
+async def _message_archive_ref(archive: ProjectArchive, project: Project, message: Message) -> tuple[str, str] | None:
+    """Return the canonical archive path of a message and the commit that added it.
+
+    Normally a primary-key read of ``message_archive_refs``. Messages archived
+    before the table existed, whose commit was coalesced, or whose file moved fall
+    back to the month-directory scan and history lookup, and the result is recorded.
+    """
+    if message.id is None or project.id is None:
+        return None
+    ref = await get_message_archive_ref(message.id)
+    if ref is not None and ref[1] and (archive.repo_root / ref[0]).is_file():
+        return ref[0], ref[1]
+    relpath = ref[0] if ref is not None and (archive.repo_root / ref[0]).is_file() else None
+    relpath = relpath or _canonical_relpath_for_message(project, message, archive)
+    if not relpath:
+        return None
+    sha = await get_archive_path_commit_sha(archive, relpath)
+    if not sha:
+        return None
+    await record_message_archive_refs([(message.id, project.id, relpath, sha)])
+    return relpath, sha
+
+
 async def _commit_info_for_message(settings: Settings, project: Project, message: Message) -> dict[str, Any] | None:
     """Fetch commit metadata for the canonical message file (hexsha, summary, authored_ts, stats)."""
     archive = await ensure_archive(settings, project.slug)
-    relpath = _canonical_relpath_for_message(project, message, archive)
-    if not relpath:
+    ref = await _message_archive_ref(archive, project, message)
+    if ref is None:
         return None
+    relpath, sha = ref
 
     def _lookup() -> dict[str, Any] | None:
         try:
-            commit = next(archive.repo.iter_commits(paths=[relpath], max_count=1))
-        except StopIteration:
+            commit = archive.repo.commit(sha)
+        except ValueError:
             return None
         data: dict[str, Any] = {
             "hexsha": commit.hexsha[:12],
@@ -3565,7 +4484,12 @@ async def _compute_thread_summary(
     return summary, examples, len(rows)
 
 
-async def _get_message(project: Project, message_id: int) -> Message:
+async def _get_message(project: Project, message_id: int, *, include_cold: bool = False) -> Message:
+    """Load a message by id; ``include_cold`` also consults the monthly cold tier.
+
+    Cold hits are detached, read-only copies (no hot message/recipient rows back
+    them), so only callers that never write through the result may opt in.
+    """
     if project.id is None:
         raise ValueError("Project must have an id before reading messages.")
     await ensure_schema()
@@ -3574,9 +4498,18 @@ async def _get_message(project: Project, message_id: int) -> Message:
             select(Message).where(Message.project_id == project.id, Message.id == message_id)
         )
         message = result.scalars().first()
-        if not message:
-            raise NoResultFound(f"Message '{message_id}' not found for project '{project.human_key}'.")
+    if message:
         return message
+    if not include_cold:
+        raise NoResultFound(f"Message '{message_id}' not found for project '{project.human_key}'.")
+    cold = await query_cold_tier(
+        "SELECT * FROM {schema}.messages WHERE project_id = ? AND id = ?",
+        (project.id, message_id),
+        message_id=message_id,
+    )
+    if not cold:
+        raise NoResultFound(f"Message '{message_id}' not found for project '{project.human_key}'.")
+    return _cold_row_to_message(cold[0])
 
 
 async def _get_agent_by_id(project: Project, agent_id: int) -> Agent:
@@ -3602,7 +4535,8 @@ async def _update_recipient_timestamp(
         raise ValueError("Agent must have an id before updating message state.")
     now = datetime.now(timezone.utc)
     naive_now = _naive_utc(now)  # Use naive UTC for SQLite compatibility
-    async with get_session() as session:
+
+    async def _apply(session: AsyncSession) -> Optional[datetime]:
         # Read current value first
         result_sel = await session.execute(
             select(MessageRecipient).where(cast(Any, MessageRecipient.message_id == message_id), cast(Any, MessageRecipient.agent_id == agent.id))
@@ -3621,8 +4555,9 @@ async def _update_recipient_timestamp(
             .values({field: naive_now})
         )
         await session.execute(stmt)
-        await session.commit()
-    return naive_now
+        return naive_now
+
+    return await run_write(_apply)
 
 
 def build_mcp_server() -> FastMCP:
@@ -3701,11 +4636,7 @@ def build_mcp_server() -> FastMCP:
         async with _archive_write_lock(archive):
             # Server-side file_reservations enforcement: block if conflicting active exclusive file_reservation exists
             if settings.file_reservations_enforcement_enabled:
-                await _expire_stale_file_reservations(
-                    project.id or 0,
-                    archive=archive,
-                    archive_locked=True,
-                )
+                # Expiry is the sweeper's job; lapsed reservations are simply filtered out here.
                 now_ts = datetime.now(timezone.utc)
                 y_dir = now_ts.strftime("%Y")
                 m_dir = now_ts.strftime("%m")
@@ -3714,48 +4645,19 @@ def build_mcp_server() -> FastMCP:
                 for r in to_agents + cc_agents + bcc_agents:
                     candidate_surfaces.append(f"agents/{r.name}/inbox/{y_dir}/{m_dir}/*.md")
 
-                async with get_session() as session:
-                    rows = await session.execute(
-                        select(FileReservation, Agent.name)
-                        .join(Agent, cast(Any, FileReservation.agent_id) == Agent.id)
-                        .where(
-                            cast(Any, FileReservation.project_id) == project.id,
-                            cast(Any, FileReservation.released_ts).is_(None),
-                            cast(Any, FileReservation.expires_ts) > _naive_utc(now_ts),
-                        )
-                    )
-                    active_file_reservations: list[tuple[FileReservation, str]] = [
-                        (row[0], row[1]) for row in rows.all()
-                    ]
-
+                reservation_index = await _reservation_index(project.id or 0)
                 conflicts: list[dict[str, Any]] = []
-
-                # Build union PathSpec for fast conflict pre-filtering
-                union_spec = _build_reservation_union_spec(active_file_reservations, sender.id, True)
-
-                # Pre-compute which surfaces might conflict
-                potentially_conflicting_surfaces: set[str] = set()
-                if union_spec is not None:
-                    normalized_surfaces = [_normalize_pathspec_pattern(s) for s in candidate_surfaces]
-                    matching_normalized = set(union_spec.match_files(normalized_surfaces))
-                    for orig_surface, norm_surface in zip(candidate_surfaces, normalized_surfaces, strict=True):
-                        if norm_surface in matching_normalized:
-                            potentially_conflicting_surfaces.add(orig_surface)
-                else:
-                    potentially_conflicting_surfaces = set(candidate_surfaces)
-
                 for surface in candidate_surfaces:
-                    if surface not in potentially_conflicting_surfaces:
-                        continue  # Fast path: no conflicts possible for this surface
-                    for file_reservation_record, holder_name in active_file_reservations:
-                        if _file_reservations_conflict(file_reservation_record, surface, True, sender):
-                            conflicts.append({
-                                "surface": surface,
-                                "holder": holder_name,
-                                "path_pattern": file_reservation_record.path_pattern,
-                                "exclusive": file_reservation_record.exclusive,
-                                "expires_ts": _iso(file_reservation_record.expires_ts),
-                            })
+                    for file_reservation_record, holder_name in reservation_index.conflicts(
+                        surface, True, sender, now=_naive_utc(now_ts)
+                    ):
+                        conflicts.append({
+                            "surface": surface,
+                            "holder": holder_name,
+                            "path_pattern": file_reservation_record.path_pattern,
+                            "exclusive": file_reservation_record.exclusive,
+                            "expires_ts": _iso(file_reservation_record.expires_ts),
+                        })
                 if conflicts:
                     # Return a structured error payload that clients can surface directly
                     return {
@@ -3776,6 +4678,34 @@ def build_mcp_server() -> FastMCP:
             # Fallback: if body contains inline data URI, reflect that in attachments meta for API parity
             if not attachments_meta and ("data:image" in body_md):
                 attachments_meta.append({"type": "inline", "media_type": "image/webp"})
+            recipients_for_archive = [agent.name for agent in to_agents + cc_agents + bcc_agents]
+
+            def _frontmatter(created: Message) -> dict[str, Any]:
+                return _message_frontmatter(
+                    created,
+                    project,
+                    sender,
+                    to_agents,
+                    cc_agents,
+                    bcc_agents,
+                    attachments_meta,
+                )
+
+            def _archive_job(created: Message) -> dict[str, Any]:
+                return {
+                    "frontmatter": _frontmatter(created),
+                    "body_md": processed_body,
+                    "sender": sender.name,
+                    "recipients": recipients_for_archive,
+                    "extra_paths": attachment_files,
+                }
+
+            outbox = settings.storage.archive_outbox_enabled
+            # The insert stays under the archive lock so the reservation check, DB row and
+            # archive commit are ordered together; in group write mode this means sends to
+            # one project reach the writer serially and only coalesce across projects.
+            # With the archive outbox the Markdown copies are written later from the
+            # archive_jobs row committed alongside the message.
             message = await _create_message(
                 project,
                 sender,
@@ -3786,17 +4716,8 @@ def build_mcp_server() -> FastMCP:
                 ack_required,
                 thread_id,
                 attachments_meta,
+                archive_job=_archive_job if outbox else None,
             )
-            frontmatter = _message_frontmatter(
-                message,
-                project,
-                sender,
-                to_agents,
-                cc_agents,
-                bcc_agents,
-                attachments_meta,
-            )
-            recipients_for_archive = [agent.name for agent in to_agents + cc_agents + bcc_agents]
             payload = _message_to_dict(message)
             payload.update(
                 {
@@ -3807,34 +4728,39 @@ def build_mcp_server() -> FastMCP:
                     "attachments": attachments_meta,
                 }
             )
-            result_snapshot: dict[str, Any] = {
-                "deliveries": [
-                    {
-                        "project": project.human_key,
-                        "payload": payload,
-                    }
-                ],
-                "count": 1,
-            }
-            panel_end = time.perf_counter()
-            commit_panel_text = _render_commit_panel(
-                tool_name,
-                project.human_key,
-                sender.name,
-                call_start,
-                panel_end,
-                result_snapshot,
-                frontmatter.get("created"),
-            )
-            await write_message_bundle(
-                archive,
-                frontmatter,
-                processed_body,
-                sender.name,
-                recipients_for_archive,
-                attachment_files,
-                commit_panel_text,
-            )
+            if outbox:
+                _kick_archive_outbox()
+            else:
+                frontmatter = _frontmatter(message)
+                result_snapshot: dict[str, Any] = {
+                    "deliveries": [
+                        {
+                            "project": project.human_key,
+                            "payload": payload,
+                        }
+                    ],
+                    "count": 1,
+                }
+                panel_end = time.perf_counter()
+                commit_panel_text = _render_commit_panel(
+                    tool_name,
+                    project.human_key,
+                    sender.name,
+                    call_start,
+                    panel_end,
+                    result_snapshot,
+                    frontmatter.get("created"),
+                )
+                archived = await write_message_bundle(
+                    archive,
+                    frontmatter,
+                    processed_body,
+                    sender.name,
+                    recipients_for_archive,
+                    attachment_files,
+                    commit_panel_text,
+                )
+                await record_message_archive_refs([(message.id, project.id, archived.path, archived.commit_sha)])
 
             # Emit notification signals for recipients (if enabled)
             if settings.notifications.enabled:
@@ -4481,7 +5407,7 @@ def build_mcp_server() -> FastMCP:
                     except Exception:
                         pass
                     async with get_session() as s:
-                        stmt = (
+                        stmt = _defer_body(
                             select(Message, sender_alias.name)
                             .join(sender_alias, cast(Any, Message.sender_id == sender_alias.id))
                             .where(cast(Any, Message.project_id) == project.id, or_(*criteria))
@@ -5212,7 +6138,7 @@ def build_mcp_server() -> FastMCP:
         project = await _get_project_by_identifier(project_key)
         sender = await _get_agent(project, sender_name)
         settings_local = get_settings()
-        original = await _get_message(project, message_id)
+        original = await _get_message(project, message_id, include_cold=True)
         original_sender = await _get_agent_by_id(project, original.sender_id)
         thread_key = original.thread_id or str(original.id)
         subject_prefix_clean = subject_prefix.strip()
@@ -5687,6 +6613,7 @@ def build_mcp_server() -> FastMCP:
         urgent_only: bool = False,
         include_bodies: bool = False,
         since_ts: Optional[str] = None,
+        cursor: Optional[str] = None,
     ) -> list[dict[str, Any]]:
         """
         Retrieve recent messages for an agent without mutating read/ack state.
@@ -5697,6 +6624,8 @@ def build_mcp_server() -> FastMCP:
         - `since_ts`: ISO-8601 timestamp string; messages strictly newer than this are returned
         - `limit`: max number of messages (default 20)
         - `include_bodies`: include full Markdown bodies in the payloads
+        - `cursor`: keyset paging token. Pass `""` for the first page, then the returned
+          `next_cursor` to walk older messages; each page is an index seek, not an OFFSET scan.
 
         Usage patterns
         --------------
@@ -5707,7 +6636,11 @@ def build_mcp_server() -> FastMCP:
         Returns
         -------
         list[dict]
-            Each message includes: { id, subject, from, created_ts, importance, ack_required, kind, [body_md] }
+            Each message includes: { id, subject, from, created_ts, importance, ack_required, kind,
+            body_md | preview + body_len }. Without `include_bodies` a stored 160-char `preview` and the
+            body length are returned instead of the full text.
+            When `cursor` is given the result is `{ result: [...], next_cursor }`; `next_cursor` is null
+            once the last page has been returned.
 
         Example
         -------
@@ -5731,6 +6664,7 @@ def build_mcp_server() -> FastMCP:
 
         # Validate since_ts format upfront with helpful error message
         _validate_iso_timestamp(since_ts, "since_ts")
+        cursor_key = _decode_ts_cursor(cursor) if cursor else None
 
         if get_settings().tools_log_enabled:
             try:
@@ -5745,9 +6679,13 @@ def build_mcp_server() -> FastMCP:
         try:
             project = await _get_project_by_identifier(project_key)
             agent = await _get_agent(project, agent_name)
-            items = await _list_inbox(project, agent, limit, urgent_only, include_bodies, since_ts)
+            items = await _list_inbox(project, agent, limit, urgent_only, include_bodies, since_ts, cursor=cursor_key)
             await ctx.info(f"Fetched {len(items)} messages for '{agent.name}'. urgent_only={urgent_only}")
-            return items
+            if cursor is None:
+                return items
+            from fastmcp.tools.tool import ToolResult
+            next_cursor = _encode_ts_cursor(items[-1]) if len(items) == limit else None
+            return cast(Any, ToolResult(structured_content={"result": items, "next_cursor": next_cursor}))
         except Exception as exc:
             _rich_error_panel("fetch_inbox", {"error": str(exc)})
             raise
@@ -6336,6 +7274,7 @@ def build_mcp_server() -> FastMCP:
         project_key: str,
         query: str,
         limit: int = 20,
+        cursor: Optional[str] = None,
     ) -> Any:
         """
         Full-text search over subject and body for a project.
@@ -6343,8 +7282,10 @@ def build_mcp_server() -> FastMCP:
         Tips
         ----
         - SQLite FTS5 syntax supported: phrases ("build plan"), prefix (mig*), boolean (plan AND users)
-        - Results are ordered by bm25 score (best matches first)
-        - Limit defaults to 20; raise for broad queries
+        - Results are ordered by bm25 score (best matches first), ties broken by message id
+        - Limit defaults to 20; page through broad queries with `cursor` instead of raising it
+        - Messages moved to the monthly cold tier are searched too; their bm25 comes from that month's
+          own index, so ranking between hot and cold hits is approximate
 
         Query examples
         ---------------
@@ -6361,11 +7302,14 @@ def build_mcp_server() -> FastMCP:
             FTS5 query string.
         limit : int
             Max results to return.
+        cursor : Optional[str]
+            `next_cursor` from a previous call; resumes after the last (bm25, id) returned.
 
         Returns
         -------
-        list[dict]
-            Each entry: { id, subject, importance, ack_required, created_ts, thread_id, from }
+        dict
+            { result: [...], next_cursor }, each entry: { id, subject, importance, ack_required,
+            created_ts, thread_id, from }. `next_cursor` is null when no further page exists.
 
         Example
         -------
@@ -6396,6 +7340,17 @@ def build_mcp_server() -> FastMCP:
                 pass
         if project.id is None:
             raise ValueError("Project must have an id before searching messages.")
+        after: Optional[tuple[float, int]] = None
+        if cursor:
+            key = _decode_cursor(cursor, "bm25")
+            if len(key) != 2 or not isinstance(key[0], (int, float)) or not isinstance(key[1], int):
+                raise ToolExecutionError(
+                    error_type="INVALID_CURSOR",
+                    message=f"Invalid cursor '{cursor}': malformed (bm25, id) key.",
+                    recoverable=True,
+                    data={"provided": cursor, "expected_kind": "bm25"},
+                )
+            after = (float(key[0]), int(key[1]))
 
         # Sanitize the FTS query - returns None if query can't produce results
         sanitized_query = _sanitize_fts_query(query)
@@ -6403,30 +7358,62 @@ def build_mcp_server() -> FastMCP:
             await ctx.info(f"Search query '{query}' is not searchable, returning empty results.")
             try:
                 from fastmcp.tools.tool import ToolResult
-                return ToolResult(structured_content={"result": []})
+                return ToolResult(structured_content={"result": [], "next_cursor": None})
             except Exception:
                 return []
 
         await ensure_schema()
         rows: list[Any] = []
+        # Keyset on (bm25, id): later pages seek past the last returned key rather than OFFSET-scanning.
+        keyset_clause = "WHERE score > :after_score OR (score = :after_score AND id > :after_id)" if after else ""
+        params: dict[str, Any] = {
+            "project_id": project.id,
+            "query": fts_project_query(sanitized_query, [project.id]),
+            "limit": limit,
+        }
+        if after:
+            params.update({"after_score": after[0], "after_id": after[1]})
         try:
-            async with get_session() as session:
+            async with get_session(readonly=True) as session:
                 result = await session.execute(
                     text(
-                        """
-                        SELECT m.id, m.subject, m.body_md, m.importance, m.ack_required, m.created_ts,
-                               m.thread_id, a.name AS sender_name
-                        FROM fts_messages
-                        JOIN messages m ON fts_messages.rowid = m.id
-                        JOIN agents a ON m.sender_id = a.id
-                        WHERE m.project_id = :project_id AND fts_messages MATCH :query
-                        ORDER BY bm25(fts_messages) ASC
+                        f"""
+                        SELECT * FROM (
+                            SELECT m.id, m.subject, m.importance, m.ack_required, m.created_ts,
+                                   m.thread_id, a.name AS sender_name, bm25(fts_messages) AS score
+                            FROM fts_messages
+                            JOIN messages m ON fts_messages.rowid = m.id
+                            JOIN agents a ON m.sender_id = a.id
+                            WHERE m.project_id = :project_id AND fts_messages MATCH :query
+                        )
+                        {keyset_clause}
+                        ORDER BY score ASC, id ASC
                         LIMIT :limit
                         """
                     ),
-                    {"project_id": project.id, "query": sanitized_query, "limit": limit},
+                    params,
                 )
-                rows = list(result.mappings().all())
+                rows = [dict(row) for row in result.mappings().all()]
+            cold_rows = await query_cold_tier(
+                f"""
+                SELECT * FROM (
+                    SELECT m.id, m.subject, m.importance, m.ack_required, m.created_ts,
+                           m.thread_id, m.sender_name, bm25(f.fts_messages) AS score
+                    FROM {{schema}}.fts_messages f
+                    JOIN {{schema}}.messages m ON f.rowid = m.id
+                    WHERE m.project_id = :project_id AND f.fts_messages MATCH :query
+                )
+                {keyset_clause}
+                ORDER BY score ASC, id ASC
+                LIMIT :limit
+                """,
+                params,
+            )
+            if cold_rows:
+                # Each cold month has its own fts_messages, so its bm25 uses that month's IDF statistics
+                # rather than the hot index's. Scores stay on the same scale (lower is better) and are
+                # merged on the shared (bm25, id) keyset, but cross-tier ordering is approximate.
+                rows = sorted(rows + cold_rows, key=lambda row: (row["score"], row["id"]))[:limit]
         except Exception as fts_err:
             # FTS query syntax error - return empty results instead of crashing
             logger.warning("FTS query failed, returning empty results", extra={"query": sanitized_query, "error": str(fts_err)})
@@ -6456,9 +7443,12 @@ def build_mcp_server() -> FastMCP:
             }
             for row in rows
         ]
+        next_cursor = (
+            _encode_cursor("bm25", [rows[-1]["score"], rows[-1]["id"]]) if rows and len(rows) == limit else None
+        )
         try:
             from fastmcp.tools.tool import ToolResult
-            return ToolResult(structured_content={"result": items})
+            return ToolResult(structured_content={"result": items, "next_cursor": next_cursor})
         except Exception:
             return items
 
@@ -6701,7 +7691,8 @@ def build_mcp_server() -> FastMCP:
         Semantics
         ---------
         - Conflicts are reported if an overlapping active exclusive reservation exists held by another agent
-        - Glob matching is symmetric (`fnmatchcase(a,b)` or `fnmatchcase(b,a)`), including exact matches
+        - Overlap is exact under Git wildmatch semantics: two patterns conflict if some path matches both
+          (e.g. `src/*/api.py` and `src/core/*.py` both cover `src/core/api.py`)
         - When granted, a JSON artifact is written under `file_reservations/<sha1(path)>.json` and the DB is updated
         - TTL must be >= 60 seconds (enforced by the server settings/policy)
 
@@ -6779,14 +7770,6 @@ def build_mcp_server() -> FastMCP:
         agent = await _get_agent(project, agent_name)
         if project.id is None:
             raise ValueError("Project must have an id before reserving file paths.")
-        stale_auto_releases = await _expire_stale_file_reservations(project.id)
-        if stale_auto_releases:
-            summary = ", ".join(
-                f"{status.agent.name}:{status.reservation.path_pattern}"
-                for status in stale_auto_releases[:5]
-            )
-            extra = f" ({summary})" if summary else ""
-            await ctx.info(f"Auto-released {len(stale_auto_releases)} stale file_reservation(s){extra}.")
         project_id = project.id
         # Validate path patterns and warn on suspicious patterns
         for pattern in paths:
@@ -6798,17 +7781,9 @@ def build_mcp_server() -> FastMCP:
         conflicts: list[dict[str, Any]] = []
         archive = await ensure_archive(settings, project.slug)
         async with _archive_write_lock(archive):
-            async with get_session() as session:
-                existing_rows = await session.execute(
-                    select(FileReservation, Agent.name)
-                    .join(Agent, cast(Any, FileReservation.agent_id) == Agent.id)
-                    .where(
-                        cast(Any, FileReservation.project_id) == project_id,
-                        cast(Any, FileReservation.released_ts).is_(None),
-                        cast(Any, FileReservation.expires_ts) > _naive_utc(),
-                    )
-                )
-                existing_reservations = [(row[0], row[1]) for row in existing_rows.all()]
+            reservation_index = await _reservation_index(project_id)
+            checked_at = _naive_utc()
+            created: list[tuple[FileReservation, str]] = []
             payloads: list[dict[str, Any]] = []
             ctx_branch: Optional[str] = None
             ctx_worktree: Optional[str] = None
@@ -6827,40 +7802,18 @@ def build_mcp_server() -> FastMCP:
                         ctx_worktree = None
             except Exception:
                 pass
-            # Build union PathSpec for fast conflict pre-filtering (O(n+m) instead of O(n*m))
-            union_spec = _build_reservation_union_spec(existing_reservations, agent.id, exclusive)
-
-            # Pre-compute which paths might conflict using the union spec
-            potentially_conflicting_paths: set[str] = set()
-            if union_spec is not None:
-                # Normalize paths for matching (same normalization as pattern matching)
-                normalized_paths = [_normalize_pathspec_pattern(p) for p in paths]
-                # Match all normalized paths against union in a single pass
-                matching_normalized = set(union_spec.match_files(normalized_paths))
-                # Build set of original paths that might conflict
-                for orig_path, norm_path in zip(paths, normalized_paths, strict=True):
-                    if norm_path in matching_normalized:
-                        potentially_conflicting_paths.add(orig_path)
-            else:
-                # Fallback: all paths potentially conflict (PathSpec unavailable)
-                potentially_conflicting_paths = set(paths)
-
             for path in paths:
-                conflicting_holders: list[dict[str, Any]] = []
-
-                # Fast path: skip detailed check if path cannot conflict with any reservation
-                if path in potentially_conflicting_paths:
-                    # Slow path: detailed attribution for potentially conflicting paths only
-                    for file_reservation_record, holder_name in existing_reservations:
-                        if _file_reservations_conflict(file_reservation_record, path, exclusive, agent):
-                            conflicting_holders.append(
-                                {
-                                    "agent": holder_name,
-                                    "path_pattern": file_reservation_record.path_pattern,
-                                    "exclusive": file_reservation_record.exclusive,
-                                    "expires_ts": _iso(file_reservation_record.expires_ts),
-                                }
-                            )
+                conflicting_holders = [
+                    {
+                        "agent": holder_name,
+                        "path_pattern": file_reservation_record.path_pattern,
+                        "exclusive": file_reservation_record.exclusive,
+                        "expires_ts": _iso(file_reservation_record.expires_ts),
+                    }
+                    for file_reservation_record, holder_name in reservation_index.conflicts(
+                        path, exclusive, agent, now=checked_at
+                    )
+                ]
 
                 if conflicting_holders:
                     # Advisory model: still grant the file_reservation but surface conflicts
@@ -6883,7 +7836,8 @@ def build_mcp_server() -> FastMCP:
                         "expires_ts": _iso(file_reservation.expires_ts),
                     }
                 )
-                existing_reservations.append((file_reservation, agent.name))
+                created.append((file_reservation, agent.name))
+            await _adopt_reservation_grants(project_id, reservation_index, created)
             if payloads:
                 await write_file_reservation_records(archive, payloads)
         await ctx.info(f"Issued {len(granted)} file_reservations for '{agent.name}'. Conflicts: {len(conflicts)}")
@@ -7664,7 +8618,7 @@ def build_mcp_server() -> FastMCP:
                             LIMIT :limit
                             """
                         ).bindparams(bindparam("proj_ids", expanding=True)),
-                        {"proj_ids": proj_ids, "query": sanitized_query, "limit": limit},
+                        {"proj_ids": proj_ids, "query": fts_project_query(sanitized_query, proj_ids), "limit": limit},
                     )
                     rows = list(result.mappings().all())
                 except Exception as fts_err:
@@ -8217,12 +9171,32 @@ def build_mcp_server() -> FastMCP:
 
     @mcp.resource("resource://tooling/metrics", mime_type="application/json")
     def tooling_metrics_resource() -> dict[str, Any]:
-        """Expose aggregated tool call/error counts for analysis."""
+        """Expose aggregated tool call/error counts, archive maintenance and object cache stats."""
         return {
             "generated_at": _iso(datetime.now(timezone.utc)),
             "tools": _tool_metrics_snapshot(),
+            "archive_maintenance": archive_maintenance_stats(),
+            "archive_object_cache": archive_object_cache_stats(),
         }
 
+    @mcp.resource("resource://tooling/queries", mime_type="application/json")
+    def tooling_queries_resource() -> dict[str, Any]:
+        """Per-statement latency profile (count, total, p50/p95/max, EXPLAIN on first slow hit).
+
+        Populated process-wide while INSTRUMENTATION_ENABLED is true; statements are
+        fingerprinted with literals stripped and sorted by total time.
+        """
+        profiler = get_query_profiler()
+        payload: dict[str, Any] = {
+            "generated_at": _iso(datetime.now(timezone.utc)),
+            "enabled": profiler is not None,
+        }
+        if profiler is None:
+            payload.update({"slow_query_ms": None, "statements": [], "dropped_fingerprints": 0})
+        else:
+            payload.update(profiler.snapshot())
+        return payload
+
     @mcp.resource("resource://tooling/locks", mime_type="application/json")
     def tooling_locks_resource() -> dict[str, Any]:
         """Return lock metadata from the shared archive storage."""
@@ -8230,6 +9204,16 @@ def build_mcp_server() -> FastMCP:
         settings_local = get_settings()
         return collect_lock_status(settings_local)
 
+    @mcp.resource("resource://tooling/archive_queue", mime_type="application/json")
+    async def tooling_archive_queue_resource() -> dict[str, Any]:
+        """Archive-outbox backlog: queued jobs, failing jobs and how far the Git archive lags the DB."""
+        payload: dict[str, Any] = {
+            "generated_at": _iso(datetime.now(timezone.utc)),
+            "enabled": get_settings().storage.archive_outbox_enabled,
+        }
+        payload.update(await archive_queue_stats())
+        return payload
+
     @mcp.resource("resource://tooling/capabilities/{agent}", mime_type="application/json")
     def tooling_capabilities_resource(agent: str, project: Optional[str] = None) -> dict[str, Any]:
         # Parse query embedded in agent path if present (robust to FastMCP variants)
@@ -8574,13 +9558,22 @@ def build_mcp_server() -> FastMCP:
             async with get_session() as s_auto:
                 rows = await s_auto.execute(select(Project, Message).join(Message, cast(Any, Message.project_id) == Project.id).where(cast(Any, Message.id) == int(message_id)).limit(2))
                 data = rows.all()
+                if not data:
+                    cold = await query_cold_tier(
+                        "SELECT project_id FROM {schema}.messages WHERE id = ?",
+                        (int(message_id),),
+                        message_id=int(message_id),
+                    )
+                    cold_project = await s_auto.get(Project, cold[0]["project_id"]) if len(cold) == 1 else None
+                    if cold_project is not None:
+                        data = [(cold_project,)]
             if len(data) == 1:
                 project_obj = data[0][0]
             else:
                 raise ValueError("project parameter is required for message resource")
         else:
             project_obj = await _get_project_by_identifier(project)
-        message = await _get_message(project_obj, int(message_id))
+        message = await _get_message(project_obj, int(message_id), include_cold=True)
         sender = await _get_agent_by_id(project_obj, message.sender_id)
         payload = _message_to_dict(message, include_body=True)
         payload["from"] = sender.name
@@ -8591,6 +9584,8 @@ def build_mcp_server() -> FastMCP:
         thread_id: str,
         project: Optional[str] = None,
         include_bodies: bool = False,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
     ) -> dict[str, Any]:
         """
         List messages for a thread within a project.
@@ -8608,11 +9603,15 @@ def build_mcp_server() -> FastMCP:
             Project slug or human key (required).
         include_bodies : bool
             Include message bodies if true (default false).
+        limit : Optional[int]
+            Page size; when omitted the whole thread is returned.
+        cursor : Optional[str]
+            `next_cursor` from a previous page; resumes after the last (created_ts, id) returned.
 
         Returns
         -------
         dict
-            { project, thread_id, messages: [{...}] }
+            { project, thread_id, messages: [{...}], next_cursor }
 
         Example
         -------
@@ -8639,8 +9638,14 @@ def build_mcp_server() -> FastMCP:
                 if parsed.get("include_bodies"):
                     val = parsed["include_bodies"][0].strip().lower()
                     include_bodies = val in ("1", "true", "t", "yes", "y")
+                if limit is None and parsed.get("limit"):
+                    with suppress(Exception):
+                        limit = int(parsed["limit"][0])
+                if cursor is None and parsed.get("cursor"):
+                    cursor = parsed["cursor"][0]
             except Exception:
                 pass
+        cursor_key = _decode_ts_cursor(cursor) if cursor else None
 
         # Determine project if omitted by client
         if project is None:
@@ -8689,16 +9694,40 @@ def build_mcp_server() -> FastMCP:
                 select(Message, sender_alias.name)
                 .join(sender_alias, cast(Any, Message.sender_id == sender_alias.id))
                 .where(cast(Any, Message.project_id == project_obj.id), or_(*cast(Any, criteria)))
-                .order_by(asc(cast(Any, Message.created_ts)))
+                .order_by(asc(cast(Any, Message.created_ts)), asc(cast(Any, Message.id)))
             )
+            if cursor_key is not None:
+                stmt = stmt.where(_keyset_after(Message.created_ts, Message.id, cursor_key))
+            if limit is not None and limit > 0:
+                stmt = stmt.limit(limit)
+            if not include_bodies:
+                stmt = _defer_body(stmt)
             result = await session.execute(stmt)
             rows = result.all()
+        # Older parts of the thread may live in the monthly cold tier.
+        cold_sql = "SELECT * FROM {schema}.messages WHERE project_id = ? AND (thread_id = ? OR id = ?)"
+        cold_params: list[Any] = [project_obj.id, thread_id, message_id if message_id is not None else -1]
+        if cursor_key is not None:
+            cold_ts = cursor_key[0].strftime("%Y-%m-%d %H:%M:%S.%f")
+            cold_sql += " AND (created_ts > ? OR (created_ts = ? AND id > ?))"
+            cold_params.extend([cold_ts, cold_ts, cursor_key[1]])
+        cold_sql += " ORDER BY created_ts, id"
+        if limit is not None and limit > 0:
+            cold_sql += f" LIMIT {int(limit)}"
+        cold_rows = await query_cold_tier(cold_sql, tuple(cold_params))
+        if cold_rows:
+            merged = [(_cold_row_to_message(row), row["sender_name"]) for row in cold_rows] + list(rows)
+            merged.sort(key=lambda item: (item[0].created_ts, item[0].id or 0))
+            rows = merged[:limit] if limit is not None and limit > 0 else merged
         messages = []
         for message, sender_name in rows:
             payload = _message_to_dict(message, include_body=include_bodies)
             payload["from"] = sender_name
             messages.append(payload)
-        return {"project": project_obj.human_key, "thread_id": thread_id, "messages": messages}
+        next_cursor = (
+            _encode_ts_cursor(messages[-1]) if limit is not None and limit > 0 and len(messages) == limit else None
+        )
+        return {"project": project_obj.human_key, "thread_id": thread_id, "messages": messages, "next_cursor": next_cursor}
 
     @mcp.resource(
         "resource://inbox/{agent}",
@@ -8806,6 +9835,138 @@ def build_mcp_server() -> FastMCP:
             "messages": enriched,
         }
 
+    @mcp.resource("resource://counts/{agent}", mime_type="application/json")
+    async def mailbox_counts_resource(agent: str, project: Optional[str] = None) -> dict[str, Any]:
+        """
+        Badge counters (total, unread, urgent unread, ack pending) for an agent's inbox.
+
+        Served from the transactionally maintained ``mailbox_counters`` table, so
+        polling is a single-row lookup regardless of mailbox size.
+
+        Parameters
+        ----------
+        agent : str
+            Agent name.
+        project : str
+            Project slug or human key (optional when the agent name is unique).
+        """
+        if "?" in agent:
+            name_part, _, qs = agent.partition("?")
+            agent = name_part
+            try:
+                from urllib.parse import parse_qs
+                parsed = parse_qs(qs, keep_blank_values=False)
+                if project is None and parsed.get("project"):
+                    project = parsed["project"][0]
+            except Exception:
+                pass
+
+        if project is None:
+            async with get_session(readonly=True) as s_auto:
+                rows = await s_auto.execute(
+                    select(Project)
+                    .join(Agent, cast(Any, Agent.project_id) == Project.id)
+                    .where(func.lower(Agent.name) == agent.lower())
+                    .limit(2)
+                )
+                projects = [row[0] for row in rows.all()]
+            if len(projects) == 1:
+                project_obj = projects[0]
+            else:
+                raise ValueError("project parameter is required for counts")
+        else:
+            project_obj = await _get_project_by_identifier(project)
+        agent_obj = await _get_agent(project_obj, agent)
+        counts = await _mailbox_counts(project_obj, agent_obj)
+        return {"project": project_obj.human_key, "agent": agent_obj.name, **counts}
+
+    @mcp.resource("resource://inbox-at/{agent}", mime_type="application/json")
+    async def inbox_at_resource(
+        agent: str,
+        project: Optional[str] = None,
+        ts: Optional[str] = None,
+        limit: int = 100,
+    ) -> dict[str, Any]:
+        """
+        Replay an agent's inbox as it stood at a past instant.
+
+        Rebuilt from the append-only ``mailbox_events`` log, so each message carries
+        the read/ack state recorded by then, alongside the file reservations the
+        agent held at that moment.
+
+        Parameters
+        ----------
+        agent : str
+            Agent name.
+        project : str
+            Project slug or human key (optional when the agent name is unique).
+        ts : Optional[str]
+            ISO-8601 instant to replay (default: now). Naive values are UTC.
+        limit : int
+            Maximum number of messages to return (default 100).
+
+        Returns
+        -------
+        dict
+            { project, agent, at, count, messages: [...], file_reservations: [...] }
+
+        Example
+        -------
+        ```json
+        {"jsonrpc":"2.0","id":"r8","method":"resources/read","params":{"uri":"resource://inbox-at/BlueLake?project=/abs/path/backend&ts=2025-10-23T15:00:00Z"}}
+        ```
+        """
+        if "?" in agent:
+            name_part, _, qs = agent.partition("?")
+            agent = name_part
+            try:
+                from urllib.parse import parse_qs
+                parsed = parse_qs(qs, keep_blank_values=False)
+                if project is None and parsed.get("project"):
+                    project = parsed["project"][0]
+                if ts is None and parsed.get("ts"):
+                    ts = parsed["ts"][0]
+                if parsed.get("limit"):
+                    with suppress(Exception):
+                        limit = int(parsed["limit"][0])
+            except Exception:
+                pass
+
+        at = datetime.now(timezone.utc)
+        if ts:
+            parsed_ts = _parse_iso(ts)
+            if parsed_ts is None:
+                raise ValueError(f"Invalid ts '{ts}'; expected ISO-8601 such as 2025-10-23T15:00:00Z")
+            at = parsed_ts if parsed_ts.tzinfo is not None else parsed_ts.replace(tzinfo=timezone.utc)
+
+        if project is None:
+            async with get_session(readonly=True) as s_auto:
+                rows = await s_auto.execute(
+                    select(Project)
+                    .join(Agent, cast(Any, Agent.project_id) == Project.id)
+                    .where(func.lower(Agent.name) == agent.lower())
+                    .limit(2)
+                )
+                projects = [row[0] for row in rows.all()]
+            if len(projects) == 1:
+                project_obj = projects[0]
+            else:
+                raise ValueError("project parameter is required for inbox-at")
+        else:
+            project_obj = await _get_project_by_identifier(project)
+        agent_obj = await _get_agent(project_obj, agent)
+        state = await get_inbox_at(
+            cast(int, project_obj.id), cast(int, agent_obj.id), at, limit=max(1, min(limit, 500))
+        )
+        return {
+            "project": project_obj.human_key,
+            "agent": agent_obj.name,
+            "at": state["at"],
+            "count": len(state["messages"]),
+            "messages": state["messages"],
+            "file_reservations": state["file_reservations"],
+        }
+
     @mcp.resource("resource://views/urgent-unread/{agent}", mime_type="application/json")
     async def urgent_unread_view(agent: str, project: Optional[str] = None, limit: int = 20) -> dict[str, Any]:
         """
@@ -8836,7 +9997,7 @@ def build_mcp_server() -> FastMCP:
                 pass
 
         if project is None:
-            async with get_session() as s_auto:
+            async with get_session(readonly=True) as s_auto:
                 rows = await s_auto.execute(
                     select(Project)
                     .join(Agent, cast(Any, Agent.project_id) == Project.id)
@@ -8853,19 +10014,18 @@ def build_mcp_server() -> FastMCP:
         agent_obj = await _get_agent(project_obj, agent)
         items = await _list_inbox(project_obj, agent_obj, limit, urgent_only=True, include_bodies=False, since_ts=None)
         # Filter unread (no read_ts recorded)
-        unread: list[dict[str, Any]] = []
-        async with get_session() as session:
-            from .models import MessageRecipient  # local import to avoid cycle at top
-
-            for item in items:
+        unread_ids: set[int] = set()
+        if items:
+            async with get_session(readonly=True) as session:
                 result = await session.execute(
-                    select(MessageRecipient.read_ts).where(
-                        cast(Any, MessageRecipient.message_id == item["id"]), cast(Any, MessageRecipient.agent_id == agent_obj.id)
+                    select(InboxEntry.message_id).where(
+                        cast(Any, InboxEntry.agent_id) == agent_obj.id,
+                        cast(Any, InboxEntry.message_id).in_([item["id"] for item in items]),
+                        cast(Any, InboxEntry.read_ts).is_(None),
                     )
                 )
-                read_ts = result.scalar_one_or_none()
-                if read_ts is None:
-                    unread.append(item)
+                unread_ids = {int(row[0]) for row in result.all()}
+        unread = [item for item in items if item["id"] in unread_ids]
         return {"project": project_obj.human_key, "agent": agent_obj.name, "count": len(unread), "messages": unread[:limit]}
 
     @mcp.resource("resource://views/ack-required/{agent}", mime_type="application/json")
@@ -8898,7 +10058,7 @@ def build_mcp_server() -> FastMCP:
                 pass
 
         if project is None:
-            async with get_session() as s_auto:
+            async with get_session(readonly=True) as s_auto:
                 rows = await s_auto.execute(
                     select(Project)
                     .join(Agent, cast(Any, Agent.project_id) == Project.id)
@@ -8917,24 +10077,33 @@ def build_mcp_server() -> FastMCP:
             raise ValueError("Project/agent IDs must exist")
         await ensure_schema()
         out: list[dict[str, Any]] = []
-        async with get_session() as session:
+        async with get_session(readonly=True) as session:
             rows = await session.execute(
-                select(Message, MessageRecipient.kind)
-                .join(MessageRecipient, cast(Any, MessageRecipient.message_id == Message.id))
-                .where(
-                    cast(Any, Message.project_id) == project_obj.id,
-                    cast(Any, MessageRecipient.agent_id == agent_obj.id),
-                    cast(Any, Message.ack_required).is_(True),
-                    cast(Any, MessageRecipient.ack_ts).is_(None),
+                _defer_body(
+                    select(Message, MessageRecipient.kind)
+                    .join(MessageRecipient, cast(Any, MessageRecipient.message_id == Message.id))
+                    .where(
+                        cast(Any, Message.project_id) == project_obj.id,
+                        cast(Any, MessageRecipient.agent_id == agent_obj.id),
+                        cast(Any, Message.ack_required).is_(True),
+                        cast(Any, MessageRecipient.ack_ts).is_(None),
+                    )
+                    .order_by(desc(cast(Any, Message.created_ts)))
+                    .limit(limit)
                 )
-                .order_by(desc(cast(Any, Message.created_ts)))
-                .limit(limit)
             )
             for msg, kind in rows.all():
                 payload = _message_to_dict(msg, include_body=False)
                 payload["kind"] = kind
                 out.append(payload)
-        return {"project": project_obj.human_key, "agent": agent_obj.name, "count": len(out), "messages": out}
+        counts = await _mailbox_counts(project_obj, agent_obj)
+        return {
+            "project": project_obj.human_key,
+            "agent": agent_obj.name,
+            "count": len(out),
+            "pending_total": counts["ack_pending"],
+            "messages": out,
+        }
 
     @mcp.resource("resource://views/acks-stale/{agent}", mime_type="application/json")
     async def acks_stale_view(
@@ -8976,7 +10145,7 @@ def build_mcp_server() -> FastMCP:
                 pass
 
         if project is None:
-            async with get_session() as s_auto:
+            async with get_session(readonly=True) as s_auto:
                 rows = await s_auto.execute(
                     select(Project)
                     .join(Agent, cast(Any, Agent.project_id) == Project.id)
@@ -8997,18 +10166,20 @@ def build_mcp_server() -> FastMCP:
         ttl = int(ttl_seconds) if ttl_seconds is not None else get_settings().ack_ttl_seconds
         now = datetime.now(timezone.utc)
         out: list[dict[str, Any]] = []
-        async with get_session() as session:
+        async with get_session(readonly=True) as session:
             rows = await session.execute(
-                select(Message, MessageRecipient.kind, MessageRecipient.read_ts)
-                .join(MessageRecipient, cast(Any, MessageRecipient.message_id == Message.id))
-                .where(
-                    cast(Any, Message.project_id) == project_obj.id,
-                    cast(Any, MessageRecipient.agent_id == agent_obj.id),
-                    cast(Any, Message.ack_required).is_(True),
-                    cast(Any, MessageRecipient.ack_ts).is_(None),
+                _defer_body(
+                    select(Message, MessageRecipient.kind, MessageRecipient.read_ts)
+                    .join(MessageRecipient, cast(Any, MessageRecipient.message_id == Message.id))
+                    .where(
+                        cast(Any, Message.project_id) == project_obj.id,
+                        cast(Any, MessageRecipient.agent_id == agent_obj.id),
+                        cast(Any, Message.ack_required).is_(True),
+                        cast(Any, MessageRecipient.ack_ts).is_(None),
+                    )
+                    .order_by(asc(cast(Any, Message.created_ts)))
+                    .limit(limit * 5)
                 )
-                .order_by(asc(cast(Any, Message.created_ts)))
-                .limit(limit * 5)
             )
             for msg, kind, read_ts in rows.all():
                 # Coerce potential naive datetimes from SQLite to UTC for arithmetic
@@ -9024,11 +10195,13 @@ def build_mcp_server() -> FastMCP:
                     out.append(payload)
                     if len(out) >= limit:
                         break
+        counts = await _mailbox_counts(project_obj, agent_obj)
         return {
             "project": project_obj.human_key,
             "agent": agent_obj.name,
             "ttl_seconds": ttl,
             "count": len(out),
+            "pending_total": counts["ack_pending"],
             "messages": out,
         }
 
@@ -9059,7 +10232,7 @@ def build_mcp_server() -> FastMCP:
                 pass
 
         if project is None:
-            async with get_session() as s_auto:
+            async with get_session(readonly=True) as s_auto:
                 rows = await s_auto.execute(
                     select(Project)
                     .join(Agent, cast(Any, Agent.project_id) == Project.id)
@@ -9079,18 +10252,20 @@ def build_mcp_server() -> FastMCP:
         await ensure_schema()
         cutoff = datetime.now(timezone.utc) - timedelta(minutes=max(1, ttl_minutes))
         out: list[dict[str, Any]] = []
-        async with get_session() as session:
+        async with get_session(readonly=True) as session:
             rows = await session.execute(
-                select(Message, MessageRecipient.kind)
-                .join(MessageRecipient, cast(Any, MessageRecipient.message_id == Message.id))
-                .where(
-                    cast(Any, Message.project_id) == project_obj.id,
-                    cast(Any, MessageRecipient.agent_id == agent_obj.id),
-                    cast(Any, Message.ack_required).is_(True),
-                    cast(Any, MessageRecipient.ack_ts).is_(None),
+                _defer_body(
+                    select(Message, MessageRecipient.kind)
+                    .join(MessageRecipient, cast(Any, MessageRecipient.message_id == Message.id))
+                    .where(
+                        cast(Any, Message.project_id) == project_obj.id,
+                        cast(Any, MessageRecipient.agent_id == agent_obj.id),
+                        cast(Any, Message.ack_required).is_(True),
+                        cast(Any, MessageRecipient.ack_ts).is_(None),
+                    )
+                    .order_by(asc(cast(Any, Message.created_ts)))
+                    .limit(limit * 5)
                 )
-                .order_by(asc(cast(Any, Message.created_ts)))
-                .limit(limit * 5)
             )
             for msg, kind in rows.all():
                 created = msg.created_ts
@@ -9232,8 +10407,12 @@ def build_mcp_server() -> FastMCP:
         limit: int = 20,
         include_bodies: bool = False,
         since_ts: Optional[str] = None,
+        cursor: Optional[str] = None,
     ) -> dict[str, Any]:
-        """List messages sent by the agent, enriched with commit metadata for canonical files."""
+        """List messages sent by the agent, enriched with commit metadata for canonical files.
+
+        Pages newest-first; pass the returned `next_cursor` as `cursor` to continue.
+        """
         # Support toolkits that incorrectly pass query in the template segment
         if "?" in agent:
             name_part, _, qs = agent.partition("?")
@@ -9251,14 +10430,18 @@ def build_mcp_server() -> FastMCP:
                     include_bodies = parsed["include_bodies"][0].lower() in {"1","true","t","yes","y"}
                 if parsed.get("since_ts"):
                     since_ts = parsed["since_ts"][0]
+                if cursor is None and parsed.get("cursor"):
+                    cursor = parsed["cursor"][0]
             except Exception:
                 pass
         """List messages sent by the agent, enriched with commit metadata for canonical files."""
         if project is None:
             raise ValueError("project parameter is required for outbox resource")
+        cursor_key = _decode_ts_cursor(cursor) if cursor else None
         project_obj = await _get_project_by_identifier(project)
         agent_obj = await _get_agent(project_obj, agent)
-        items = await _list_outbox(project_obj, agent_obj, limit, include_bodies, since_ts)
+        items = await _list_outbox(project_obj, agent_obj, limit, include_bodies, since_ts, cursor=cursor_key)
+        next_cursor = _encode_ts_cursor(items[-1]) if items and len(items) == limit else None
         enriched: list[dict[str, Any]] = []
         for item in items:
             try:
@@ -9269,7 +10452,13 @@ def build_mcp_server() -> FastMCP:
             except Exception:
                 pass
             enriched.append(item)
-        return {"project": project_obj.human_key, "agent": agent_obj.name, "count": len(enriched), "messages": enriched}
+        return {
+            "project": project_obj.human_key,
+            "agent": agent_obj.name,
+            "count": len(enriched),
+            "messages": enriched,
+            "next_cursor": next_cursor,
+        }
 
     # No explicit output-schema transform; the tool returns ToolResult with {"result": ...}
 
@@ -44,10 +44,28 @@ from sqlalchemy.sql import ColumnElement
 
 from .app import _sanitize_fts_query, build_mcp_server
 from .config import get_settings
-from .db import ensure_schema, get_session
+from .db import (
+    archive_queue_stats,
+    ensure_schema,
+    fts_project_query,
+    get_cold_tier_dir,
+    get_session,
+    list_cold_partitions,
+    move_messages_to_cold_tier,
+    rebuild_message_archive_refs,
+)
 from .guard import install_guard as install_guard_script, uninstall_guard as uninstall_guard_script
 from .http import build_http_app
-from .models import Agent, FileReservation, Message, MessageRecipient, Product, ProductProjectLink, Project
+from .models import (
+    Agent,
+    FileReservation,
+    MailboxCounter,
+    Message,
+    MessageRecipient,
+    Product,
+    ProductProjectLink,
+    Project,
+)
 from .share import (
     DEFAULT_CHUNK_SIZE,
     DEFAULT_CHUNK_THRESHOLD,
@@ -66,7 +84,13 @@ from .share import (
     sign_manifest,
     summarize_snapshot,
 )
-from .storage import ensure_archive
+from .storage import (
+    archive_repo_root,
+    collect_message_archive_refs,
+    ensure_archive,
+    run_archive_maintenance,
+    split_shared_archive,
+)
 from .utils import slugify
 
 # Suppress annoying bleach CSS sanitizer warning from dependencies
@@ -377,7 +401,7 @@ def products_search(
                         LIMIT :limit
                         """
                     ).bindparams(bindparam("proj_ids", expanding=True)),
-                    {"proj_ids": proj_ids, "query": sanitized_query, "limit": limit},
+                    {"proj_ids": proj_ids, "query": fts_project_query(sanitized_query, proj_ids), "limit": limit},
                 )
                 return [dict(row) for row in result.mappings().all()]
             except Exception:
@@ -2230,6 +2254,197 @@ def archive_list_states(
     console.print(f"[dim]Archives live under {archive_dir}. Restore with `mcp-agent-mail archive restore <file>`.[/]")
 
 
+@archive_app.command(
+    "cold-tier",
+    help="Move messages older than N days into monthly cold-tier SQLite files and list the resulting partitions.",
+)
+def archive_cold_tier(
+    older_than_days: Annotated[
+        Optional[int],
+        typer.Option(
+            "--older-than-days",
+            "-d",
+            min=0,
+            help="Age cutoff in days (defaults to DATABASE_COLD_TIER_AFTER_DAYS; 0 only lists partitions).",
+        ),
+    ] = None,
+    json_output: Annotated[bool, typer.Option("--json", help="Emit JSON instead of a table")] = False,
+) -> None:
+    async def _run() -> tuple[dict[str, int], list[Any]]:
+        moved = await move_messages_to_cold_tier(older_than_days)
+        return moved, await list_cold_partitions()
+
+    try:
+        moved, partitions = asyncio.run(_run())
+    except ValueError as exc:
+        console.print(f"[red]{exc}[/]")
+        raise typer.Exit(code=1) from exc
+    if json_output:
+        payload = {
+            "moved": moved,
+            "partitions": [
+                {
+                    "month": part.month,
+                    "path": str(part.path),
+                    "message_count": part.message_count,
+                    "min_id": part.min_id,
+                    "max_id": part.max_id,
+                }
+                for part in partitions
+            ],
+        }
+        json.dump(payload, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+        return
+    if moved:
+        console.print(f"[green]✓ Moved {sum(moved.values())} message(s) into {len(moved)} cold partition(s).[/]")
+    else:
+        console.print("[dim]No messages past the cutoff; nothing moved.[/]")
+    if not partitions:
+        console.print("[yellow]No cold-tier partitions yet.[/]")
+        return
+    table = Table(title="Cold-tier partitions", show_lines=False)
+    table.add_column("Month")
+    table.add_column("Messages", justify="right")
+    table.add_column("Id range")
+    table.add_column("Moved now", justify="right")
+    for part in partitions:
+        table.add_row(part.month, str(part.message_count), f"{part.min_id}-{part.max_id}", str(moved.get(part.month, "")))
+    console.print(table)
+    console.print(f"[dim]Partitions live under {get_cold_tier_dir()}.[/]")
+
+
+@archive_app.command(
+    "split-projects",
+    help="Split the shared archive repo into one Git repo per project (for STORAGE_LAYOUT=per-project).",
+)
+def archive_split_projects(
+    projects: Annotated[
+        Optional[list[str]],
+        typer.Option("--project", "-p", help="Project slug to split (repeatable; defaults to every project)."),
+    ] = None,
+    json_output: Annotated[bool, typer.Option("--json", help="Emit JSON instead of a table")] = False,
+) -> None:
+    settings = get_settings()
+    try:
+        summary = asyncio.run(split_shared_archive(settings, projects or None))
+    except (OSError, TypeError, ValueError) as exc:
+        console.print(f"[red]{exc}[/]")
+        raise typer.Exit(code=1) from exc
+    if json_output:
+        json.dump(summary, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        if summary["split"]:
+            table = Table(title="Per-project archive repos", show_lines=False)
+            table.add_column("Project")
+            table.add_column("Commits", justify="right")
+            table.add_column("Path")
+            for entry in summary["split"]:
+                table.add_row(entry["slug"], str(entry["commits"]), entry["path"])
+            console.print(table)
+        else:
+            console.print("[dim]No projects split.[/]")
+        for slug in summary["skipped"]:
+            console.print(f"[yellow]Skipped {slug}: a per-project repo already exists.[/]")
+        for slug, error in summary["errors"].items():
+            console.print(f"[red]Failed to split {slug}: {error}[/]")
+        if summary["split"] and settings.storage.layout != "per-project":
+            console.print("[dim]Set STORAGE_LAYOUT=per-project to start writing to the new repos.[/]")
+    if summary["errors"]:
+        raise typer.Exit(code=1)
+
+
+@archive_app.command(
+    "rebuild-refs",
+    help="Rebuild the message -> archive path/commit index (message_archive_refs) from the Git archive.",
+)
+def archive_rebuild_refs(
+    projects: Annotated[
+        Optional[list[str]],
+        typer.Option("--project", "-p", help="Project slug or human key (repeatable; defaults to every project)."),
+    ] = None,
+    json_output: Annotated[bool, typer.Option("--json", help="Emit JSON instead of a table")] = False,
+) -> None:
+    async def _run() -> dict[str, dict[str, int]]:
+        await ensure_schema()
+        async with get_session() as session:
+            rows = (await session.execute(text("SELECT id, slug, human_key FROM projects ORDER BY slug"))).all()
+        wanted = set(projects or [])
+        settings = get_settings()
+        summary: dict[str, dict[str, int]] = {}
+        for project_id, slug, human_key in rows:
+            if wanted and slug not in wanted and human_key not in wanted:
+                continue
+            archive = await ensure_archive(settings, slug)
+            refs = await collect_message_archive_refs(archive)
+            await rebuild_message_archive_refs(
+                int(project_id), ((mid, ref.path, ref.commit_sha) for mid, ref in refs.items())
+            )
+            summary[slug] = {
+                "messages": len(refs),
+                "uncommitted": sum(1 for ref in refs.values() if ref.commit_sha is None),
+            }
+        return summary
+
+    summary = asyncio.run(_run())
+    if json_output:
+        json.dump(summary, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+        return
+    if not summary:
+        console.print("[yellow]No matching projects.[/]")
+        return
+    table = Table(title="Message archive refs", show_lines=False)
+    table.add_column("Project")
+    table.add_column("Messages", justify="right")
+    table.add_column("Uncommitted", justify="right")
+    for slug, counts in summary.items():
+        table.add_row(slug, str(counts["messages"]), str(counts["uncommitted"]))
+    console.print(table)
+
+
+@archive_app.command(
+    "maintain",
+    help="Write commit-graphs (with changed-path Bloom filters) and repack archive repos that are due.",
+)
+def archive_maintain(
+    force: Annotated[
+        bool, typer.Option("--force", help="Maintain every repo, even if few commits landed since the last run.")
+    ] = False,
+    projects: Annotated[
+        Optional[list[str]],
+        typer.Option("--project", "-p", help="Limit per-project layouts to these project slugs (repeatable)."),
+    ] = None,
+    json_output: Annotated[bool, typer.Option("--json", help="Emit JSON instead of a table")] = False,
+) -> None:
+    settings = get_settings()
+    try:
+        results = asyncio.run(
+            run_archive_maintenance(settings, min_new_commits=0 if force else None, slugs=projects or None)
+        )
+    except (OSError, subprocess.CalledProcessError) as exc:
+        console.print(f"[red]Archive maintenance failed: {exc}[/]")
+        raise typer.Exit(code=1) from exc
+    if json_output:
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+        return
+    if not results:
+        console.print(
+            f"[dim]No archive repo has {settings.storage.maintenance_min_commits}+ new commits; use --force to run anyway.[/]"
+        )
+        return
+    table = Table(title="Archive maintenance", show_lines=False)
+    table.add_column("Repo")
+    table.add_column("Commits", justify="right")
+    table.add_column("New", justify="right")
+    table.add_column("Duration", justify="right")
+    for result in results:
+        table.add_row(result["repo"], str(result["commits"]), str(result["new_commits"]), f"{result['duration_ms']} ms")
+    console.print(table)
+
+
 @archive_app.command(
     "restore",
     help="Restore a previously saved mailbox state. Existing DB/storage are backed up automatically.",
@@ -2676,7 +2891,7 @@ def amctl_env(
     # Compute cache key and artifact dir
     settings = get_settings()
     cache_key = f"am-cache-{project_uid}-{agent_name}-{branch}"
-    artifact_dir = Path(settings.storage.root).expanduser().resolve() / "projects" / slug / "artifacts" / agent_name / branch
+    artifact_dir = archive_repo_root(settings, slug) / "projects" / slug / "artifacts" / agent_name / branch
     # Print as KEY=VALUE lines
     console.print(f"SLUG={slug}")
     console.print(f"PROJECT_UID={project_uid}")
@@ -3547,13 +3762,15 @@ def acks_pending(
 ) -> None:
     """List messages that require acknowledgement and are still pending."""
 
-    async def _run() -> tuple[Project, Agent, list[tuple[Message, Any, Any, str]]]:
+    async def _run() -> tuple[Project, Agent, list[tuple[Message, Any, Any, str]], int]:
         project_record = await _get_project_record(project)
         agent_record = await _get_agent_record(project_record, agent)
         if project_record.id is None or agent_record.id is None:
             raise ValueError("Project and agent must have IDs")
         await ensure_schema()
         async with get_session() as session:
+            counter = await session.get(MailboxCounter, (project_record.id, agent_record.id))
+            pending_total = int(counter.ack_pending) if counter else 0
             stmt = (
                 select(Message, MessageRecipient.read_ts, MessageRecipient.ack_ts, MessageRecipient.kind)
                 .join(MessageRecipient, cast(ColumnElement[bool], MessageRecipient.message_id == Message.id))
@@ -3569,14 +3786,18 @@ def acks_pending(
                 .limit(limit)
             )
             rows = [(row[0], row[1], row[2], row[3]) for row in (await session.execute(stmt)).all()]
-        return project_record, agent_record, rows
+        return project_record, agent_record, rows, pending_total
 
     try:
-        project_record, agent_record, rows = asyncio.run(_run())
+        project_record, agent_record, rows, pending_total = asyncio.run(_run())
     except ValueError as exc:
         raise typer.BadParameter(str(exc)) from exc
 
-    table = Table(title=f"Pending ACKs for {agent_record.name} ({project_record.human_key})", show_lines=False)
+    table = Table(
+        title=f"Pending ACKs for {agent_record.name} ({project_record.human_key})",
+        caption=f"{pending_total} pending in total",
+        show_lines=False,
+    )
     table.add_column("Msg ID")
     table.add_column("Thread")
     table.add_column("Subject")
@@ -4150,7 +4371,7 @@ def doctor_check(
     Checks:
     - Lock files (stale archive/commit locks)
     - Database integrity (FK constraints, FTS index, orphaned records)
-    - Archive-DB synchronization
+    - Archive-DB synchronization (including archive-outbox lag)
     - File reservations (expired, conflicts)
     - Attachments (orphaned files/manifests)
     """
@@ -4246,7 +4467,7 @@ def doctor_check(
             fts_query = text("""
                 SELECT
                     (SELECT COUNT(*) FROM messages) as msg_count,
-                    (SELECT COUNT(*) FROM fts_messages) as fts_count
+                    (SELECT COUNT(*) FROM fts_messages_docsize) as fts_count
             """)
             result = await session.execute(fts_query)
             counts = result.fetchone()
@@ -4266,6 +4487,49 @@ def doctor_check(
                         repair_available=True,
                     ))
 
+            # Check 4b: Denormalized inbox index consistency
+            inbox_query = text("""
+                SELECT
+                    (SELECT COUNT(*) FROM message_recipients) as recipient_count,
+                    (SELECT COUNT(*) FROM inbox_entries) as entry_count
+            """)
+            result = await session.execute(inbox_query)
+            inbox_counts = result.fetchone()
+            if inbox_counts:
+                recipient_count, entry_count = inbox_counts
+                if recipient_count == entry_count:
+                    results.append(DiagnosticResult(
+                        name="Inbox Index",
+                        status="ok",
+                        message=f"Inbox index synchronized ({entry_count} entries)",
+                    ))
+                else:
+                    results.append(DiagnosticResult(
+                        name="Inbox Index",
+                        status="warning",
+                        message=f"Inbox index mismatch: {recipient_count} recipients vs {entry_count} inbox entries",
+                        repair_available=True,
+                    ))
+
+            # Check 4c: Archive outbox lag
+            queue = await archive_queue_stats()
+            if queue["depth"] == 0:
+                results.append(DiagnosticResult(
+                    name="Archive Queue",
+                    status="ok",
+                    message="Git archive is caught up with the database",
+                ))
+            else:
+                results.append(DiagnosticResult(
+                    name="Archive Queue",
+                    status="warning" if queue["failing"] else "info",
+                    message=(
+                        f"{queue['depth']} message(s) awaiting archive write, "
+                        f"lag {queue['lag_seconds']:.0f}s, {queue['failing']} failing"
+                    ),
+                    details=[f"{slug}: {count}" for slug, count in queue["projects"].items()],
+                ))
+
             # Check 5: Expired file reservations
             # Use naive UTC datetime for consistency with how FileReservation stores timestamps
             now = datetime.now(timezone.utc).replace(tzinfo=None)
@@ -4404,7 +4668,7 @@ def doctor_repair(
     """Repair common mailbox issues.
 
     Semi-automatic mode (default):
-    - Auto-fixes safe issues: stale locks, expired file reservations
+    - Auto-fixes safe issues: stale locks, expired file reservations, drifted inbox/FTS indexes
     - Prompts for confirmation on data-affecting repairs
 
     Creates a backup before any destructive operation.
@@ -4498,6 +4762,49 @@ def doctor_repair(
                     console.print("  [dim]No expired reservations to release[/dim]")
                 repair_results["safe_repairs"].append({"action": "release_expired", "released": released})
 
+        # 2c: Rebuild the denormalized inbox index when it drifted from message_recipients
+        async with get_session() as session:
+            inbox_counts = (
+                await session.execute(
+                    text(
+                        "SELECT (SELECT COUNT(*) FROM message_recipients), (SELECT COUNT(*) FROM inbox_entries)"
+                    )
+                )
+            ).fetchone()
+        recipient_count, entry_count = (int(inbox_counts[0]), int(inbox_counts[1])) if inbox_counts else (0, 0)
+        if recipient_count == entry_count:
+            console.print("  [dim]Inbox index already synchronized[/dim]")
+        elif dry_run:
+            console.print(f"  [dim]Would rebuild inbox index ({entry_count} -> {recipient_count} entries)[/dim]")
+            repair_results["safe_repairs"].append({"action": "rebuild_inbox_index", "dry_run": True})
+        else:
+            from .db import rebuild_inbox_entries, rebuild_mailbox_counters
+
+            rebuilt = await rebuild_inbox_entries()
+            await rebuild_mailbox_counters()
+            console.print(f"  [green]Rebuilt inbox index ({rebuilt} entries) and mailbox counters[/green]")
+            repair_results["safe_repairs"].append({"action": "rebuild_inbox_index", "entries": rebuilt})
+
+        # 2d: Rebuild the external-content FTS index when it drifted from messages
+        async with get_session() as session:
+            fts_counts = (
+                await session.execute(
+                    text("SELECT (SELECT COUNT(*) FROM messages), (SELECT COUNT(*) FROM fts_messages_docsize)")
+                )
+            ).fetchone()
+        msg_count, fts_count = (int(fts_counts[0]), int(fts_counts[1])) if fts_counts else (0, 0)
+        if msg_count == fts_count:
+            console.print("  [dim]FTS index already synchronized[/dim]")
+        elif dry_run:
+            console.print(f"  [dim]Would rebuild FTS index ({fts_count} -> {msg_count} messages)[/dim]")
+            repair_results["safe_repairs"].append({"action": "rebuild_fts_index", "dry_run": True})
+        else:
+            from .db import rebuild_fts_index
+
+            indexed = await rebuild_fts_index()
+            console.print(f"  [green]Rebuilt FTS index ({indexed} messages)[/green]")
+            repair_results["safe_repairs"].append({"action": "rebuild_fts_index", "messages": indexed})
+
         # Step 3: Data-affecting repairs (require confirmation)
         console.print("\n[bold]Data Repairs (require confirmation):[/bold]")
 
@@ -4550,6 +4857,120 @@ def doctor_repair(
         console.print(f"  [red]Errors: {error_count}[/red]")
 
 
+@doctor_app.command("queries")
+def doctor_queries(
+    project: Annotated[
+        Optional[str],
+        typer.Argument(help="Project slug or human key to probe locally (optional - probes all if not specified)"),
+    ] = None,
+    limit: int = typer.Option(20, "--limit", "-l", help="Number of statements to show"),
+    json_output: bool = typer.Option(False, "--json", help="Output as JSON"),
+) -> None:
+    """Report per-statement query latency and plans.
+
+    Prefers the running server's resource://tooling/queries profile (requires
+    INSTRUMENTATION_ENABLED=true there). Otherwise probes the inbox, outbox and
+    counter read paths locally with every statement explained.
+    """
+    settings = get_settings()
+    server_url = f"http://{settings.http.host}:{settings.http.port}{settings.http.path}"
+    bearer = settings.http.bearer_token or ""
+    report: dict[str, Any] = {}
+    try:
+        with httpx.Client(timeout=5.0) as client:
+            headers = {}
+            if bearer:
+                headers["Authorization"] = f"Bearer {bearer}"
+            req = {
+                "jsonrpc": "2.0",
+                "id": "cli-doctor-queries",
+                "method": "resources/read",
+                "params": {"uri": "resource://tooling/queries"},
+            }
+            resp = client.post(server_url, json=req, headers=headers)
+            contents = (((resp.json() or {}).get("result") or {}).get("contents")) or []
+            if contents:
+                data = json.loads(contents[0].get("text") or "{}")
+                if data.get("enabled"):
+                    report = {**data, "source": "server"}
+    except Exception:
+        report = {}
+
+    if not report:
+
+        async def _probe() -> dict[str, Any]:
+            from .app import _list_inbox, _list_outbox, _mailbox_counts
+            from .db import disable_query_profiler, enable_query_profiler
+
+            await ensure_schema()
+            targets: list[tuple[Project, list[Agent]]] = []
+            async with get_session() as session:
+                stmt = select(Project)
+                if project:
+                    stmt = stmt.where(
+                        or_(
+                            cast(ColumnElement[bool], Project.slug == slugify(project)),
+                            cast(ColumnElement[bool], Project.human_key == project),
+                        )
+                    )
+                for project_obj in (await session.execute(stmt)).scalars().all():
+                    agents = (
+                        await session.execute(
+                            select(Agent).where(cast(ColumnElement[bool], Agent.project_id == project_obj.id)).limit(5)
+                        )
+                    ).scalars().all()
+                    targets.append((project_obj, list(agents)))
+            # Threshold 0 so every fingerprint gets its EXPLAIN QUERY PLAN captured.
+            profiler = enable_query_profiler(slow_ms=0.0)
+            profiler.reset()
+            try:
+                for project_obj, agents in targets:
+                    for agent in agents:
+                        await _list_inbox(project_obj, agent, 20, False, False, None)
+                        await _list_outbox(project_obj, agent, 20, False, None)
+                        await _mailbox_counts(project_obj, agent)
+                return {**profiler.snapshot(), "source": "local-probe"}
+            finally:
+                disable_query_profiler()
+
+        report = asyncio.run(_probe())
+
+    statements = list(report.get("statements") or [])[: max(1, limit)]
+    report["statements"] = statements
+    if json_output:
+        console.print_json(json.dumps(report))
+        return
+    if not statements:
+        console.print("[dim]No statements recorded[/dim]")
+        return
+
+    table = Table(title=f"Query profile ({report.get('source')})")
+    table.add_column("Statement", overflow="fold")
+    table.add_column("Count", justify="right")
+    table.add_column("Total ms", justify="right")
+    table.add_column("p50", justify="right")
+    table.add_column("p95", justify="right")
+    table.add_column("Max", justify="right")
+    table.add_column("Plan")
+    for item in statements:
+        plan = "; ".join(item.get("explain") or []) or "[dim]-[/dim]"
+        if item.get("full_scan"):
+            plan = f"[red]{plan}[/red]"
+        table.add_row(
+            str(item.get("fingerprint", ""))[:160],
+            str(item.get("count", 0)),
+            f"{item.get('total_ms', 0.0):.1f}",
+            f"{item.get('p50_ms', 0.0):.2f}",
+            f"{item.get('p95_ms', 0.0):.2f}",
+            f"{item.get('max_ms', 0.0):.2f}",
+            plan,
+        )
+    console.print(table)
+    scans = sum(1 for item in statements if item.get("full_scan"))
+    if scans:
+        console.print(f"[yellow]{scans} statement(s) use a full table scan[/yellow]")
+
+
 @doctor_app.command("backups")
 def doctor_backups(
     json_output: bool = typer.Option(False, "--json", help="Output as JSON"),
@@ -68,6 +68,18 @@ class DatabaseSettings:
 
     url: str
     echo: bool
+    # Write path: "direct" (one transaction per call) | "group" (single writer task, group commit)
+    write_mode: str
+    group_commit_max_batch: int
+    group_commit_max_delay_ms: int
+    # Dedicated read-only SQLite engine (query_only) used by get_session(readonly=True)
+    read_engine_enabled: bool
+    read_pool_size: int
+    read_mmap_size_bytes: int
+    read_cache_size_kb: int
+    # Cold tier: messages older than this many days move to monthly attached archive DBs (0 disables)
+    cold_tier_after_days: int
+    cold_tier_dir: str
 
 
 @dataclass(slots=True, frozen=True)
@@ -80,6 +92,17 @@ class StorageSettings:
     inline_image_max_bytes: int
     convert_images: bool
     keep_original_images: bool
+    commit_mode: str  # strict | coalesce
+    commit_backend: str  # gitpython | fast-import
+    commit_coalesce_window_ms: int
+    commit_coalesce_max_entries: int
+    archive_outbox_enabled: bool
+    layout: str  # shared | per-project
+    mailbox_copies: str  # full | stub
+    maintenance_enabled: bool
+    maintenance_interval_seconds: int
+    maintenance_min_commits: int
+    thread_digest_segment_bytes: int
 
 
 @dataclass(slots=True, frozen=True)
@@ -180,7 +203,6 @@ class Settings:
     tool_filter: ToolFilterSettings
     notifications: NotificationSettings
     # Background maintenance toggles
-    file_reservations_cleanup_enabled: bool
     file_reservations_cleanup_interval_seconds: int
     file_reservation_inactivity_seconds: int
     file_reservation_activity_grace_seconds: int
@@ -296,9 +318,48 @@ def get_settings() -> Settings:
         allow_localhost_unauthenticated=_bool(_decouple_config("HTTP_ALLOW_LOCALHOST_UNAUTHENTICATED", default="true"), default=True),
     )
 
+    def _write_mode(value: str) -> str:
+        v = (value or "").strip().lower()
+        if v in {"direct", "group"}:
+            return v
+        return "direct"
+
+    def _commit_mode(value: str) -> str:
+        v = (value or "").strip().lower()
+        if v in {"strict", "coalesce"}:
+            return v
+        return "strict"
+
+    def _commit_backend(value: str) -> str:
+        v = (value or "").strip().lower()
+        if v in {"gitpython", "fast-import"}:
+            return v
+        return "gitpython"
+
+    def _storage_layout(value: str) -> str:
+        v = (value or "").strip().lower()
+        if v in {"shared", "per-project"}:
+            return v
+        return "shared"
+
+    def _mailbox_copies(value: str) -> str:
+        v = (value or "").strip().lower()
+        if v in {"full", "stub"}:
+            return v
+        return "full"
+
     database_settings = DatabaseSettings(
         url=_decouple_config("DATABASE_URL", default="sqlite+aiosqlite:///./storage.sqlite3"),
         echo=_bool(_decouple_config("DATABASE_ECHO", default="false"), default=False),
+        write_mode=_write_mode(_decouple_config("DATABASE_WRITE_MODE", default="direct")),
+        group_commit_max_batch=max(1, _int(_decouple_config("DATABASE_GROUP_COMMIT_MAX_BATCH", default="64"), default=64)),
+        group_commit_max_delay_ms=max(0, _int(_decouple_config("DATABASE_GROUP_COMMIT_MAX_DELAY_MS", default="2"), default=2)),
+        read_engine_enabled=_bool(_decouple_config("DATABASE_READ_ENGINE_ENABLED", default="false"), default=False),
+        read_pool_size=max(1, _int(_decouple_config("DATABASE_READ_POOL_SIZE", default="10"), default=10)),
+        read_mmap_size_bytes=max(0, _int(_decouple_config("DATABASE_READ_MMAP_SIZE_BYTES", default=str(256 * 1024 * 1024)), default=256 * 1024 * 1024)),
+        read_cache_size_kb=max(0, _int(_decouple_config("DATABASE_READ_CACHE_SIZE_KB", default="65536"), default=65536)),
+        cold_tier_after_days=max(0, _int(_decouple_config("DATABASE_COLD_TIER_AFTER_DAYS", default="0"), default=0)),
+        cold_tier_dir=_decouple_config("DATABASE_COLD_TIER_DIR", default=""),
     )
 
     storage_settings = StorageSettings(
@@ -309,6 +370,21 @@ def get_settings() -> Settings:
         inline_image_max_bytes=_int(_decouple_config("INLINE_IMAGE_MAX_BYTES", default=str(64 * 1024)), default=64 * 1024),
         convert_images=_bool(_decouple_config("CONVERT_IMAGES", default="true"), default=True),
         keep_original_images=_bool(_decouple_config("KEEP_ORIGINAL_IMAGES", default="false"), default=False),
+        commit_mode=_commit_mode(_decouple_config("STORAGE_COMMIT_MODE", default="strict")),
+        commit_backend=_commit_backend(_decouple_config("STORAGE_COMMIT_BACKEND", default="gitpython")),
+        commit_coalesce_window_ms=max(0, _int(_decouple_config("STORAGE_COMMIT_COALESCE_WINDOW_MS", default="50"), default=50)),
+        commit_coalesce_max_entries=max(1, _int(_decouple_config("STORAGE_COMMIT_COALESCE_MAX_ENTRIES", default="32"), default=32)),
+        archive_outbox_enabled=_bool(_decouple_config("STORAGE_ARCHIVE_OUTBOX_ENABLED", default="false"), default=False),
+        layout=_storage_layout(_decouple_config("STORAGE_LAYOUT", default="shared")),
+        mailbox_copies=_mailbox_copies(_decouple_config("STORAGE_MAILBOX_COPIES", default="full")),
+        maintenance_enabled=_bool(_decouple_config("STORAGE_MAINTENANCE_ENABLED", default="false"), default=False),
+        maintenance_interval_seconds=max(
+            10, _int(_decouple_config("STORAGE_MAINTENANCE_INTERVAL_SECONDS", default="600"), default=600)
+        ),
+        maintenance_min_commits=max(1, _int(_decouple_config("STORAGE_MAINTENANCE_MIN_COMMITS", default="200"), default=200)),
+        thread_digest_segment_bytes=max(
+            1024, _int(_decouple_config("STORAGE_THREAD_DIGEST_SEGMENT_BYTES", default="65536"), default=65536)
+        ),
     )
 
     cors_settings = CorsSettings(
@@ -385,7 +461,6 @@ def get_settings() -> Settings:
         llm=llm_settings,
         tool_filter=tool_filter_settings,
         notifications=notification_settings,
-        file_reservations_cleanup_enabled=_bool(_decouple_config("FILE_RESERVATIONS_CLEANUP_ENABLED", default="false"), default=False),
         file_reservations_cleanup_interval_seconds=_int(_decouple_config("FILE_RESERVATIONS_CLEANUP_INTERVAL_SECONDS", default="60"), default=60),
         file_reservation_inactivity_seconds=_int(_decouple_config("FILE_RESERVATION_INACTIVITY_SECONDS", default="1800"), default=1800),
         file_reservation_activity_grace_seconds=_int(_decouple_config("FILE_RESERVATION_ACTIVITY_GRACE_SECONDS", default="900"), default=900),
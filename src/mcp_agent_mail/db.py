@@ -4,16 +4,23 @@ from __future__ import annotations
 
 import asyncio
 import contextvars
+import json
+import math
 import random
 import re
+import sqlite3
+import threading
 import time
-from collections.abc import AsyncIterator, Callable, Iterator
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable, Iterator
 from contextlib import asynccontextmanager, contextmanager, suppress
 from dataclasses import dataclass, field
-from functools import wraps
+from datetime import datetime, timedelta, timezone
+from functools import partial, wraps
 from pathlib import Path
-from typing import Any, TypeVar
+from typing import Any, TypeVar, cast
 
+from sqlalchemy import text
 from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlmodel import SQLModel
@@ -24,6 +31,8 @@ T = TypeVar("T")
 
 _engine: AsyncEngine | None = None
 _session_factory: async_sessionmaker[AsyncSession] | None = None
+_read_engine: AsyncEngine | None = None
+_read_session_factory: async_sessionmaker[AsyncSession] | None = None
 _schema_ready = False
 _schema_lock: asyncio.Lock | None = None
 
@@ -33,6 +42,13 @@ _SLOW_QUERY_LIMIT = 50
 _SQL_TABLE_RE = re.compile(r"\bfrom\s+([\w\.\"`\[\]]+)", re.IGNORECASE)
 _SQL_UPDATE_RE = re.compile(r"\bupdate\s+([\w\.\"`\[\]]+)", re.IGNORECASE)
 _SQL_INSERT_RE = re.compile(r"\binsert\s+into\s+([\w\.\"`\[\]]+)", re.IGNORECASE)
+_SQL_STRING_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+_SQL_NUMBER_LITERAL_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_SQL_IN_LIST_RE = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_SQL_WHITESPACE_RE = re.compile(r"\s+")
+_EXPLAINABLE_PREFIXES = ("select", "with", "insert", "update", "delete")
+_PROFILE_SAMPLE_LIMIT = 1024
+_PROFILE_STATEMENT_LIMIT = 500
 
 
 @dataclass(slots=True)
@@ -86,6 +102,153 @@ def _extract_table_name(statement: str) -> str | None:
     return None
 
 
+def fingerprint_statement(statement: str) -> str:
+    """Normalize SQL so statements differing only in literals share one fingerprint."""
+    normalized = _SQL_STRING_LITERAL_RE.sub("?", statement)
+    normalized = _SQL_NUMBER_LITERAL_RE.sub("?", normalized)
+    normalized = _SQL_IN_LIST_RE.sub("IN (?)", normalized)
+    return _SQL_WHITESPACE_RE.sub(" ", normalized).strip()
+
+
+def _percentile(ordered: list[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    # Nearest-rank percentile.
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _plan_has_full_scan(plan: list[str]) -> bool:
+    return any(
+        step.startswith("SCAN ") and "USING" not in step and "VIRTUAL TABLE" not in step for step in plan
+    )
+
+
+@dataclass(slots=True)
+class StatementStats:
+    fingerprint: str
+    table: str | None
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    samples: deque[float] = field(default_factory=lambda: deque(maxlen=_PROFILE_SAMPLE_LIMIT))
+    explain: list[str] | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        ordered = sorted(self.samples)
+        return {
+            "fingerprint": self.fingerprint,
+            "table": self.table,
+            "count": self.count,
+            "total_ms": round(self.total_ms, 2),
+            "p50_ms": round(_percentile(ordered, 50), 2),
+            "p95_ms": round(_percentile(ordered, 95), 2),
+            "max_ms": round(self.max_ms, 2),
+            "explain": list(self.explain) if self.explain is not None else None,
+            "full_scan": _plan_has_full_scan(self.explain or []),
+        }
+
+
+class QueryProfiler:
+    """Process-wide per-statement latency profile keyed by SQL fingerprint.
+
+    Unlike `QueryTracker` (one tool call, counts per table), this aggregates every
+    statement the engines run. The first time a fingerprint crosses
+    ``slow_query_ms`` its ``EXPLAIN QUERY PLAN`` is captured, so full scans can
+    be traced back to the exact statement.
+    """
+
+    def __init__(self, *, slow_query_ms: float | None = None, max_statements: int = _PROFILE_STATEMENT_LIMIT) -> None:
+        self.slow_query_ms = slow_query_ms
+        self.max_statements = max_statements
+        self.dropped = 0
+        self._stats: dict[str, StatementStats] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        statement: str,
+        duration_ms: float,
+        explain: Callable[[], list[str]] | None = None,
+    ) -> None:
+        fingerprint = fingerprint_statement(statement)
+        with self._lock:
+            stats = self._stats.get(fingerprint)
+            if stats is None:
+                if len(self._stats) >= self.max_statements:
+                    self.dropped += 1
+                    return
+                stats = StatementStats(fingerprint=fingerprint, table=_extract_table_name(statement))
+                self._stats[fingerprint] = stats
+            stats.count += 1
+            stats.total_ms += duration_ms
+            stats.max_ms = max(stats.max_ms, duration_ms)
+            stats.samples.append(duration_ms)
+            needs_plan = (
+                explain is not None
+                and stats.explain is None
+                and self.slow_query_ms is not None
+                and duration_ms >= self.slow_query_ms
+                and fingerprint.lower().startswith(_EXPLAINABLE_PREFIXES)
+            )
+            if needs_plan:
+                # Mark before running so concurrent slow hits do not explain twice.
+                stats.explain = []
+        if needs_plan and explain is not None:
+            try:
+                plan = explain()
+            except Exception as exc:
+                plan = [f"<unavailable: {type(exc).__name__}>"]
+            with self._lock:
+                stats.explain = plan
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            statements = [stats.to_dict() for stats in self._stats.values()]
+        statements.sort(key=lambda item: (-item["total_ms"], item["fingerprint"]))
+        return {
+            "slow_query_ms": self.slow_query_ms,
+            "statements": statements,
+            "dropped_fingerprints": self.dropped,
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self.dropped = 0
+
+
+_query_profiler: QueryProfiler | None = None
+
+
+def get_query_profiler() -> QueryProfiler | None:
+    return _query_profiler
+
+
+def enable_query_profiler(*, slow_ms: float | None = None) -> QueryProfiler:
+    """Start (or re-threshold) the process-wide statement profiler."""
+    global _query_profiler
+    if _query_profiler is None:
+        _query_profiler = QueryProfiler(slow_query_ms=slow_ms)
+    else:
+        _query_profiler.slow_query_ms = slow_ms
+    return _query_profiler
+
+
+def disable_query_profiler() -> None:
+    global _query_profiler
+    _query_profiler = None
+
+
+def _explain_query_plan(conn: Any, statement: str, parameters: Any) -> list[str]:
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return [str(row[3]) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
 def get_query_tracker() -> QueryTracker | None:
     return _QUERY_TRACKER.get()
 
@@ -263,11 +426,58 @@ def _build_engine(settings: DatabaseSettings) -> AsyncEngine:
     return engine
 
 
+def _build_read_engine(settings: DatabaseSettings) -> AsyncEngine | None:
+    """Build a read-only engine for file-backed SQLite databases.
+
+    WAL readers never block the writer, so giving them their own pool keeps
+    inbox/search bursts from starving writes of connections (and vice versa).
+    Returns None when the URL is not a file-backed SQLite database.
+    """
+    from sqlalchemy import event
+    from sqlalchemy.engine import make_url
+
+    try:
+        parsed = make_url(settings.url)
+    except Exception:
+        return None
+    if parsed.get_backend_name() != "sqlite" or not parsed.database or parsed.database == ":memory:":
+        return None
+
+    engine = create_async_engine(
+        settings.url,
+        echo=settings.echo,
+        future=True,
+        pool_pre_ping=True,
+        pool_size=settings.read_pool_size,
+        max_overflow=settings.read_pool_size,
+        pool_timeout=30,
+        pool_recycle=3600,
+        connect_args={"timeout": 30.0, "check_same_thread": False},
+    )
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_sqlite_read_pragma(dbapi_conn: Any, connection_record: Any) -> None:
+        """Configure each reader connection: no writes, big mmap window and page cache."""
+        cursor = dbapi_conn.cursor()
+        cursor.execute("PRAGMA busy_timeout=30000")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.read_mmap_size_bytes)}")
+        cursor.execute(f"PRAGMA cache_size=-{int(settings.read_cache_size_kb)}")
+        cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+    return engine
+
+
 def install_query_hooks(engine: AsyncEngine) -> None:
     """Install lightweight query counting hooks on the engine (idempotent)."""
     global _QUERY_HOOKS_INSTALLED
     if _QUERY_HOOKS_INSTALLED:
         return
+    _attach_query_hooks(engine)
+    _QUERY_HOOKS_INSTALLED = True
+
+
+def _attach_query_hooks(engine: AsyncEngine) -> None:
     from sqlalchemy import event
 
     @event.listens_for(engine.sync_engine, "before_cursor_execute")
@@ -279,8 +489,7 @@ def install_query_hooks(engine: AsyncEngine) -> None:
         context: Any,
         executemany: bool,
     ) -> None:
-        tracker = _QUERY_TRACKER.get()
-        if tracker is None:
+        if _QUERY_TRACKER.get() is None and _query_profiler is None:
             return
         timings = conn.info.setdefault("query_start_time", [])
         timings.append(time.perf_counter())
@@ -295,28 +504,39 @@ def install_query_hooks(engine: AsyncEngine) -> None:
         executemany: bool,
     ) -> None:
         tracker = _QUERY_TRACKER.get()
-        if tracker is None:
+        profiler = _query_profiler
+        if tracker is None and profiler is None:
             return
         timings = conn.info.get("query_start_time")
         if not timings:
             return
         start_time = timings.pop()
         duration_ms = (time.perf_counter() - start_time) * 1000.0
-        tracker.record(statement, duration_ms)
-
-    _QUERY_HOOKS_INSTALLED = True
+        if tracker is not None:
+            tracker.record(statement, duration_ms)
+        if profiler is not None:
+            explain = None if executemany else partial(_explain_query_plan, conn, statement, parameters)
+            profiler.record(statement, duration_ms, explain)
 
 
 def init_engine(settings: Settings | None = None) -> None:
     """Initialise global engine and session factory once."""
-    global _engine, _session_factory
+    global _engine, _session_factory, _read_engine, _read_session_factory
     if _engine is not None and _session_factory is not None:
         return
     resolved_settings = settings or get_settings()
     engine = _build_engine(resolved_settings.database)
     install_query_hooks(engine)
+    if resolved_settings.instrumentation_enabled:
+        enable_query_profiler(slow_ms=float(resolved_settings.instrumentation_slow_query_ms))
     _engine = engine
     _session_factory = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+    if resolved_settings.database.read_engine_enabled:
+        read_engine = _build_read_engine(resolved_settings.database)
+        if read_engine is not None:
+            _attach_query_hooks(read_engine)
+            _read_engine = read_engine
+            _read_session_factory = async_sessionmaker(read_engine, expire_on_commit=False, class_=AsyncSession)
 
 
 def get_engine() -> AsyncEngine:
@@ -333,9 +553,24 @@ def get_session_factory() -> async_sessionmaker[AsyncSession]:
     return _session_factory
 
 
+def get_read_engine() -> AsyncEngine | None:
+    """Return the dedicated read-only engine, or None when reads share the main engine."""
+    if _engine is None:
+        init_engine()
+    return _read_engine
+
+
 @asynccontextmanager
-async def get_session() -> AsyncIterator[AsyncSession]:
+async def get_session(*, readonly: bool = False) -> AsyncIterator[AsyncSession]:
+    """Yield an ``AsyncSession``.
+
+    ``readonly=True`` routes the session to the read-only engine when
+    ``DATABASE_READ_ENGINE_ENABLED`` is set (falling back to the main engine
+    otherwise); such sessions must not write.
+    """
     factory = get_session_factory()
+    if readonly and _read_session_factory is not None:
+        factory = _read_session_factory
     session = factory()
     try:
         yield session
@@ -351,6 +586,169 @@ async def get_session() -> AsyncIterator[AsyncSession]:
             raise
 
 
+WriteJob = Callable[[AsyncSession], Awaitable[Any]]
+
+
+class GroupCommitWriter:
+    """Single in-process writer that coalesces concurrent writes into one transaction.
+
+    Callers submit a coroutine function that receives the writer's session and
+    performs its mutations (flushing but never committing). The writer drains
+    whatever is queued (up to ``max_batch`` jobs, waiting at most
+    ``max_delay_ms`` for stragglers), opens one transaction, runs each job inside
+    its own SAVEPOINT so a failing job does not poison its neighbours, commits
+    once, and only then resolves each caller's future.
+    """
+
+    def __init__(self, *, max_batch: int = 64, max_delay_ms: int = 2) -> None:
+        self.max_batch = max(1, max_batch)
+        self.max_delay = max(0, max_delay_ms) / 1000.0
+        self.loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue[tuple[WriteJob, asyncio.Future[Any]]] = asyncio.Queue()
+        self._task: asyncio.Task[None] | None = None
+        self.batches_committed = 0
+        self.jobs_committed = 0
+        self.largest_batch = 0
+
+    def _ensure_task(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = self.loop.create_task(self._run())
+
+    async def submit(self, job: WriteJob) -> Any:
+        future: asyncio.Future[Any] = self.loop.create_future()
+        await self._queue.put((job, future))
+        self._ensure_task()
+        return await future
+
+    async def _next_batch(self) -> list[tuple[WriteJob, asyncio.Future[Any]]]:
+        batch = [await self._queue.get()]
+        deadline = self.loop.time() + self.max_delay
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - self.loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._commit_batch(batch)
+            except asyncio.CancelledError:
+                for _, future in batch:
+                    if not future.done():
+                        future.cancel()
+                raise
+
+    async def _commit_batch(self, batch: list[tuple[WriteJob, asyncio.Future[Any]]]) -> None:
+        results: list[tuple[asyncio.Future[Any], Any]] = []
+        try:
+            async with get_session() as session:
+                if session.bind.dialect.name == "sqlite":
+                    # pysqlite only auto-BEGINs before DML, so without an explicit outer
+                    # transaction each job's SAVEPOINT would be outermost and its RELEASE
+                    # would commit (one fsync per job). IMMEDIATE also takes the write lock up front.
+                    await session.execute(text("BEGIN IMMEDIATE"))
+                for job, future in batch:
+                    if future.done():
+                        continue
+                    try:
+                        async with session.begin_nested():
+                            value = await job(session)
+                    except Exception as exc:
+                        future.set_exception(exc)
+                        continue
+                    results.append((future, value))
+                await session.commit()
+        except Exception as exc:
+            for future, _ in results:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        self.batches_committed += 1
+        self.jobs_committed += len(results)
+        self.largest_batch = max(self.largest_batch, len(results))
+        for future, value in results:
+            if not future.done():
+                future.set_result(value)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "queued": self._queue.qsize(),
+            "batches_committed": self.batches_committed,
+            "jobs_committed": self.jobs_committed,
+            "largest_batch": self.largest_batch,
+        }
+
+    async def close(self) -> None:
+        task = self._task
+        self._task = None
+        if task is None or task.done():
+            return
+        task.cancel()
+        with suppress(BaseException):
+            await task
+
+
+_writer: GroupCommitWriter | None = None
+
+
+def get_group_writer() -> GroupCommitWriter | None:
+    """Return the active group-commit writer for the running loop, if one exists."""
+    writer = _writer
+    if writer is None or writer.loop.is_closed():
+        return None
+    return writer
+
+
+def _ensure_group_writer(settings: DatabaseSettings) -> GroupCommitWriter:
+    global _writer
+    loop = asyncio.get_running_loop()
+    if _writer is None or _writer.loop is not loop or loop.is_closed():
+        _writer = GroupCommitWriter(
+            max_batch=settings.group_commit_max_batch,
+            max_delay_ms=settings.group_commit_max_delay_ms,
+        )
+    return _writer
+
+
+async def run_write(job: Callable[[AsyncSession], Awaitable[T]]) -> T:
+    """Execute a mutating job and return its result once it is committed.
+
+    ``job`` receives an ``AsyncSession``; it may ``flush()`` to obtain ids but must
+    not commit. With ``DATABASE_WRITE_MODE=group`` the job is handed to the shared
+    writer task and committed together with any concurrent writes; otherwise it
+    runs in its own session and transaction as before.
+    """
+    settings = get_settings().database
+    if settings.write_mode == "group":
+        writer = _ensure_group_writer(settings)
+        return cast(T, await writer.submit(job))
+    async with get_session() as session:
+        value = await job(session)
+        await session.commit()
+    return value
+
+
+async def shutdown_group_writer() -> None:
+    """Stop the group-commit writer task (no-op in direct mode)."""
+    global _writer
+    writer = _writer
+    _writer = None
+    if writer is None or writer.loop is not asyncio.get_running_loop():
+        return
+    await writer.close()
+
+
 @retry_on_db_lock(max_retries=5, base_delay=0.1, max_delay=5.0)
 async def ensure_schema(settings: Settings | None = None) -> None:
     """Ensure database schema exists (creates tables from SQLModel definitions).
@@ -378,15 +776,26 @@ async def ensure_schema(settings: Settings | None = None) -> None:
             await conn.run_sync(SQLModel.metadata.create_all)
             # Setup FTS and custom indexes
             await conn.run_sync(_setup_fts)
+            await conn.run_sync(_setup_inbox_entries)
+            await conn.run_sync(_setup_mailbox_counters)
+            await conn.run_sync(_setup_mailbox_events)
+            await conn.run_sync(_setup_file_reservation_versions)
+            await conn.run_sync(_setup_message_previews)
+            await conn.run_sync(_setup_cold_tier)
         _schema_ready = True
 
 
 def reset_database_state() -> None:
     """Test helper to reset global engine/session state."""
-    global _engine, _session_factory, _schema_ready, _schema_lock
+    global _engine, _session_factory, _read_engine, _read_session_factory, _schema_ready, _schema_lock, _writer
+    global _query_profiler, _QUERY_HOOKS_INSTALLED
+    _writer = None
+    _query_profiler = None
+    _QUERY_HOOKS_INSTALLED = False
     # Dispose any existing engine/pool first to avoid leaking file descriptors across tests.
-    if _engine is not None:
-        engine = _engine
+    for engine in (_read_engine, _engine):
+        if engine is None:
+            continue
         try:
             # Prefer a full async dispose when possible (aiosqlite uses background threads).
             try:
@@ -412,23 +821,120 @@ def reset_database_state() -> None:
                 engine.sync_engine.dispose()
     _engine = None
     _session_factory = None
+    _read_engine = None
+    _read_session_factory = None
     _schema_ready = False
     _schema_lock = None
     # Tests frequently mutate env vars; keep settings cache in sync with DB resets.
     clear_settings_cache()
 
 
+MESSAGE_PREVIEW_CHARS = 160
+
+
+def message_preview(body_md: str) -> str:
+    """Single-line snippet stored in ``messages.preview``; mirrors `_PREVIEW_SQL`."""
+    return body_md.replace("\r", "").replace("\n", " ")[:MESSAGE_PREVIEW_CHARS]
+
+
+_PREVIEW_SQL = f"substr(replace(replace({{body}}, char(13), ''), char(10), ' '), 1, {MESSAGE_PREVIEW_CHARS})"
+
+
+def _setup_message_previews(connection: Any) -> None:
+    """Add and maintain the messages.preview / body_len columns.
+
+    Writers fill both at insert time; the triggers only fire for rows that
+    arrive without them (raw inserts) or whose body is rewritten later.
+    """
+    existing = {row[1] for row in connection.exec_driver_sql("PRAGMA table_info(messages)").fetchall()}
+    added = False
+    if "preview" not in existing:
+        connection.exec_driver_sql("ALTER TABLE messages ADD COLUMN preview VARCHAR(160) NOT NULL DEFAULT ''")
+        added = True
+    if "body_len" not in existing:
+        connection.exec_driver_sql("ALTER TABLE messages ADD COLUMN body_len INTEGER NOT NULL DEFAULT 0")
+        added = True
+    refresh = f"UPDATE messages SET preview = {_PREVIEW_SQL.format(body='new.body_md')}, body_len = length(new.body_md) WHERE id = new.id;"
+    connection.exec_driver_sql(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS messages_preview_ai
+        AFTER INSERT ON messages
+        WHEN new.body_len != length(new.body_md)
+        BEGIN
+            {refresh}
+        END;
+        """
+    )
+    connection.exec_driver_sql(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS messages_preview_au
+        AFTER UPDATE OF body_md ON messages
+        BEGIN
+            {refresh}
+        END;
+        """
+    )
+    if added:
+        connection.exec_driver_sql(
+            f"UPDATE messages SET preview = {_PREVIEW_SQL.format(body='body_md')}, body_len = length(body_md)"
+        )
+
+
+def fts_project_query(query: str, project_ids: Iterable[int]) -> str:
+    """Scope an FTS5 MATCH expression to the given projects.
+
+    The project filter becomes part of the MATCH itself, so FTS only ranks the
+    rows of those projects instead of every project's hits. The caller's query
+    is confined to subject/body so it can never match the project_id column.
+    """
+    ids = " OR ".join(f'"{int(pid)}"' for pid in project_ids)
+    return f"project_id : ({ids}) AND {{subject body}} : ({query})"
+
+
+def _rebuild_fts(connection: Any) -> int:
+    # 'rebuild' re-reads every row through the content view, discarding whatever the index held.
+    connection.exec_driver_sql("INSERT INTO fts_messages(fts_messages) VALUES('rebuild')")
+    row = connection.exec_driver_sql("SELECT COUNT(*) FROM fts_messages_docsize").first()
+    return int(row[0]) if row else 0
+
+
 def _setup_fts(connection: Any) -> None:
+    """Install the external-content fts_messages index and the triggers that feed it.
+
+    The index reads subject/body back through the ``messages_fts_source`` view
+    over ``messages`` instead of keeping its own copy, so bodies are stored once.
+    Older databases with a self-contained index are converted in place.
+    """
+    row = connection.exec_driver_sql(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'fts_messages'"
+    ).first()
+    migrate = row is not None and "messages_fts_source" not in str(row[0])
+    if migrate:
+        # Self-contained (or pre-partitioning) index: drop it with its triggers and rebuild below.
+        for trigger in ("fts_messages_ai", "fts_messages_ad", "fts_messages_au"):
+            connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {trigger}")
+        connection.exec_driver_sql("DROP TABLE fts_messages")
     connection.exec_driver_sql(
-        "CREATE VIRTUAL TABLE IF NOT EXISTS fts_messages USING fts5(message_id UNINDEXED, subject, body)"
+        """
+        CREATE VIEW IF NOT EXISTS messages_fts_source AS
+        SELECT id, id AS message_id, subject, body_md AS body, project_id FROM messages
+        """
+    )
+    connection.exec_driver_sql(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS fts_messages USING fts5(
+            message_id UNINDEXED, subject, body, project_id,
+            content='messages_fts_source', content_rowid='id'
+        )
+        """
     )
     connection.exec_driver_sql(
         """
         CREATE TRIGGER IF NOT EXISTS fts_messages_ai
         AFTER INSERT ON messages
         BEGIN
-            INSERT INTO fts_messages(rowid, message_id, subject, body)
-            VALUES (new.id, new.id, new.subject, new.body_md);
+            INSERT INTO fts_messages(rowid, message_id, subject, body, project_id)
+            VALUES (new.id, new.id, new.subject, new.body_md, new.project_id);
         END;
         """
     )
@@ -437,21 +943,25 @@ def _setup_fts(connection: Any) -> None:
         CREATE TRIGGER IF NOT EXISTS fts_messages_ad
         AFTER DELETE ON messages
         BEGIN
-            DELETE FROM fts_messages WHERE rowid = old.id;
+            INSERT INTO fts_messages(fts_messages, rowid, message_id, subject, body, project_id)
+            VALUES ('delete', old.id, old.id, old.subject, old.body_md, old.project_id);
         END;
         """
     )
     connection.exec_driver_sql(
         """
         CREATE TRIGGER IF NOT EXISTS fts_messages_au
-        AFTER UPDATE ON messages
+        AFTER UPDATE OF subject, body_md, project_id ON messages
         BEGIN
-            DELETE FROM fts_messages WHERE rowid = old.id;
-            INSERT INTO fts_messages(rowid, message_id, subject, body)
-            VALUES (new.id, new.id, new.subject, new.body_md);
+            INSERT INTO fts_messages(fts_messages, rowid, message_id, subject, body, project_id)
+            VALUES ('delete', old.id, old.id, old.subject, old.body_md, old.project_id);
+            INSERT INTO fts_messages(rowid, message_id, subject, body, project_id)
+            VALUES (new.id, new.id, new.subject, new.body_md, new.project_id);
         END;
         """
     )
+    if migrate:
+        _rebuild_fts(connection)
     # Additional performance indexes for common access patterns
     connection.exec_driver_sql(
         "CREATE INDEX IF NOT EXISTS idx_messages_created_ts ON messages(created_ts)"
@@ -513,6 +1023,396 @@ def _setup_fts(connection: Any) -> None:
     )
 
 
+_INBOX_ENTRY_COLUMNS = (
+    "message_id, agent_id, project_id, sender_id, sender_name, subject, thread_id, "
+    "importance, ack_required, kind, created_ts, read_ts, ack_ts"
+)
+
+
+def _inbox_entry_select(recipient: str) -> str:
+    """SELECT producing inbox_entries rows for the recipient row(s) aliased as ``recipient``."""
+    return f"""
+        SELECT m.id, {recipient}.agent_id, m.project_id, m.sender_id, COALESCE(s.name, ''), m.subject,
+               m.thread_id, m.importance, m.ack_required, {recipient}.kind, m.created_ts,
+               {recipient}.read_ts, {recipient}.ack_ts
+        FROM messages m
+        LEFT JOIN agents s ON s.id = m.sender_id
+    """
+
+
+def _drop_trigger_unless(connection: Any, name: str, marker: str) -> None:
+    """Drop trigger ``name`` when its stored SQL lacks ``marker`` so it can be recreated in its current form."""
+    row = connection.exec_driver_sql(
+        "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = ?", (name,)
+    ).first()
+    if row is not None and marker not in str(row[0]):
+        connection.exec_driver_sql(f"DROP TRIGGER {name}")
+
+
+def _setup_inbox_entries(connection: Any) -> None:
+    """Install triggers and the range-scan index that keep inbox_entries in sync."""
+    connection.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS idx_inbox_entries_agent_project_created "
+        "ON inbox_entries(agent_id, project_id, created_ts DESC, message_id DESC)"
+    )
+    connection.exec_driver_sql(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS inbox_entries_ai
+        AFTER INSERT ON message_recipients
+        BEGIN
+            INSERT OR REPLACE INTO inbox_entries({_INBOX_ENTRY_COLUMNS})
+            {_inbox_entry_select("new")}
+            WHERE m.id = new.message_id;
+        END;
+        """
+    )
+    connection.exec_driver_sql(
+        """
+        CREATE TRIGGER IF NOT EXISTS inbox_entries_au
+        AFTER UPDATE ON message_recipients
+        BEGIN
+            UPDATE inbox_entries
+            SET kind = new.kind, read_ts = new.read_ts, ack_ts = new.ack_ts
+            WHERE message_id = new.message_id AND agent_id = new.agent_id;
+        END;
+        """
+    )
+    connection.exec_driver_sql(
+        """
+        CREATE TRIGGER IF NOT EXISTS inbox_entries_ad
+        AFTER DELETE ON message_recipients
+        BEGIN
+            DELETE FROM inbox_entries WHERE message_id = old.message_id AND agent_id = old.agent_id;
+        END;
+        """
+    )
+    # Earlier versions ignored re-keyed/re-dated rows (e.g. `projects adopt`); replace them.
+    _drop_trigger_unless(connection, "inbox_entries_message_au", "created_ts")
+    connection.exec_driver_sql(
+        """
+        CREATE TRIGGER IF NOT EXISTS inbox_entries_message_au
+        AFTER UPDATE OF subject, thread_id, importance, ack_required, created_ts, project_id, sender_id ON messages
+        BEGIN
+            UPDATE inbox_entries
+            SET subject = new.subject, thread_id = new.thread_id,
+                importance = new.importance, ack_required = new.ack_required, created_ts = new.created_ts,
+                project_id = new.project_id, sender_id = new.sender_id,
+                sender_name = COALESCE((SELECT name FROM agents WHERE id = new.sender_id), '')
+            WHERE message_id = new.id;
+        END;
+        """
+    )
+    connection.exec_driver_sql(
+        """
+        CREATE TRIGGER IF NOT EXISTS inbox_entries_agent_au
+        AFTER UPDATE OF name ON agents
+        BEGIN
+            UPDATE inbox_entries SET sender_name = new.name WHERE sender_id = new.id;
+        END;
+        """
+    )
+    connection.exec_driver_sql(
+        """
+        CREATE TRIGGER IF NOT EXISTS inbox_entries_message_ad
+        AFTER DELETE ON messages
+        BEGIN
+            DELETE FROM inbox_entries WHERE message_id = old.id;
+        END;
+        """
+    )
+    # Backfill databases created before inbox_entries existed.
+    has_entries = connection.exec_driver_sql("SELECT 1 FROM inbox_entries LIMIT 1").first()
+    has_recipients = connection.exec_driver_sql("SELECT 1 FROM message_recipients LIMIT 1").first()
+    if has_recipients and not has_entries:
+        _rebuild_inbox_entries(connection)
+
+
+def _rebuild_inbox_entries(connection: Any) -> int:
+    connection.exec_driver_sql("DELETE FROM inbox_entries")
+    connection.exec_driver_sql(
+        f"""
+        INSERT OR REPLACE INTO inbox_entries({_INBOX_ENTRY_COLUMNS})
+        {_inbox_entry_select("mr")}
+        JOIN message_recipients mr ON mr.message_id = m.id
+        """
+    )
+    row = connection.exec_driver_sql("SELECT COUNT(*) FROM inbox_entries").first()
+    return int(row[0]) if row else 0
+
+
+# Contribution of one inbox_entries row (aliased ``e``) to each mailbox counter.
+_COUNTER_TERMS = {
+    "total": "1",
+    "unread": "({e}.read_ts IS NULL)",
+    "urgent_unread": "({e}.read_ts IS NULL AND {e}.importance IN ('high', 'urgent'))",
+    "ack_pending": "({e}.ack_required AND {e}.ack_ts IS NULL)",
+}
+
+
+def _setup_mailbox_counters(connection: Any) -> None:
+    """Install triggers that keep mailbox_counters in step with inbox_entries.
+
+    The triggers run inside the same transaction as the message_recipients write
+    that fired them (inbox_entries is itself trigger-maintained), so counters
+    can never drift from the rows they summarize.
+    """
+    columns = ", ".join(_COUNTER_TERMS)
+    insert_values = ", ".join(term.format(e="new") for term in _COUNTER_TERMS.values())
+    upsert = ", ".join(f"{name} = {name} + excluded.{name}" for name in _COUNTER_TERMS)
+    connection.exec_driver_sql(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS mailbox_counters_ai
+        AFTER INSERT ON inbox_entries
+        BEGIN
+            INSERT INTO mailbox_counters(project_id, agent_id, {columns})
+            VALUES (new.project_id, new.agent_id, {insert_values})
+            ON CONFLICT(project_id, agent_id) DO UPDATE SET {upsert};
+        END;
+        """
+    )
+    delta = ", ".join(
+        f"{name} = {name} + {term.format(e='new')} - {term.format(e='old')}"
+        for name, term in _COUNTER_TERMS.items()
+        if name != "total"
+    )
+    _drop_trigger_unless(connection, "mailbox_counters_au", "WHEN")
+    connection.exec_driver_sql(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS mailbox_counters_au
+        AFTER UPDATE ON inbox_entries
+        WHEN new.project_id = old.project_id AND new.agent_id = old.agent_id
+        BEGIN
+            UPDATE mailbox_counters SET {delta}
+            WHERE project_id = new.project_id AND agent_id = new.agent_id;
+        END;
+        """
+    )
+    decrement = ", ".join(f"{name} = {name} - {term.format(e='old')}" for name, term in _COUNTER_TERMS.items())
+    # A re-keyed row (e.g. `projects adopt` moving messages) leaves its old mailbox and joins the new one.
+    connection.exec_driver_sql(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS mailbox_counters_au_rekey
+        AFTER UPDATE ON inbox_entries
+        WHEN new.project_id != old.project_id OR new.agent_id != old.agent_id
+        BEGIN
+            UPDATE mailbox_counters SET {decrement}
+            WHERE project_id = old.project_id AND agent_id = old.agent_id;
+            INSERT INTO mailbox_counters(project_id, agent_id, {columns})
+            VALUES (new.project_id, new.agent_id, {insert_values})
+            ON CONFLICT(project_id, agent_id) DO UPDATE SET {upsert};
+        END;
+        """
+    )
+    connection.exec_driver_sql(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS mailbox_counters_ad
+        AFTER DELETE ON inbox_entries
+        BEGIN
+            UPDATE mailbox_counters SET {decrement}
+            WHERE project_id = old.project_id AND agent_id = old.agent_id;
+        END;
+        """
+    )
+    has_counters = connection.exec_driver_sql("SELECT 1 FROM mailbox_counters LIMIT 1").first()
+    has_entries = connection.exec_driver_sql("SELECT 1 FROM inbox_entries LIMIT 1").first()
+    if has_entries and not has_counters:
+        _rebuild_mailbox_counters(connection)
+
+
+def _rebuild_mailbox_counters(connection: Any) -> int:
+    connection.exec_driver_sql("DELETE FROM mailbox_counters")
+    sums = ", ".join(f"SUM({term.format(e='e')})" for term in _COUNTER_TERMS.values())
+    connection.exec_driver_sql(
+        f"""
+        INSERT INTO mailbox_counters(project_id, agent_id, {", ".join(_COUNTER_TERMS)})
+        SELECT e.project_id, e.agent_id, {sums}
+        FROM inbox_entries e
+        GROUP BY e.project_id, e.agent_id
+        """
+    )
+    row = connection.exec_driver_sql("SELECT COUNT(*) FROM mailbox_counters").first()
+    return int(row[0]) if row else 0
+
+
+_MAILBOX_EVENT_COLUMNS = "project_id, agent_id, kind, message_id, reservation_id, event_ts, detail"
+
+
+def _delivered_event_select(recipient: str) -> str:
+    """SELECT producing a ``delivered`` mailbox_events row for the recipient row(s) aliased as ``recipient``."""
+    return f"""
+        SELECT m.project_id, {recipient}.agent_id, 'delivered', m.id, NULL, m.created_ts,
+               json_object('subject', m.subject, 'sender', COALESCE(s.name, ''), 'thread_id', m.thread_id,
+                           'importance', m.importance, 'ack_required', m.ack_required, 'kind', {recipient}.kind)
+        FROM messages m
+        LEFT JOIN agents s ON s.id = m.sender_id
+    """
+
+
+def _recipient_state_event_select(recipient: str, kind: str, column: str) -> str:
+    """SELECT producing a ``read``/``acked`` mailbox_events row stamped with ``recipient.column``."""
+    return f"""
+        SELECT m.project_id, {recipient}.agent_id, '{kind}', m.id, NULL, {recipient}.{column}, '{{}}'
+        FROM messages m
+    """
+
+
+def _reservation_event_select(reservation: str, kind: str, stamp: str) -> str:
+    """SELECT producing a reservation mailbox_events row stamped with the ``stamp`` expression."""
+    return f"""
+        SELECT {reservation}.project_id, {reservation}.agent_id, '{kind}', NULL, {reservation}.id, {stamp},
+               json_object('path_pattern', {reservation}.path_pattern, 'exclusive', {reservation}.exclusive,
+                           'reason', {reservation}.reason, 'expires_ts', {reservation}.expires_ts)
+    """
+
+
+def _setup_mailbox_events(connection: Any) -> None:
+    """Install the triggers that append to mailbox_events.
+
+    Events are written in the same transaction as the message_recipients or
+    file_reservations change that fires them, whichever code path makes it.
+    """
+    connection.exec_driver_sql(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS mailbox_events_delivered
+        AFTER INSERT ON message_recipients
+        BEGIN
+            INSERT INTO mailbox_events({_MAILBOX_EVENT_COLUMNS})
+            {_delivered_event_select("new")}
+            WHERE m.id = new.message_id;
+            INSERT INTO mailbox_events({_MAILBOX_EVENT_COLUMNS})
+            {_recipient_state_event_select("new", "read", "read_ts")}
+            WHERE m.id = new.message_id AND new.read_ts IS NOT NULL;
+            INSERT INTO mailbox_events({_MAILBOX_EVENT_COLUMNS})
+            {_recipient_state_event_select("new", "acked", "ack_ts")}
+            WHERE m.id = new.message_id AND new.ack_ts IS NOT NULL;
+        END;
+        """
+    )
+    for kind, column in (("read", "read_ts"), ("acked", "ack_ts")):
+        connection.exec_driver_sql(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS mailbox_events_{kind}
+            AFTER UPDATE OF {column} ON message_recipients
+            WHEN new.{column} IS NOT NULL AND old.{column} IS NULL
+            BEGIN
+                INSERT INTO mailbox_events({_MAILBOX_EVENT_COLUMNS})
+                {_recipient_state_event_select("new", kind, column)}
+                WHERE m.id = new.message_id;
+            END;
+            """
+        )
+    connection.exec_driver_sql(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS mailbox_events_reservation_granted
+        AFTER INSERT ON file_reservations
+        BEGIN
+            INSERT INTO mailbox_events({_MAILBOX_EVENT_COLUMNS})
+            {_reservation_event_select("new", "reservation_granted", "new.created_ts")};
+        END;
+        """
+    )
+    connection.exec_driver_sql(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS mailbox_events_reservation_renewed
+        AFTER UPDATE OF expires_ts ON file_reservations
+        WHEN new.expires_ts != old.expires_ts AND new.released_ts IS NULL
+        BEGIN
+            INSERT INTO mailbox_events({_MAILBOX_EVENT_COLUMNS})
+            {_reservation_event_select("new", "reservation_renewed", "strftime('%Y-%m-%d %H:%M:%f', 'now')")};
+        END;
+        """
+    )
+    connection.exec_driver_sql(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS mailbox_events_reservation_released
+        AFTER UPDATE OF released_ts ON file_reservations
+        WHEN new.released_ts IS NOT NULL AND old.released_ts IS NULL
+        BEGIN
+            INSERT INTO mailbox_events({_MAILBOX_EVENT_COLUMNS})
+            {_reservation_event_select("new", "reservation_released", "new.released_ts")};
+        END;
+        """
+    )
+    # Backfill databases created before mailbox_events existed from current state.
+    has_events = connection.exec_driver_sql("SELECT 1 FROM mailbox_events LIMIT 1").first()
+    has_history = connection.exec_driver_sql(
+        "SELECT 1 FROM message_recipients UNION ALL SELECT 1 FROM file_reservations LIMIT 1"
+    ).first()
+    if has_history and not has_events:
+        _backfill_mailbox_events(connection)
+
+
+def _backfill_mailbox_events(connection: Any) -> int:
+    """Synthesize mailbox_events from the timestamps already on recipients and reservations."""
+    selects = [
+        f"{_delivered_event_select('mr')} JOIN message_recipients mr ON mr.message_id = m.id",
+        f"{_recipient_state_event_select('mr', 'read', 'read_ts')} "
+        "JOIN message_recipients mr ON mr.message_id = m.id WHERE mr.read_ts IS NOT NULL",
+        f"{_recipient_state_event_select('mr', 'acked', 'ack_ts')} "
+        "JOIN message_recipients mr ON mr.message_id = m.id WHERE mr.ack_ts IS NOT NULL",
+        f"{_reservation_event_select('fr', 'reservation_granted', 'fr.created_ts')} FROM file_reservations fr",
+        f"{_reservation_event_select('fr', 'reservation_released', 'fr.released_ts')} "
+        "FROM file_reservations fr WHERE fr.released_ts IS NOT NULL",
+    ]
+    result = connection.exec_driver_sql(
+        f"INSERT INTO mailbox_events({_MAILBOX_EVENT_COLUMNS}) "
+        f"SELECT * FROM ({' UNION ALL '.join(selects)}) ORDER BY 6"
+    )
+    return int(result.rowcount or 0)
+
+
+def _file_reservation_version_bump(row: str, when: str = "1") -> str:
+    return (
+        f"INSERT INTO file_reservation_versions(project_id, version) SELECT {row}.project_id, 1 WHERE {when} "
+        "ON CONFLICT(project_id) DO UPDATE SET version = version + 1;"
+    )
+
+
+def _setup_file_reservation_versions(connection: Any) -> None:
+    """Install the triggers that bump file_reservation_versions on every file_reservations row write."""
+    for name, event, body in (
+        ("ai", "INSERT", _file_reservation_version_bump("new")),
+        # Moving a reservation between projects (project merges) bumps both sides.
+        (
+            "au",
+            "UPDATE",
+            _file_reservation_version_bump("new")
+            + _file_reservation_version_bump("old", "old.project_id != new.project_id"),
+        ),
+        ("ad", "DELETE", _file_reservation_version_bump("old")),
+    ):
+        connection.exec_driver_sql(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS file_reservation_versions_{name}
+            AFTER {event} ON file_reservations
+            BEGIN
+                {body}
+            END;
+            """
+        )
+
+
+async def rebuild_mailbox_counters() -> int:
+    """Recompute mailbox_counters from inbox_entries; returns the number of (project, agent) rows."""
+    await ensure_schema()
+    async with get_engine().begin() as conn:
+        return int(await conn.run_sync(_rebuild_mailbox_counters))
+
+
+async def rebuild_fts_index() -> int:
+    """Rebuild fts_messages from the messages table; returns the number of indexed messages."""
+    await ensure_schema()
+    async with get_engine().begin() as conn:
+        return int(await conn.run_sync(_rebuild_fts))
+
+
+async def rebuild_inbox_entries() -> int:
+    """Recompute inbox_entries from messages/message_recipients; returns the row count."""
+    await ensure_schema()
+    async with get_engine().begin() as conn:
+        return int(await conn.run_sync(_rebuild_inbox_entries))
+
+
 def get_database_path(settings: Settings | None = None) -> Path | None:
     """Extract the filesystem path to the SQLite database file from settings.
 
@@ -540,3 +1440,458 @@ def get_database_path(settings: Settings | None = None) -> Path | None:
         return None
 
     return Path(db_path)
+
+
+# Cold tier: messages past DATABASE_COLD_TIER_AFTER_DAYS move (with their recipients and
+# FTS rows) into one SQLite file per calendar month. The hot database keeps only a
+# cold_partitions catalog; readers ATTACH the monthly files read-only on demand.
+_COLD_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+_COLD_MESSAGE_COLUMNS = (
+    "id",
+    "project_id",
+    "sender_id",
+    "thread_id",
+    "subject",
+    "body_md",
+    "preview",
+    "body_len",
+    "importance",
+    "ack_required",
+    "created_ts",
+    "attachments",
+)
+_COLD_RECIPIENT_COLUMNS = ("message_id", "agent_id", "kind", "read_ts", "ack_ts")
+_COLD_TIER_DDL = (
+    """
+    CREATE TABLE IF NOT EXISTS {schema}.messages (
+        id INTEGER PRIMARY KEY,
+        project_id INTEGER NOT NULL,
+        sender_id INTEGER NOT NULL,
+        sender_name TEXT NOT NULL DEFAULT '',
+        thread_id TEXT,
+        subject TEXT NOT NULL,
+        body_md TEXT NOT NULL,
+        preview TEXT NOT NULL DEFAULT '',
+        body_len INTEGER NOT NULL DEFAULT 0,
+        importance TEXT NOT NULL DEFAULT 'normal',
+        ack_required BOOLEAN NOT NULL DEFAULT 0,
+        created_ts DATETIME NOT NULL,
+        attachments TEXT NOT NULL DEFAULT '[]'
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS {schema}.idx_cold_messages_project_thread ON messages(project_id, thread_id, created_ts)",
+    """
+    CREATE TABLE IF NOT EXISTS {schema}.message_recipients (
+        message_id INTEGER NOT NULL,
+        agent_id INTEGER NOT NULL,
+        kind TEXT NOT NULL DEFAULT 'to',
+        read_ts DATETIME,
+        ack_ts DATETIME,
+        PRIMARY KEY (message_id, agent_id)
+    )
+    """,
+    """
+    CREATE VIEW IF NOT EXISTS {schema}.messages_fts_source AS
+    SELECT id, id AS message_id, subject, body_md AS body, project_id FROM messages
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS {schema}.fts_messages USING fts5(
+        message_id UNINDEXED, subject, body, project_id,
+        content='messages_fts_source', content_rowid='id'
+    )
+    """,
+)
+
+
+@dataclass(slots=True, frozen=True)
+class ColdPartition:
+    """One monthly cold-tier database as recorded in the hot cold_partitions catalog."""
+
+    month: str
+    path: Path
+    message_count: int
+    min_id: int
+    max_id: int
+
+
+def _setup_cold_tier(connection: Any) -> None:
+    connection.exec_driver_sql(
+        """
+        CREATE TABLE IF NOT EXISTS cold_partitions (
+            month TEXT PRIMARY KEY,
+            filename TEXT NOT NULL,
+            message_count INTEGER NOT NULL DEFAULT 0,
+            min_id INTEGER NOT NULL DEFAULT 0,
+            max_id INTEGER NOT NULL DEFAULT 0,
+            min_ts DATETIME,
+            max_ts DATETIME,
+            updated_ts DATETIME
+        )
+        """
+    )
+
+
+def get_cold_tier_dir(settings: Settings | None = None) -> Path | None:
+    """Directory holding the monthly cold-tier databases, or None when the hot DB is not a SQLite file."""
+    resolved = settings or get_settings()
+    if resolved.database.cold_tier_dir:
+        return Path(resolved.database.cold_tier_dir).expanduser().resolve()
+    db_path = get_database_path(resolved)
+    if db_path is None:
+        return None
+    return db_path.expanduser().resolve().parent / f"{db_path.stem}_cold"
+
+
+def _move_month_to_cold_tier(connection: Any, month: str, path: Path, cutoff: str) -> int:
+    """Copy one month of messages older than ``cutoff`` into ``path`` and delete them from the hot DB.
+
+    ATTACH must run outside a transaction, so the copy/delete is committed here
+    before the monthly file is detached again.
+    """
+    selection = "FROM main.messages WHERE created_ts < ? AND strftime('%Y-%m', created_ts) = ?"
+    params = (cutoff, month)
+    message_columns = ", ".join(_COLD_MESSAGE_COLUMNS)
+    recipient_columns = ", ".join(_COLD_RECIPIENT_COLUMNS)
+    connection.exec_driver_sql("ATTACH DATABASE ? AS cold_move", (str(path),))
+    try:
+        for ddl in _COLD_TIER_DDL:
+            connection.exec_driver_sql(ddl.format(schema="cold_move"))
+        row = connection.exec_driver_sql(f"SELECT COUNT(*) {selection}", params).first()
+        moved = int(row[0]) if row else 0
+        if moved:
+            connection.exec_driver_sql(
+                f"""
+                INSERT OR IGNORE INTO cold_move.messages ({message_columns}, sender_name)
+                SELECT {", ".join(f"m.{column}" for column in _COLD_MESSAGE_COLUMNS)}, COALESCE(a.name, '')
+                FROM main.messages m LEFT JOIN main.agents a ON a.id = m.sender_id
+                WHERE m.created_ts < ? AND strftime('%Y-%m', m.created_ts) = ?
+                """,
+                params,
+            )
+            connection.exec_driver_sql(
+                f"""
+                INSERT OR IGNORE INTO cold_move.message_recipients ({recipient_columns})
+                SELECT {recipient_columns} FROM main.message_recipients
+                WHERE message_id IN (SELECT id {selection})
+                """,
+                params,
+            )
+            connection.exec_driver_sql("INSERT INTO cold_move.fts_messages(fts_messages) VALUES('rebuild')")
+            # Recipient/inbox deletes drive the inbox_entries and mailbox_counters triggers;
+            # the messages delete drives fts_messages_ad.
+            for table in ("inbox_entries", "message_recipients"):
+                connection.exec_driver_sql(
+                    f"DELETE FROM main.{table} WHERE message_id IN (SELECT id {selection})", params
+                )
+            connection.exec_driver_sql(f"DELETE {selection}", params)
+            connection.exec_driver_sql(
+                """
+                INSERT INTO cold_partitions (month, filename, message_count, min_id, max_id, min_ts, max_ts, updated_ts)
+                SELECT ?, ?, COUNT(*), MIN(id), MAX(id), MIN(created_ts), MAX(created_ts), ?
+                FROM cold_move.messages
+                WHERE true
+                ON CONFLICT(month) DO UPDATE SET
+                    filename = excluded.filename,
+                    message_count = excluded.message_count,
+                    min_id = excluded.min_id,
+                    max_id = excluded.max_id,
+                    min_ts = excluded.min_ts,
+                    max_ts = excluded.max_ts,
+                    updated_ts = excluded.updated_ts
+                """,
+                (month, path.name, datetime.now(timezone.utc).replace(tzinfo=None).strftime(_COLD_TIMESTAMP_FORMAT)),
+            )
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.exec_driver_sql("DETACH DATABASE cold_move")
+    return moved
+
+
+def _move_to_cold_tier(connection: Any, cold_dir: Path, cutoff: str) -> dict[str, int]:
+    months = [
+        str(row[0])
+        for row in connection.exec_driver_sql(
+            "SELECT DISTINCT strftime('%Y-%m', created_ts) FROM messages WHERE created_ts < ? ORDER BY 1",
+            (cutoff,),
+        ).all()
+        if row[0]
+    ]
+    # Release the implicit read transaction so ATTACH is allowed.
+    connection.commit()
+    moved: dict[str, int] = {}
+    for month in months:
+        count = _move_month_to_cold_tier(connection, month, cold_dir / f"messages-{month}.sqlite3", cutoff)
+        if count:
+            moved[month] = count
+    return moved
+
+
+async def move_messages_to_cold_tier(older_than_days: int | None = None, *, now: datetime | None = None) -> dict[str, int]:
+    """Move messages older than ``older_than_days`` (default: DATABASE_COLD_TIER_AFTER_DAYS) into monthly cold DBs.
+
+    Returns ``{"YYYY-MM": moved_count}`` for every month that received messages.
+    """
+    settings = get_settings()
+    days = settings.database.cold_tier_after_days if older_than_days is None else older_than_days
+    if days <= 0:
+        return {}
+    cold_dir = get_cold_tier_dir(settings)
+    if cold_dir is None:
+        raise ValueError("Cold tiering requires a file-backed SQLite database.")
+    await ensure_schema()
+    cold_dir.mkdir(parents=True, exist_ok=True)
+    reference = now or datetime.now(timezone.utc)
+    if reference.tzinfo is not None:
+        reference = reference.astimezone(timezone.utc).replace(tzinfo=None)
+    cutoff = (reference - timedelta(days=days)).strftime(_COLD_TIMESTAMP_FORMAT)
+    async with get_engine().connect() as conn:
+        return cast(dict[str, int], await conn.run_sync(partial(_move_to_cold_tier, cold_dir=cold_dir, cutoff=cutoff)))
+
+
+async def list_cold_partitions() -> list[ColdPartition]:
+    """Return the monthly cold-tier databases that currently hold messages, oldest first."""
+    cold_dir = get_cold_tier_dir()
+    if cold_dir is None:
+        return []
+    await ensure_schema()
+    async with get_session(readonly=True) as session:
+        rows = (
+            await session.execute(
+                text("SELECT month, filename, message_count, min_id, max_id FROM cold_partitions ORDER BY month")
+            )
+        ).all()
+    return [
+        ColdPartition(month=row[0], path=cold_dir / row[1], message_count=int(row[2]), min_id=int(row[3]), max_id=int(row[4]))
+        for row in rows
+        if (cold_dir / row[1]).exists()
+    ]
+
+
+def _query_cold_partitions(paths: list[Path], sql: str, params: Any) -> list[dict[str, Any]]:
+    rows: list[dict[str, Any]] = []
+    conn = sqlite3.connect("file::memory:", uri=True)
+    try:
+        batch_size = max(1, conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED))
+        for start in range(0, len(paths), batch_size):
+            schemas: list[str] = []
+            try:
+                for offset, path in enumerate(paths[start : start + batch_size]):
+                    schema = f"cold_{offset}"
+                    conn.execute(f"ATTACH DATABASE ? AS {schema}", (f"{path.as_uri()}?mode=ro",))
+                    schemas.append(schema)
+                for schema in schemas:
+                    cursor = conn.execute(sql.format(schema=schema), params)
+                    columns = [column[0] for column in cursor.description]
+                    rows.extend(dict(zip(columns, row, strict=True)) for row in cursor.fetchall())
+            finally:
+                for schema in schemas:
+                    conn.execute(f"DETACH DATABASE {schema}")
+    finally:
+        conn.close()
+    return rows
+
+
+async def query_cold_tier(sql: str, params: Any = (), *, message_id: int | None = None) -> list[dict[str, Any]]:
+    """Run ``sql`` against every cold partition (read-only) and concatenate the rows.
+
+    ``sql`` refers to cold tables as ``{schema}.messages`` / ``{schema}.message_recipients`` /
+    ``{schema}.fts_messages``. ``message_id`` prunes partitions by their id range.
+    """
+    partitions = await list_cold_partitions()
+    if message_id is not None:
+        partitions = [part for part in partitions if part.min_id <= message_id <= part.max_id]
+    if not partitions:
+        return []
+    return await asyncio.to_thread(_query_cold_partitions, [part.path for part in partitions], sql, params)
+
+
+async def archive_queue_stats(*, now: datetime | None = None) -> dict[str, Any]:
+    """Summarize pending archive-outbox jobs: depth, failing jobs and how far the archive lags the DB."""
+    await ensure_schema()
+    async with get_session(readonly=True) as session:
+        rows = (
+            await session.execute(
+                text(
+                    "SELECT p.slug, COUNT(*), MIN(j.created_ts), SUM(j.attempts > 0) "
+                    "FROM archive_jobs j JOIN projects p ON p.id = j.project_id GROUP BY p.slug ORDER BY p.slug"
+                )
+            )
+        ).all()
+    current = (now or datetime.now(timezone.utc)).replace(tzinfo=None)
+    oldest: datetime | None = None
+    for row in rows:
+        ts = row[2] if isinstance(row[2], datetime) else datetime.fromisoformat(str(row[2]))
+        oldest = ts if oldest is None else min(oldest, ts)
+    return {
+        "depth": sum(int(row[1]) for row in rows),
+        "failing": sum(int(row[3] or 0) for row in rows),
+        "oldest_created_ts": oldest.replace(tzinfo=timezone.utc).isoformat() if oldest else None,
+        "lag_seconds": max(0.0, (current - oldest).total_seconds()) if oldest else 0.0,
+        "projects": {str(row[0]): int(row[1]) for row in rows},
+    }
+
+
+_MESSAGE_ARCHIVE_REF_UPSERT = (
+    "INSERT INTO message_archive_refs (message_id, project_id, path, commit_sha, updated_ts) "
+    "VALUES (:message_id, :project_id, :path, :commit_sha, :updated_ts) "
+    "ON CONFLICT(message_id) DO UPDATE SET project_id = excluded.project_id, path = excluded.path, "
+    "commit_sha = CASE WHEN excluded.path = message_archive_refs.path "
+    "THEN COALESCE(excluded.commit_sha, message_archive_refs.commit_sha) ELSE excluded.commit_sha END, "
+    "updated_ts = excluded.updated_ts"
+)
+
+
+def _message_archive_ref_params(refs: Iterable[tuple[int, int, str, str | None]]) -> list[dict[str, Any]]:
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return [
+        {"message_id": message_id, "project_id": project_id, "path": path, "commit_sha": commit_sha, "updated_ts": now}
+        for message_id, project_id, path, commit_sha in refs
+    ]
+
+
+async def record_message_archive_refs(
+    refs: Iterable[tuple[int, int, str, str | None]], *, session: AsyncSession | None = None
+) -> int:
+    """Upsert ``(message_id, project_id, path, commit_sha)`` rows into ``message_archive_refs``.
+
+    A NULL ``commit_sha`` keeps the SHA already recorded for the same path. With
+    ``session`` the rows join that transaction instead of committing on their own.
+    """
+    params = _message_archive_ref_params(refs)
+    if not params:
+        return 0
+    if session is not None:
+        await session.execute(text(_MESSAGE_ARCHIVE_REF_UPSERT), params)
+        return len(params)
+    await ensure_schema()
+    async with get_session() as own_session:
+        await own_session.execute(text(_MESSAGE_ARCHIVE_REF_UPSERT), params)
+        await own_session.commit()
+    return len(params)
+
+
+async def get_message_archive_ref(message_id: int) -> tuple[str, str | None] | None:
+    """Return ``(path, commit_sha)`` recorded for a message, or None if it was never indexed."""
+    await ensure_schema()
+    async with get_session(readonly=True) as session:
+        row = (
+            await session.execute(
+                text("SELECT path, commit_sha FROM message_archive_refs WHERE message_id = :mid"), {"mid": message_id}
+            )
+        ).first()
+    return (str(row[0]), row[1]) if row else None
+
+
+async def rebuild_message_archive_refs(project_id: int, refs: Iterable[tuple[int, str, str | None]]) -> int:
+    """Replace a project's ``message_archive_refs`` rows with ``(message_id, path, commit_sha)`` from an archive scan."""
+    params = _message_archive_ref_params((message_id, project_id, path, sha) for message_id, path, sha in refs)
+    await ensure_schema()
+    async with get_session() as session:
+        await session.execute(text("DELETE FROM message_archive_refs WHERE project_id = :pid"), {"pid": project_id})
+        if params:
+            await session.execute(text(_MESSAGE_ARCHIVE_REF_UPSERT), params)
+        await session.commit()
+    return len(params)
+
+
+_EVENT_TS_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+
+def _event_ts_iso(value: Any) -> str | None:
+    if value is None:
+        return None
+    ts = value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+    return ts.replace(tzinfo=timezone.utc).isoformat()
+
+
+async def get_inbox_at(project_id: int, agent_id: int, at: datetime, *, limit: int = 100) -> dict[str, Any]:
+    """Reconstruct an agent's inbox and held reservations as of ``at`` from ``mailbox_events``.
+
+    ``at`` is UTC (naive values are taken as UTC). Messages are newest first and
+    carry the read/ack timestamps that had been recorded by then.
+    """
+    if at.tzinfo is not None:
+        at = at.astimezone(timezone.utc).replace(tzinfo=None)
+    params = {"pid": project_id, "aid": agent_id, "at": at.strftime(_EVENT_TS_FORMAT), "limit": limit}
+    await ensure_schema()
+    async with get_session(readonly=True) as session:
+        messages = (
+            await session.execute(
+                text(
+                    """
+                    SELECT d.message_id, d.event_ts, d.detail,
+                           (SELECT MIN(r.event_ts) FROM mailbox_events r
+                            WHERE r.message_id = d.message_id AND r.agent_id = d.agent_id
+                              AND r.kind = 'read' AND r.event_ts <= :at),
+                           (SELECT MIN(a.event_ts) FROM mailbox_events a
+                            WHERE a.message_id = d.message_id AND a.agent_id = d.agent_id
+                              AND a.kind = 'acked' AND a.event_ts <= :at)
+                    FROM mailbox_events d
+                    WHERE d.agent_id = :aid AND d.project_id = :pid AND d.kind = 'delivered' AND d.event_ts <= :at
+                    ORDER BY d.event_ts DESC, d.message_id DESC
+                    LIMIT :limit
+                    """
+                ),
+                params,
+            )
+        ).all()
+        reservations = (
+            await session.execute(
+                text(
+                    """
+                    SELECT g.reservation_id, g.event_ts, g.detail,
+                           (SELECT json_extract(n.detail, '$.expires_ts') FROM mailbox_events n
+                            WHERE n.reservation_id = g.reservation_id AND n.kind = 'reservation_renewed'
+                              AND n.event_ts <= :at
+                            ORDER BY n.event_ts DESC, n.id DESC LIMIT 1)
+                    FROM mailbox_events g
+                    WHERE g.agent_id = :aid AND g.project_id = :pid AND g.kind = 'reservation_granted'
+                      AND g.event_ts <= :at
+                      AND NOT EXISTS (
+                          SELECT 1 FROM mailbox_events x
+                          WHERE x.reservation_id = g.reservation_id AND x.kind = 'reservation_released'
+                            AND x.event_ts <= :at
+                      )
+                    ORDER BY g.event_ts
+                    """
+                ),
+                params,
+            )
+        ).all()
+    inbox: list[dict[str, Any]] = []
+    for row in messages:
+        detail = json.loads(row[2] or "{}")
+        inbox.append(
+            {
+                "id": int(row[0]),
+                "subject": detail.get("subject", ""),
+                "from": detail.get("sender", ""),
+                "thread_id": detail.get("thread_id"),
+                "importance": detail.get("importance", "normal"),
+                "ack_required": bool(detail.get("ack_required")),
+                "kind": detail.get("kind", "to"),
+                "created_ts": _event_ts_iso(row[1]),
+                "read_ts": _event_ts_iso(row[3]),
+                "ack_ts": _event_ts_iso(row[4]),
+            }
+        )
+    held: list[dict[str, Any]] = []
+    for row in reservations:
+        detail = json.loads(row[2] or "{}")
+        expires = row[3] or detail.get("expires_ts")
+        if expires is None or datetime.fromisoformat(str(expires)) <= at:
+            continue
+        held.append(
+            {
+                "id": int(row[0]),
+                "path_pattern": detail.get("path_pattern", ""),
+                "exclusive": bool(detail.get("exclusive")),
+                "reason": detail.get("reason", ""),
+                "created_ts": _event_ts_iso(row[1]),
+                "expires_ts": _event_ts_iso(expires),
+            }
+        )
+    return {"at": at.replace(tzinfo=timezone.utc).isoformat(), "messages": inbox, "file_reservations": held}
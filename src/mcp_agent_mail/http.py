@@ -26,7 +26,6 @@ from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoin
 from starlette.types import Receive, Scope, Send
 
 from .app import (
-    _expire_stale_file_reservations,
     _tool_metrics_snapshot,
     build_mcp_server,
     get_project_sibling_data,
@@ -34,8 +33,17 @@ from .app import (
     update_project_sibling_status,
 )
 from .config import Settings, get_settings
-from .db import ensure_schema, get_session
+from .db import (
+    ensure_schema,
+    fts_project_query,
+    get_inbox_at,
+    get_message_archive_ref,
+    get_session,
+    record_message_archive_refs,
+)
 from .storage import (
+    archive_repo_root,
+    archive_repo_roots,
     archive_write_lock,
     collect_lock_status,
     ensure_archive,
@@ -447,8 +455,7 @@ def build_http_app(settings: Settings, server=None) -> FastAPI:
     # Background workers lifecycle
     async def _startup() -> None:  # pragma: no cover - service lifecycle
         if not (
-            settings.file_reservations_cleanup_enabled
-            or settings.ack_ttl_enabled
+            settings.ack_ttl_enabled
             or settings.retention_report_enabled
             or settings.quota_enabled
             or settings.tool_metrics_emit_enabled
@@ -456,42 +463,6 @@ def build_http_app(settings: Settings, server=None) -> FastAPI:
             fastapi_app.state._background_tasks = []
             return
 
-        async def _worker_cleanup() -> None:
-            while True:
-                try:
-                    await ensure_schema()
-                    async with get_session() as session:
-                        rows = await session.execute(text("SELECT DISTINCT project_id FROM file_reservations"))
-                        pids = [r[0] for r in rows.fetchall() if r[0] is not None]
-                    released_total = 0
-                    for pid in pids:
-                        with contextlib.suppress(Exception):
-                            stale = await _expire_stale_file_reservations(pid)
-                            released_total += len(stale)
-                    try:
-                        rich_console = importlib.import_module("rich.console")
-                        rich_panel = importlib.import_module("rich.panel")
-                        Console = rich_console.Console
-                        Panel = rich_panel.Panel
-                        Console().print(
-                            Panel.fit(
-                                f"projects_scanned={len(pids)} released={released_total}",
-                                title="File Reservations Cleanup",
-                                border_style="cyan",
-                            )
-                        )
-                    except Exception:
-                        pass
-                    with contextlib.suppress(Exception):
-                        structlog.get_logger("tasks").info(
-                            "file_reservations_cleanup",
-                            projects_scanned=len(pids),
-                            stale_released=released_total,
-                        )
-                except Exception:
-                    pass
-                await asyncio.sleep(settings.file_reservations_cleanup_interval_seconds)
-
         async def _worker_ack_ttl() -> None:
             import datetime as _dt
 
@@ -783,8 +754,6 @@ def build_http_app(settings: Settings, server=None) -> FastAPI:
                 await asyncio.sleep(max(60, settings.retention_report_interval_seconds))
 
         tasks = []
-        if settings.file_reservations_cleanup_enabled:
-            tasks.append(asyncio.create_task(_worker_cleanup()))
         if settings.ack_ttl_enabled:
             tasks.append(asyncio.create_task(_worker_ack_ttl()))
         if settings.tool_metrics_emit_enabled:
@@ -1199,7 +1168,7 @@ def build_http_app(settings: Settings, server=None) -> FastAPI:
                     await refresh_project_sibling_suggestions()
                     sibling_map = await get_project_sibling_data()
 
-                async with get_session() as session:
+                async with get_session(readonly=True) as session:
                     # Fetch recent messages with sender/project and computed recipient list
                     query = text(
                         """
@@ -1349,7 +1318,7 @@ def build_http_app(settings: Settings, server=None) -> FastAPI:
             await ensure_schema()
             await refresh_project_sibling_suggestions()
             sibling_map = await get_project_sibling_data()
-            async with get_session() as session:
+            async with get_session(readonly=True) as session:
                 rows = await session.execute(
                     text("SELECT id, slug, human_key, created_at FROM projects ORDER BY created_at DESC")
                 )
@@ -1378,7 +1347,7 @@ def build_http_app(settings: Settings, server=None) -> FastAPI:
             boost: int | None = None,
         ) -> HTMLResponse:
             await ensure_schema()
-            async with get_session() as session:
+            async with get_session(readonly=True) as session:
                 proj = await session.execute(
                     text("SELECT id, slug, human_key FROM projects WHERE slug = :k OR human_key = :k"), {"k": project}
                 )
@@ -1387,10 +1356,30 @@ def build_http_app(settings: Settings, server=None) -> FastAPI:
                     return await _render("error.html", message="Project not found")
                 pid = int(prow[0])
                 agents_q = await session.execute(
-                    text("SELECT id, name, program, model FROM agents WHERE project_id = :pid ORDER BY name"),
+                    text(
+                        """
+                        SELECT a.id, a.name, a.program, a.model,
+                               COALESCE(c.unread, 0), COALESCE(c.urgent_unread, 0), COALESCE(c.ack_pending, 0)
+                        FROM agents a
+                        LEFT JOIN mailbox_counters c ON c.project_id = a.project_id AND c.agent_id = a.id
+                        WHERE a.project_id = :pid
+                        ORDER BY a.name
+                        """
+                    ),
                     {"pid": pid},
                 )
-                agents = [{"id": r[0], "name": r[1], "program": r[2], "model": r[3]} for r in agents_q.fetchall()]
+                agents = [
+                    {
+                        "id": r[0],
+                        "name": r[1],
+                        "program": r[2],
+                        "model": r[3],
+                        "unread": int(r[4] or 0),
+                        "urgent_unread": int(r[5] or 0),
+                        "ack_pending": int(r[6] or 0),
+                    }
+                    for r in agents_q.fetchall()
+                ]
                 matched_messages: list[dict] = []
                 if q and q.strip():
                     # Prefer FTS5 when available (fts_messages maintained by triggers)
@@ -1404,12 +1393,12 @@ def build_http_app(settings: Settings, server=None) -> FastAPI:
                         + (
                             "ORDER BY m.created_ts DESC "
                             if (order or "relevance") == "time"
-                            else f"ORDER BY bm25(fts_messages, {weights[0]}, {weights[1]}, {weights[2]}) "
+                            else f"ORDER BY bm25(fts_messages, {weights[0]}, {weights[1]}, {weights[2]}, 0.0) "
                         )
                         + "LIMIT 10000"
                     )
                     try:
-                        search = await session.execute(text(fts_sql), {"pid": pid, "q": fts_expr or q})
+                        search = await session.execute(text(fts_sql), {"pid": pid, "q": fts_project_query(fts_expr or q, [pid])})
                         matched_messages = [
                             {
                                 "id": r[0],
@@ -1497,7 +1486,7 @@ def build_http_app(settings: Settings, server=None) -> FastAPI:
         async def unified_inbox(limit: int = 10000, filter_importance: str | None = None) -> HTMLResponse:
             """Unified inbox showing messages from all active agents across all projects."""
             await ensure_schema()
-            async with get_session() as session:
+            async with get_session(readonly=True) as session:
                 # Get all projects with their agents
                 projects_query = await session.execute(
                     text(
@@ -1519,8 +1508,10 @@ def build_http_app(settings: Settings, server=None) -> FastAPI:
                     agents_query = await session.execute(
                         text(
                             """
-                        SELECT a.id, a.name, a.program, a.model, a.last_active_ts
+                        SELECT a.id, a.name, a.program, a.model, a.last_active_ts,
+                               COALESCE(c.unread, 0), COALESCE(c.urgent_unread, 0), COALESCE(c.ack_pending, 0)
                         FROM agents a
+                        LEFT JOIN mailbox_counters c ON c.project_id = a.project_id AND c.agent_id = a.id
                         WHERE a.project_id = :pid
                         ORDER BY a.last_active_ts DESC, a.name ASC
                         """
@@ -1537,6 +1528,9 @@ def build_http_app(settings: Settings, server=None) -> FastAPI:
                                 "program": ar[2],
                                 "model": ar[3],
                                 "last_active": str(ar[4]) if ar[4] else None,
+                                "unread": int(ar[5] or 0),
+                                "urgent_unread": int(ar[6] or 0),
+                                "ack_pending": int(ar[7] or 0),
                             }
                         )
 
@@ -1633,7 +1627,7 @@ def build_http_app(settings: Settings, server=None) -> FastAPI:
         @fastapi_app.get("/mail/{project}/inbox/{agent}", response_class=HTMLResponse)
         async def mail_inbox(project: str, agent: str, limit: int = 10000, page: int = 1) -> HTMLResponse:
             await ensure_schema()
-            async with get_session() as session:
+            async with get_session(readonly=True) as session:
                 prow = (
                     await session.execute(
                         text("SELECT id, slug, human_key FROM projects WHERE slug = :k OR human_key = :k"),
@@ -1655,17 +1649,14 @@ def build_http_app(settings: Settings, server=None) -> FastAPI:
                 inbox_rows = await session.execute(
                     text(
                         """
-                    SELECT m.id, m.subject, s.name, m.created_ts, m.importance, m.thread_id
-                    FROM messages m
-                    JOIN message_recipients mr ON mr.message_id = m.id
-                    JOIN agents a ON a.id = mr.agent_id
-                    JOIN agents s ON s.id = m.sender_id
-                    WHERE m.project_id = :pid AND a.name = :name
-                    ORDER BY m.created_ts DESC
+                    SELECT message_id, subject, sender_name, created_ts, importance, thread_id
+                    FROM inbox_entries
+                    WHERE agent_id = :aid AND project_id = :pid
+                    ORDER BY created_ts DESC, message_id DESC
                     LIMIT :lim OFFSET :off
                     """
                     ),
-                    {"pid": pid, "name": agent, "lim": limit, "off": offset},
+                    {"pid": pid, "aid": int(arow[0]), "lim": limit, "off": offset},
                 )
                 items = [
                     {
@@ -1692,7 +1683,7 @@ def build_http_app(settings: Settings, server=None) -> FastAPI:
         @fastapi_app.get("/mail/{project}/message/{mid}", response_class=HTMLResponse)
         async def mail_message(project: str, mid: int) -> HTMLResponse:
             await ensure_schema()
-            async with get_session() as session:
+            async with get_session(readonly=True) as session:
                 prow = (
                     await session.execute(
                         text("SELECT id, slug, human_key FROM projects WHERE slug = :k OR human_key = :k"),
@@ -1747,7 +1738,12 @@ def build_http_app(settings: Settings, server=None) -> FastAPI:
             try:
                 settings = get_settings()
                 archive = await ensure_archive(settings, prow[1])
-                commit_sha = await get_message_commit_sha(archive, mid)
+                ref = await get_message_archive_ref(mid)
+                if ref is not None and ref[1] and (archive.repo_root / ref[0]).is_file():
+                    commit_sha = ref[1]
+                else:
+                    # Not indexed yet (archived before message_archive_refs, or a coalesced commit)
+                    commit_sha = await get_message_commit_sha(archive, mid)
             except Exception:
                 pass  # Commit SHA is optional
 
@@ -1926,7 +1922,7 @@ def build_http_app(settings: Settings, server=None) -> FastAPI:
             For threads with 1000+ messages, consider adding LIMIT/OFFSET pagination.
             """
             await ensure_schema()
-            async with get_session() as session:
+            async with get_session(readonly=True) as session:
                 # Get project
                 prow = (
                     await session.execute(
@@ -2023,7 +2019,7 @@ def build_http_app(settings: Settings, server=None) -> FastAPI:
             boost: int | None = None,
         ) -> HTMLResponse:
             await ensure_schema()
-            async with get_session() as session:
+            async with get_session(readonly=True) as session:
                 prow = (
                     await session.execute(
                         text("SELECT id, slug, human_key FROM projects WHERE slug = :k OR human_key = :k"),
@@ -2043,12 +2039,12 @@ def build_http_app(settings: Settings, server=None) -> FastAPI:
                     + (
                         "ORDER BY m.created_ts DESC "
                         if (order or "relevance") == "time"
-                        else f"ORDER BY bm25(fts_messages, {weights[0]}, {weights[1]}, {weights[2]}) "
+                        else f"ORDER BY bm25(fts_messages, {weights[0]}, {weights[1]}, {weights[2]}, 0.0) "
                     )
                     + "LIMIT :lim"
                 )
                 try:
-                    rows = await session.execute(text(fts_sql), {"pid": pid, "q": fts_expr or q, "lim": limit})
+                    rows = await session.execute(text(fts_sql), {"pid": pid, "q": fts_project_query(fts_expr or q, [pid]), "lim": limit})
                     results = [
                         {
                             "id": r[0],
@@ -2100,7 +2096,7 @@ def build_http_app(settings: Settings, server=None) -> FastAPI:
         @fastapi_app.get("/mail/{project}/file_reservations", response_class=HTMLResponse)
         async def mail_file_reservations(project: str) -> HTMLResponse:
             await ensure_schema()
-            async with get_session() as session:
+            async with get_session(readonly=True) as session:
                 prow = (
                     await session.execute(
                         text("SELECT id, slug, human_key FROM projects WHERE slug = :k OR human_key = :k"),
@@ -2133,7 +2129,7 @@ def build_http_app(settings: Settings, server=None) -> FastAPI:
         @fastapi_app.get("/mail/{project}/attachments", response_class=HTMLResponse)
         async def mail_attachments(project: str) -> HTMLResponse:
             await ensure_schema()
-            async with get_session() as session:
+            async with get_session(readonly=True) as session:
                 prow = (
                     await session.execute(
                         text("SELECT id, slug, human_key FROM projects WHERE slug = :k OR human_key = :k"),
@@ -2174,7 +2170,7 @@ def build_http_app(settings: Settings, server=None) -> FastAPI:
         async def overseer_compose(project: str) -> HTMLResponse:
             """Display Human Overseer message composer."""
             await ensure_schema()
-            async with get_session() as session:
+            async with get_session(readonly=True) as session:
                 # Get project
                 prow = (
                     await session.execute(
@@ -2429,7 +2425,7 @@ def build_http_app(settings: Settings, server=None) -> FastAPI:
 
                     try:
                         # Write message bundle (canonical + outbox + inboxes) to Git
-                        await write_message_bundle(
+                        archived = await write_message_bundle(
                             archive,
                             message_dict,
                             full_body,
@@ -2438,6 +2434,9 @@ def build_http_app(settings: Settings, server=None) -> FastAPI:
                             extra_paths=None,
                             commit_text=f"Human Overseer message: {subject}"
                         )
+                        await record_message_archive_refs(
+                            [(message_id, project_id, archived.path, archived.commit_sha)], session=session
+                        )
                     except Exception as git_error:
                         # Rollback database transaction if Git write fails
                         await session.rollback()
@@ -2496,20 +2495,33 @@ def build_http_app(settings: Settings, server=None) -> FastAPI:
 
             from git import Repo as GitRepo
 
-            repo_root = P(storage_root)
-            if (repo_root / ".git").exists():
-                repo = None
+            repo_roots = archive_repo_roots(settings)
+            if repo_roots:
                 try:
-                    repo = GitRepo(str(repo_root))
                     # Use efficient commit counting with limit to prevent DoS
-                    commit_count = sum(1 for _ in repo.iter_commits(max_count=10000))
-                    total_commits = "10,000+" if commit_count == 10000 else f"{commit_count:,}"
-                    last_commit = next(repo.iter_commits(max_count=1), None)
-                    last_commit_time = last_commit.authored_datetime.strftime("%b %d, %Y") if last_commit else "Never"
+                    commit_count = 0
+                    last_commit_ts: float | None = None
+                    for repo_root in repo_roots:
+                        repo = GitRepo(str(repo_root))
+                        try:
+                            commit_count += sum(1 for _ in repo.iter_commits(max_count=10000 - commit_count))
+                            last_commit = next(repo.iter_commits(max_count=1), None)
+                            if last_commit is not None and (last_commit_ts is None or last_commit.authored_date > last_commit_ts):
+                                last_commit_ts = last_commit.authored_date
+                        finally:
+                            repo.close()
+                        if commit_count >= 10000:
+                            break
+                    total_commits = "10,000+" if commit_count >= 10000 else f"{commit_count:,}"
+                    last_commit_time = (
+                        datetime.fromtimestamp(last_commit_ts).strftime("%b %d, %Y") if last_commit_ts else "Never"
+                    )
 
                     # Count projects (with limit for performance)
-                    projects_dir = repo_root / "projects"
-                    if projects_dir.exists():
+                    projects_dir = P(storage_root) / "projects"
+                    if settings.storage.layout == "per-project":
+                        project_count = min(len(repo_roots), 100)
+                    elif projects_dir.exists():
                         # Use islice to avoid loading all dirs into memory
                         from itertools import islice
 
@@ -2523,7 +2535,7 @@ def build_http_app(settings: Settings, server=None) -> FastAPI:
                     try:
                         def _run_du():
                             return _subprocess.run(
-                                ["du", "-sh", str(repo_root)],
+                                ["du", "-sh", storage_root],
                                 capture_output=True,
                                 text=True,
                                 timeout=5.0,
@@ -2542,9 +2554,6 @@ def build_http_app(settings: Settings, server=None) -> FastAPI:
                     project_count = 0
                     repo_size = "Unknown"
                     last_commit_time = "Unknown"
-                finally:
-                    if repo is not None:
-                        repo.close()
             else:
                 total_commits = "0"
                 project_count = 0
@@ -2552,7 +2561,7 @@ def build_http_app(settings: Settings, server=None) -> FastAPI:
                 last_commit_time = "Never"
 
             # Get list of projects for picker
-            async with get_session() as session:
+            async with get_session(readonly=True) as session:
                 rows = await session.execute(text("SELECT slug, human_key FROM projects ORDER BY human_key"))
                 projects = [{"slug": r[0], "human_key": r[1]} for r in rows.fetchall()]
 
@@ -2573,45 +2582,51 @@ def build_http_app(settings: Settings, server=None) -> FastAPI:
             limit = max(1, min(limit, 500))  # Between 1 and 500
 
             settings = get_settings()
-            repo_root = Path(settings.storage.root).expanduser().resolve()
 
             from git import Repo as GitRepo
 
-            if not (repo_root / ".git").exists():
-                return await _render("archive_activity.html", commits=[])
-
-            repo = GitRepo(str(repo_root))
-            try:
-                commits = await get_recent_commits(repo, limit=limit)
-                return await _render("archive_activity.html", commits=commits)
-            finally:
-                repo.close()
+            commits: list[dict[str, Any]] = []
+            for repo_root in archive_repo_roots(settings):
+                repo = GitRepo(str(repo_root))
+                try:
+                    commits.extend(await get_recent_commits(repo, limit=limit))
+                finally:
+                    repo.close()
+            # Per-project repos each contribute their own recent commits; merge by date.
+            commits.sort(key=lambda c: c["date"], reverse=True)
+            return await _render("archive_activity.html", commits=commits[:limit])
 
         @fastapi_app.get("/mail/archive/commit/{sha}", response_class=HTMLResponse)
         async def archive_commit(sha: str) -> HTMLResponse:
             """Display detailed commit information with diffs."""
             settings = get_settings()
-            repo_root = Path(settings.storage.root).expanduser().resolve()
+            repo_roots = archive_repo_roots(settings)
 
             from git import Repo as GitRepo
 
-            if not (repo_root / ".git").exists():
+            if not repo_roots:
                 return await _render("error.html", message="Archive repository not found")
 
-            repo = None
-            try:
-                repo = GitRepo(str(repo_root))
-                commit = await get_commit_detail(repo, sha)
-                return await _render("archive_commit.html", commit=commit)
-            except ValueError:
-                # Validation errors (bad SHA, etc.)
+            # With per-project repos the SHA can live in any of them; try each in turn.
+            invalid = False
+            for repo_root in repo_roots:
+                repo = None
+                try:
+                    repo = GitRepo(str(repo_root))
+                    commit = await get_commit_detail(repo, sha)
+                    return await _render("archive_commit.html", commit=commit)
+                except ValueError:
+                    # Validation errors (bad SHA, etc.)
+                    invalid = True
+                except Exception:
+                    # Don't leak error details
+                    continue
+                finally:
+                    if repo is not None:
+                        repo.close()
+            if invalid:
                 return await _render("error.html", message="Invalid commit identifier")
-            except Exception:
-                # Don't leak error details
-                return await _render("error.html", message="Commit not found")
-            finally:
-                if repo is not None:
-                    repo.close()
+            return await _render("error.html", message="Commit not found")
 
         @fastapi_app.get("/mail/archive/timeline", response_class=HTMLResponse)
         async def archive_timeline(project: str | None = None) -> HTMLResponse:
@@ -2621,16 +2636,15 @@ def build_http_app(settings: Settings, server=None) -> FastAPI:
                 return await _render("error.html", message="Invalid project identifier")
 
             settings = get_settings()
-            repo_root = Path(settings.storage.root).expanduser().resolve()
 
             from git import Repo as GitRepo
 
-            if not (repo_root / ".git").exists():
+            if not archive_repo_roots(settings):
                 return await _render("error.html", message="Archive repository not found")
 
             # Default to first project if not specified
             if not project:
-                async with get_session() as session:
+                async with get_session(readonly=True) as session:
                     row = (
                         await session.execute(text("SELECT slug, human_key FROM projects ORDER BY id LIMIT 1"))
                     ).fetchone()
@@ -2641,13 +2655,17 @@ def build_http_app(settings: Settings, server=None) -> FastAPI:
 
             # Get project name
             project_name = project
-            async with get_session() as session:
+            async with get_session(readonly=True) as session:
                 row = (
                     await session.execute(text("SELECT human_key FROM projects WHERE slug = :s"), {"s": project})
                 ).fetchone()
                 if row:
                     project_name = row[0]
 
+            repo_root = archive_repo_root(settings, project)
+            if not (repo_root / ".git").exists():
+                return await _render("error.html", message="Archive repository not found")
+
             repo = GitRepo(str(repo_root))
             try:
                 commits = await get_timeline_commits(repo, project, limit=100)
@@ -2702,16 +2720,15 @@ def build_http_app(settings: Settings, server=None) -> FastAPI:
                 return await _render("error.html", message="Invalid project identifier")
 
             settings = get_settings()
-            repo_root = Path(settings.storage.root).expanduser().resolve()
 
             from git import Repo as GitRepo
 
-            if not (repo_root / ".git").exists():
+            if not archive_repo_roots(settings):
                 return await _render("error.html", message="Archive repository not found")
 
             # Default to first project
             if not project:
-                async with get_session() as session:
+                async with get_session(readonly=True) as session:
                     row = (
                         await session.execute(text("SELECT slug, human_key FROM projects ORDER BY id LIMIT 1"))
                     ).fetchone()
@@ -2722,13 +2739,17 @@ def build_http_app(settings: Settings, server=None) -> FastAPI:
 
             # Get project name
             project_name = project
-            async with get_session() as session:
+            async with get_session(readonly=True) as session:
                 row = (
                     await session.execute(text("SELECT human_key FROM projects WHERE slug = :s"), {"s": project})
                 ).fetchone()
                 if row:
                     project_name = row[0]
 
+            repo_root = archive_repo_root(settings, project)
+            if not (repo_root / ".git").exists():
+                return await _render("error.html", message="Archive repository not found")
+
             repo = GitRepo(str(repo_root))
             try:
                 graph = await get_agent_communication_graph(repo, project, limit=200)
@@ -2743,7 +2764,7 @@ def build_http_app(settings: Settings, server=None) -> FastAPI:
             if not _validate_project_slug(project):
                 raise HTTPException(status_code=400, detail="Invalid project identifier")
 
-            async with get_session() as session:
+            async with get_session(readonly=True) as session:
                 # Get project ID
                 proj_result = await session.execute(
                     text("SELECT id FROM projects WHERE slug = :k OR human_key = :k"),
@@ -2766,7 +2787,7 @@ def build_http_app(settings: Settings, server=None) -> FastAPI:
         async def archive_time_travel() -> HTMLResponse:
             """Display time-travel interface."""
             # Get all projects
-            async with get_session() as session:
+            async with get_session(readonly=True) as session:
                 rows = await session.execute(text("SELECT slug FROM projects ORDER BY human_key"))
                 projects = [r[0] for r in rows.fetchall()]
 
@@ -2788,6 +2809,43 @@ def build_http_app(settings: Settings, server=None) -> FastAPI:
                 raise HTTPException(status_code=400, detail="Invalid timestamp format. Use ISO 8601 format (YYYY-MM-DDTHH:MM)")
 
             try:
+                # Known agents are replayed from mailbox_events, which also carries read/ack state;
+                # the git walk remains for archives whose database rows are gone.
+                async with get_session(readonly=True) as session:
+                    ids = (
+                        await session.execute(
+                            text(
+                                "SELECT p.id, a.id FROM projects p JOIN agents a ON a.project_id = p.id "
+                                "WHERE p.slug = :slug AND lower(a.name) = lower(:agent)"
+                            ),
+                            {"slug": project, "agent": agent},
+                        )
+                    ).first()
+                if ids is not None:
+                    at = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+                    if at.tzinfo is None:
+                        at = at.replace(tzinfo=timezone.utc)
+                    state = await get_inbox_at(int(ids[0]), int(ids[1]), at, limit=200)
+                    return JSONResponse({
+                        "messages": [
+                            {
+                                "id": item["id"],
+                                "subject": item["subject"],
+                                "date": item["created_ts"],
+                                "from": item["from"],
+                                "importance": item["importance"],
+                                "read_ts": item["read_ts"],
+                                "ack_ts": item["ack_ts"],
+                            }
+                            for item in state["messages"]
+                        ],
+                        "file_reservations": state["file_reservations"],
+                        "snapshot_time": state["at"],
+                        "commit_sha": None,
+                        "requested_time": timestamp,
+                        "source": "events",
+                    })
+
                 # Get project archive
                 settings = get_settings()
                 repo = await ensure_archive(settings, project)
@@ -83,6 +83,47 @@ class MessageRecipient(SQLModel, table=True):
     ack_ts: Optional[datetime] = Field(default=None)
 
 
+class InboxEntry(SQLModel, table=True):
+    """Denormalized per-recipient inbox row, kept in sync by triggers on message_recipients.
+
+    Inbox listings read this table with a single index-range scan on
+    (agent_id, project_id, created_ts DESC) instead of joining messages and agents.
+    """
+
+    __tablename__ = "inbox_entries"
+
+    message_id: int = Field(foreign_key="messages.id", primary_key=True)
+    agent_id: int = Field(foreign_key="agents.id", primary_key=True)
+    project_id: int = Field(foreign_key="projects.id")
+    sender_id: int = Field(foreign_key="agents.id")
+    sender_name: str = Field(default="", max_length=128)
+    subject: str = Field(default="", max_length=512)
+    thread_id: Optional[str] = Field(default=None, max_length=128)
+    importance: str = Field(default="normal", max_length=16)
+    ack_required: bool = Field(default=False)
+    kind: str = Field(max_length=8, default="to")
+    created_ts: datetime = Field(default_factory=_utcnow_naive)
+    read_ts: Optional[datetime] = Field(default=None)
+    ack_ts: Optional[datetime] = Field(default=None)
+
+
+class MailboxCounter(SQLModel, table=True):
+    """Per-(project, agent) badge counters, maintained by triggers on inbox_entries.
+
+    Lets dashboards and agents poll unread/urgent/ack-pending totals with a
+    single primary-key lookup instead of scanning message_recipients.
+    """
+
+    __tablename__ = "mailbox_counters"
+
+    project_id: int = Field(foreign_key="projects.id", primary_key=True)
+    agent_id: int = Field(foreign_key="agents.id", primary_key=True)
+    total: int = Field(default=0)
+    unread: int = Field(default=0)
+    urgent_unread: int = Field(default=0)
+    ack_pending: int = Field(default=0)
+
+
 class Message(SQLModel, table=True):
     __tablename__ = "messages"
     __table_args__ = (
@@ -96,6 +137,9 @@ class Message(SQLModel, table=True):
     thread_id: Optional[str] = Field(default=None, index=True, max_length=128)
     subject: str = Field(max_length=512)
     body_md: str
+    # Short single-line snippet and length of body_md, so metadata-only listings can defer the body.
+    preview: str = Field(default="", max_length=160, sa_column_kwargs={"server_default": ""})
+    body_len: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
     importance: str = Field(default="normal", max_length=16)
     ack_required: bool = Field(default=False)
     created_ts: datetime = Field(default_factory=_utcnow_naive)
@@ -105,6 +149,84 @@ class Message(SQLModel, table=True):
     )
 
 
+class ArchiveJob(SQLModel, table=True):
+    """Pending Git archive write for a message that is already committed to SQLite.
+
+    Written in the same transaction as the message when the archive outbox is
+    enabled; a background worker writes the Markdown copies, commits them and
+    deletes the row.
+    """
+
+    __tablename__ = "archive_jobs"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    project_id: int = Field(foreign_key="projects.id", index=True)
+    message_id: int = Field(index=True)
+    payload: dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSON, nullable=False))
+    attempts: int = Field(default=0)
+    last_error: Optional[str] = Field(default=None, max_length=1024)
+    created_ts: datetime = Field(default_factory=_utcnow_naive)
+
+
+class MessageArchiveRef(SQLModel, table=True):
+    """Canonical archive path of a message and the commit that wrote it.
+
+    Recorded when the message is archived so provenance lookups are a primary-key
+    read instead of a directory scan plus history walk; ``commit_sha`` stays NULL
+    until known when the commit was coalesced. Rebuild with ``archive rebuild-refs``.
+    """
+
+    __tablename__ = "message_archive_refs"
+
+    message_id: int = Field(primary_key=True)
+    project_id: int = Field(foreign_key="projects.id", index=True)
+    path: str = Field(max_length=512)
+    commit_sha: Optional[str] = Field(default=None, max_length=40)
+    updated_ts: datetime = Field(default_factory=_utcnow_naive)
+
+
+class MailboxEvent(SQLModel, table=True):
+    """Append-only log of mailbox state changes, written by triggers.
+
+    ``delivered``/``read``/``acked`` rows mirror message_recipients and
+    ``reservation_granted``/``reservation_renewed``/``reservation_released``
+    rows mirror file_reservations, so an agent's inbox (with read/ack state)
+    and held reservations at any past time are an index range scan away.
+    ``detail`` carries the fields needed to render the entry without joining
+    rows that may since have moved to the cold tier.
+    """
+
+    __tablename__ = "mailbox_events"
+    __table_args__ = (
+        Index("idx_mailbox_events_agent_kind_ts", "agent_id", "project_id", "kind", "event_ts"),
+        Index("idx_mailbox_events_message_agent", "message_id", "agent_id", "kind"),
+        Index("idx_mailbox_events_reservation", "reservation_id", "kind"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    project_id: int = Field(foreign_key="projects.id")
+    agent_id: int = Field(foreign_key="agents.id")
+    kind: str = Field(max_length=24)
+    message_id: Optional[int] = Field(default=None)
+    reservation_id: Optional[int] = Field(default=None)
+    event_ts: datetime = Field(default_factory=_utcnow_naive)
+    detail: dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSON, nullable=False, server_default="{}"))
+
+
+class FileReservationVersion(SQLModel, table=True):
+    """Per-project change counter for file_reservations, bumped by triggers on every row write.
+
+    In-process reservation indexes compare it with the version they were built
+    from, so one primary-key lookup tells them whether any writer (this server,
+    the CLI, another process) has touched the project's reservations since.
+    """
+
+    __tablename__ = "file_reservation_versions"
+
+    project_id: int = Field(foreign_key="projects.id", primary_key=True)
+    version: int = Field(default=0)
+
+
 class FileReservation(SQLModel, table=True):
     __tablename__ = "file_reservations"
     __table_args__ = (
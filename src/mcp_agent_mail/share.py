@@ -663,6 +663,17 @@ def _format_in_clause(count: int) -> str:
     return ",".join("?" for _ in range(count))
 
 
+# Tables holding per-project server state with foreign keys to projects/agents; their rows
+# must go before the projects and agents they reference.
+_PROJECT_SCOPED_SERVER_TABLES = (
+    "mailbox_counters",
+    "mailbox_events",
+    "file_reservation_versions",
+    "archive_jobs",
+    "message_archive_refs",
+)
+
+
 def apply_project_scope(snapshot_path: Path, identifiers: Sequence[str]) -> ProjectScopeResult:
     """Restrict the snapshot to the requested projects and return retained records."""
 
@@ -732,6 +743,11 @@ def apply_project_scope(snapshot_path: Path, identifiers: Sequence[str]) -> Proj
                 tuple(int(row["id"]) for row in to_remove_messages),
             )
 
+        # Server-side bookkeeping keyed by project (absent from snapshots of older databases).
+        for table in _PROJECT_SCOPED_SERVER_TABLES:
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone():
+                conn.execute(f"DELETE FROM {table} WHERE project_id NOT IN ({placeholders})", params)
+
         conn.execute(
             f"DELETE FROM messages WHERE project_id NOT IN ({placeholders})",
             params,
@@ -934,6 +950,21 @@ def scrub_snapshot(
             if attachments_updated or attachment_replacements or attachment_keys_removed:
                 attachments_sanitized += 1
 
+        # The mailbox event log replays read/ack and reservation history, and caches
+        # subjects; keep it consistent with what was cleared and scrubbed above.
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'mailbox_events'").fetchone():
+            if clear_recipients:
+                conn.execute("DELETE FROM mailbox_events WHERE kind IN ('read', 'acked')")
+            if clear_file_reservations:
+                conn.execute("DELETE FROM mailbox_events WHERE reservation_id IS NOT NULL")
+            conn.execute(
+                "UPDATE mailbox_events SET detail = json_set(detail, '$.subject', "
+                "(SELECT subject FROM messages WHERE messages.id = mailbox_events.message_id)) "
+                "WHERE kind = 'delivered' AND message_id IN (SELECT id FROM messages)"
+            )
+            if clear_ack_state:
+                conn.execute("UPDATE mailbox_events SET detail = json_set(detail, '$.ack_required', 0) WHERE kind = 'delivered'")
+
         conn.commit()
     finally:
         conn.close()
@@ -954,11 +985,42 @@ def scrub_snapshot(
     )
 
 
+_SERVER_FTS_TRIGGERS = ("fts_messages_ai", "fts_messages_ad", "fts_messages_au")
+
+
+def _drop_server_search_index(conn: sqlite3.Connection) -> None:
+    """Remove the server's trigger-fed fts_messages index (and its content view) from a snapshot.
+
+    The server index is external-content over ``messages_fts_source`` with a
+    different column set than the viewer's; rewriting it in place (or letting its
+    triggers fire during scoping/scrubbing) corrupts it, so exports drop it and
+    build their own self-contained index instead.
+    """
+    for trigger in _SERVER_FTS_TRIGGERS:
+        conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    row = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'fts_messages'").fetchone()
+    if row is not None and "project_slug" not in str(row[0]):
+        conn.execute("DROP TABLE fts_messages")
+    conn.execute("DROP VIEW IF EXISTS messages_fts_source")
+
+
+def drop_server_search_index(snapshot_path: Path) -> None:
+    """Strip the server's FTS index from a freshly copied snapshot before it is scoped or scrubbed."""
+
+    conn = sqlite3.connect(str(snapshot_path))
+    try:
+        _drop_server_search_index(conn)
+        conn.commit()
+    finally:
+        conn.close()
+
+
 def build_search_indexes(snapshot_path: Path) -> bool:
     """Create or refresh FTS5 indexes for full-text search. Returns True on success."""
 
     conn = sqlite3.connect(str(snapshot_path))
     try:
+        _drop_server_search_index(conn)
         conn.execute(
             """
             CREATE VIRTUAL TABLE IF NOT EXISTS fts_messages USING fts5(
@@ -1301,6 +1363,23 @@ def create_performance_indexes(snapshot_path: Path) -> None:
         conn.close()
 
 
+def _resolve_attachment_source(storage_root: Path, original_path: str) -> Path:
+    """Resolve an archive-relative attachment path against the storage root.
+
+    Paths are recorded relative to the project's repo (``projects/<slug>/...``);
+    with ``STORAGE_LAYOUT=per-project`` that repo lives under ``repos/<slug>``.
+    """
+    source_path = Path(original_path)
+    if source_path.is_absolute():
+        return source_path
+    parts = source_path.parts
+    if len(parts) > 2 and parts[0] == "projects":
+        per_project = storage_root / "repos" / parts[1] / source_path
+        if per_project.exists():
+            return per_project.resolve()
+    return (storage_root / source_path).resolve()
+
+
 def summarize_snapshot(
     snapshot_path: Path,
     *,
@@ -1365,9 +1444,7 @@ def summarize_snapshot(
                 if not original_path:
                     attachments_stats["missing"] += 1
                     continue
-                source_path = Path(original_path)
-                if not source_path.is_absolute():
-                    source_path = (storage_root / original_path).resolve()
+                source_path = _resolve_attachment_source(storage_root, original_path)
                 if not source_path.exists():
                     attachments_stats["missing"] += 1
                     continue
@@ -1403,6 +1480,7 @@ def create_snapshot_context(
     """Materialize and prepare a snapshot for export."""
 
     create_sqlite_snapshot(source_database, snapshot_path)
+    drop_server_search_index(snapshot_path)
     scope = apply_project_scope(snapshot_path, project_filters)
     scrub_summary = scrub_snapshot(snapshot_path, preset=scrub_preset)
     fts_enabled = build_search_indexes(snapshot_path)
@@ -1471,9 +1549,7 @@ def bundle_attachments(
                 if not original_path:
                     updated_list.append(entry)
                     continue
-                source_path = Path(original_path)
-                if not source_path.is_absolute():
-                    source_path = (storage_root / original_path).resolve()
+                source_path = _resolve_attachment_source(storage_root, original_path)
                 if not source_path.is_file():
                     missing_count += 1
                     manifest_items.append(
@@ -3,23 +3,28 @@
 from __future__ import annotations
 
 import asyncio
+import atexit
 import base64
 import contextlib
+import difflib
 import hashlib
 import json
 import os
 import re
+import subprocess
 import sys
+import threading
 import time
+from collections import OrderedDict
 from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path, PurePosixPath
-from typing import Any, AsyncIterator, Iterable, Sequence, TypeVar, cast
+from typing import Any, AsyncIterator, Callable, Iterable, Iterator, Sequence, TypeVar, cast
 
 from filelock import SoftFileLock, Timeout
 from git import Actor, Repo
-from git.objects.tree import Tree
 from PIL import Image
 
 from .config import Settings
@@ -27,15 +32,17 @@ from .utils import validate_thread_id_format
 
 _IMAGE_PATTERN = re.compile(r"!\[(?P<alt>[^\]]*)\]\((?P<path>[^)]+)\)")
 _SUBJECT_SLUG_RE = re.compile(r"[^a-zA-Z0-9._-]+")
+_MESSAGE_FILE_ID_RE = re.compile(r"(?:^|__)(\d+)\.md$")
 
 
 @dataclass(slots=True)
 class ProjectArchive:
     settings: Settings
     slug: str
-    # Project-specific root inside the single global archive repo
+    # Project-specific root (``projects/<slug>``) inside the archive repo
     root: Path
-    # The single Git repo object rooted at settings.storage.root
+    # The shared repo at settings.storage.root, or the project's own repo under
+    # ``repos/<slug>`` when STORAGE_LAYOUT=per-project
     repo: Repo
     # Path used for advisory file lock during archive writes
     lock_path: Path
@@ -46,6 +53,16 @@ class ProjectArchive:
     def attachments_dir(self) -> Path:
         return self.root / "attachments"
 
+
+@dataclass(slots=True, frozen=True)
+class ArchivedMessage:
+    """Where ``write_message_bundle`` put a message's canonical copy."""
+
+    # Repo-relative path of the canonical ``messages/YYYY/MM/...`` file
+    path: str
+    # Commit that wrote it, when known at write time
+    commit_sha: str | None
+
 _PROCESS_LOCKS: dict[tuple[int, str], asyncio.Lock] = {}
 _PROCESS_LOCK_OWNERS: dict[tuple[int, str], int] = {}
 
@@ -284,9 +301,12 @@ def proactive_fd_cleanup(*, threshold: int = 100) -> int:
 def clear_repo_cache() -> int:
     """Close all cached Repo objects and clear the cache.
 
-    Returns the number of repos that were closed.
-    Should be called during shutdown or between tests.
+    Also stops any fast-import commit processes and pooled cat-file readers.
+    Returns the number of repos that were closed. Should be called during
+    shutdown or between tests.
     """
+    close_fast_import_writers()
+    close_object_readers()
     return _REPO_CACHE.clear()
 
 
@@ -662,8 +682,37 @@ async def ensure_archive_root(settings: Settings) -> tuple[Path, Repo]:
     return repo_root, repo
 
 
+def archive_repo_root(settings: Settings, slug: str) -> Path:
+    """Return the Git work tree that holds ``slug``'s archive.
+
+    Both layouts keep the project under ``projects/<slug>/`` inside its repo, so
+    in-repo paths (and everything that filters history by them) are identical;
+    only the repository they live in differs.
+    """
+    root = Path(settings.storage.root).expanduser().resolve()
+    if settings.storage.layout == "per-project":
+        return root / "repos" / slug
+    return root
+
+
+def archive_repo_roots(settings: Settings) -> list[Path]:
+    """Return every existing archive repo for the configured layout."""
+    root = Path(settings.storage.root).expanduser().resolve()
+    if settings.storage.layout != "per-project":
+        return [root] if (root / ".git").exists() else []
+    repos_dir = root / "repos"
+    if not repos_dir.is_dir():
+        return []
+    return sorted(path for path in repos_dir.iterdir() if (path / ".git").exists())
+
+
 async def ensure_archive(settings: Settings, slug: str) -> ProjectArchive:
-    repo_root, repo = await ensure_archive_root(settings)
+    if settings.storage.layout == "per-project":
+        repo_root = archive_repo_root(settings, slug)
+        await _to_thread(repo_root.mkdir, parents=True, exist_ok=True)
+        repo = await _ensure_repo(repo_root, settings)
+    else:
+        repo_root, repo = await ensure_archive_root(settings)
     project_root = repo_root / "projects" / slug
     await _to_thread(project_root.mkdir, parents=True, exist_ok=True)
     return ProjectArchive(
@@ -739,7 +788,7 @@ async def write_agent_profile(archive: ProjectArchive, agent: dict[str, object])
     profile_path = archive.root / "agents" / agent["name"].__str__() / "profile.json"
     await _write_json(profile_path, agent)
     rel = profile_path.relative_to(archive.repo_root).as_posix()
-    await _commit(archive.repo, archive.settings, f"agent: profile {agent['name']}", [rel])
+    await _archive_commit(archive.repo, archive.settings, f"agent: profile {agent['name']}", [rel])
 
 
 def _build_file_reservation_commit_message(entries: Sequence[tuple[str, str]]) -> str:
@@ -773,7 +822,7 @@ async def write_file_reservation_records(
         agent_name = str(normalized_file_reservation.get("agent", "unknown"))
         entries.append((agent_name, path_pattern))
     commit_message = _build_file_reservation_commit_message(entries)
-    await _commit(archive.repo, archive.settings, commit_message, rel_paths)
+    await _archive_commit(archive.repo, archive.settings, commit_message, rel_paths)
 
 
 async def write_file_reservation_record(archive: ProjectArchive, file_reservation: dict[str, object]) -> None:
@@ -788,7 +837,15 @@ async def write_message_bundle(
     recipients: Sequence[str],
     extra_paths: Sequence[str] | None = None,
     commit_text: str | None = None,
-) -> None:
+) -> ArchivedMessage:
+    """Write the canonical, outbox and inbox copies of a message and commit them.
+
+    With ``STORAGE_MAILBOX_COPIES=stub`` the outbox/inbox copies hold only the
+    frontmatter plus a ``canonical`` pointer instead of repeating the body.
+
+    Returns the canonical copy's repo-relative path and the commit SHA (None when
+    the commit is deferred to a coalesced batch or nothing changed).
+    """
     timestamp_obj: Any = message.get("created") or message.get("created_ts")
     timestamp_str = timestamp_obj if isinstance(timestamp_obj, str) else datetime.now(timezone.utc).isoformat()
     now = datetime.fromisoformat(timestamp_str)
@@ -824,22 +881,30 @@ async def write_message_bundle(
     )
     canonical_path = canonical_dir / filename
     await _write_text(canonical_path, content)
-    rel_paths.append(canonical_path.relative_to(archive.repo_root).as_posix())
+    canonical_rel = canonical_path.relative_to(archive.repo_root).as_posix()
+    rel_paths.append(canonical_rel)
+
+    mailbox_content = content
+    if archive.settings.storage.mailbox_copies == "stub":
+        # Mailbox copies only carry the frontmatter and point at the canonical file
+        canonical_from_mailbox = Path(os.path.relpath(canonical_path, outbox_dir)).as_posix()
+        stub_meta = dict(message, canonical=canonical_path.relative_to(archive.root).as_posix())
+        stub_frontmatter = json.dumps(stub_meta, indent=2, sort_keys=True)
+        mailbox_content = f"---json\n{stub_frontmatter}\n---\n\n[View canonical]({canonical_from_mailbox})\n"
 
     outbox_path = outbox_dir / filename
-    await _write_text(outbox_path, content)
+    await _write_text(outbox_path, mailbox_content)
     rel_paths.append(outbox_path.relative_to(archive.repo_root).as_posix())
 
     for inbox_dir in inbox_dirs:
         inbox_path = inbox_dir / filename
-        await _write_text(inbox_path, content)
+        await _write_text(inbox_path, mailbox_content)
         rel_paths.append(inbox_path.relative_to(archive.repo_root).as_posix())
 
     # Update thread-level digest for human review if thread_id present
     thread_id_obj = message.get("thread_id")
     if isinstance(thread_id_obj, str) and thread_id_obj.strip():
-        canonical_rel = canonical_path.relative_to(archive.repo_root).as_posix()
-        digest_rel = await _update_thread_digest(
+        digest_paths = await _update_thread_digest(
             archive,
             thread_id_obj.strip(),
             {
@@ -851,8 +916,7 @@ async def write_message_bundle(
             body_md,
             canonical_rel,
         )
-        if digest_rel:
-            rel_paths.append(digest_rel)
+        rel_paths.extend(digest_paths)
 
     if extra_paths:
         rel_paths.extend(extra_paths)
@@ -871,7 +935,32 @@ async def write_message_bundle(
             f"Thread: {thread_key}",
         ]
         commit_message = commit_subject + "\n\n" + "\n".join(commit_body_lines) + "\n"
-    await _commit(archive.repo, archive.settings, commit_message, rel_paths)
+    commit_sha = await _archive_commit(archive.repo, archive.settings, commit_message, rel_paths)
+    return ArchivedMessage(path=canonical_rel, commit_sha=commit_sha)
+
+
+_MAILBOX_COPY_PATH_RE = re.compile(r"^agents/[^/]+/(?:inbox|outbox)/\d{4}/\d{2}/[^/]+\.md$")
+_CANONICAL_MESSAGE_PATH_RE = re.compile(r"^messages/\d{4}/\d{2}/[^/]+\.md$")
+_THREAD_DIGEST_INDEX = "index.json"
+_THREAD_DIGEST_SEGMENT_RE = re.compile(r"^\d{4,}\.md$")
+_THREAD_DIGEST_PATH_RE = re.compile(r"^messages/threads/([A-Za-z0-9][A-Za-z0-9._-]{0,127})\.md$")
+
+
+def _mailbox_stub_target(content: str) -> str | None:
+    """Return the canonical path a stub mailbox copy points at, or None for a full copy."""
+    if not content.startswith("---json\n"):
+        return None
+    end = content.find("\n---\n", 8)
+    if end == -1:
+        return None
+    try:
+        meta = json.loads(content[8:end])
+    except ValueError:
+        return None
+    canonical = meta.get("canonical") if isinstance(meta, dict) else None
+    if isinstance(canonical, str) and _CANONICAL_MESSAGE_PATH_RE.match(canonical):
+        return canonical
+    return None
 
 
 async def _update_thread_digest(
@@ -880,21 +969,29 @@ async def _update_thread_digest(
     meta: dict[str, object],
     body_md: str,
     canonical_rel_path: str,
-) -> str | None:
+) -> list[str]:
     """
-    Append a compact entry to a thread-level digest file for human review.
+    Append a compact entry to a thread-level digest for human review.
+
+    The digest lives under messages/threads/{thread_id}/ as numbered segment
+    files (0001.md, 0002.md, ...) plus an index.json listing them. Entries are
+    appended to the tail segment until it reaches
+    ``STORAGE_THREAD_DIGEST_SEGMENT_BYTES``; after that a new segment is
+    started, so each message only rewrites a bounded blob instead of the whole
+    thread history. A pre-existing single-file digest (threads/{thread_id}.md)
+    is left untouched and stitched in front of the segments when reading.
 
-    The digest lives at messages/threads/{thread_id}.md and contains an
-    append-only sequence of sections linking to canonical messages.
+    Returns the repo-relative paths that changed.
     """
     if not validate_thread_id_format(thread_id):
         raise ValueError(
             "Invalid thread_id: must start with an alphanumeric character and contain only "
             "letters, numbers, '.', '_', or '-' (max 128)."
         )
-    digest_dir = archive.root / "messages" / "threads"
-    await _to_thread(digest_dir.mkdir, parents=True, exist_ok=True)
-    digest_path = digest_dir / f"{thread_id}.md"
+    threads_dir = archive.root / "messages" / "threads"
+    digest_dir = threads_dir / thread_id
+    index_path = digest_dir / _THREAD_DIGEST_INDEX
+    segment_bytes = archive.settings.storage.thread_digest_segment_bytes
 
     # Ensure recipients list is typed as list[str] for join()
     to_value = meta.get("to")
@@ -918,16 +1015,98 @@ async def _update_thread_digest(
 
     entry = subject_line + header + link_line + preview + "\n\n---\n\n"
 
-    # Append atomically
-    def _append() -> None:
-        mode = "a" if digest_path.exists() else "w"
-        with digest_path.open(mode, encoding="utf-8") as f:
-            if mode == "w":
-                f.write(f"# Thread {thread_id}\n\n")
-            f.write(entry)
+    def _append() -> list[Path]:
+        digest_dir.mkdir(parents=True, exist_ok=True)
+        index = _load_thread_digest_index(index_path)
+        if index is None:
+            legacy = threads_dir / f"{thread_id}.md"
+            index = {"thread_id": thread_id, "legacy": legacy.name if legacy.exists() else None, "segments": []}
+        segments: list[dict[str, Any]] = index["segments"]
+        encoded = entry.encode("utf-8")
+        tail = segments[-1] if segments else None
+        if tail is None or (tail["entries"] and tail["bytes"] + len(encoded) > segment_bytes):
+            # The first segment carries the title unless a legacy digest already does.
+            title = "" if segments or index.get("legacy") else f"# Thread {thread_id}\n\n"
+            tail = {"name": f"{len(segments) + 1:04d}.md", "entries": 0, "bytes": 0}
+            segments.append(tail)
+            encoded = title.encode("utf-8") + encoded
+        segment_path = digest_dir / tail["name"]
+        with segment_path.open("ab") as f:
+            f.write(encoded)
+        tail["entries"] += 1
+        tail["bytes"] += len(encoded)
+        index_path.write_text(json.dumps(index, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        return [segment_path, index_path]
+
+    changed = await _to_thread(_append)
+    return [path.relative_to(archive.repo_root).as_posix() for path in changed]
+
+
+def _load_thread_digest_index(index_path: Path) -> dict[str, Any] | None:
+    try:
+        index = json.loads(index_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(index, dict) or not isinstance(index.get("segments"), list):
+        return None
+    return index
+
+
+def _stitch_thread_digest(index: dict[str, Any], read: Callable[[str], bytes | None]) -> str:
+    """Concatenate a segmented digest; ``read`` maps a name under threads/ to its bytes."""
+    thread_id = str(index.get("thread_id", ""))
+    parts: list[bytes] = []
+    if index.get("legacy") == f"{thread_id}.md":
+        parts.append(read(f"{thread_id}.md") or b"")
+    for segment in index["segments"]:
+        name = segment.get("name") if isinstance(segment, dict) else None
+        if isinstance(name, str) and _THREAD_DIGEST_SEGMENT_RE.match(name):
+            parts.append(read(f"{thread_id}/{name}") or b"")
+    return b"".join(parts).decode("utf-8", errors="replace")
+
+
+def _tree_thread_digest(repo: Repo, commit_sha: str, threads_rel: str, thread_id: str) -> str | None:
+    """Stitch a segmented digest out of a commit; None when the thread is not segmented there."""
+    index_obj = _read_git_object(repo, f"{commit_sha}:{threads_rel}/{thread_id}/{_THREAD_DIGEST_INDEX}")
+    if index_obj is None or index_obj[1] != "blob":
+        return None
+    try:
+        index = json.loads(index_obj[2])
+    except ValueError:
+        return None
+    if not isinstance(index, dict) or not isinstance(index.get("segments"), list):
+        return None
+
+    def _read_member(name: str) -> bytes | None:
+        obj = _read_git_object(repo, f"{commit_sha}:{threads_rel}/{name}")
+        return obj[2] if obj is not None and obj[1] == "blob" else None
+
+    return _stitch_thread_digest(index, _read_member)
 
-    await _to_thread(_append)
-    return digest_path.relative_to(archive.repo_root).as_posix()
+
+async def read_thread_digest(archive: ProjectArchive, thread_id: str) -> str | None:
+    """Return the full digest for ``thread_id`` from the working tree, or None if there is none.
+
+    Segments are stitched back together in order; a digest that predates
+    segmentation (a single threads/{thread_id}.md) is returned as-is.
+    """
+    if not validate_thread_id_format(thread_id):
+        return None
+    threads_dir = archive.root / "messages" / "threads"
+
+    def _read() -> str | None:
+        index = _load_thread_digest_index(threads_dir / thread_id / _THREAD_DIGEST_INDEX)
+        if index is None:
+            legacy = threads_dir / f"{thread_id}.md"
+            return legacy.read_text(encoding="utf-8") if legacy.exists() else None
+
+        def _read_member(name: str) -> bytes | None:
+            path = threads_dir / name
+            return path.read_bytes() if path.exists() else None
+
+        return _stitch_thread_digest(index, _read_member)
+
+    return await _to_thread(_read)
 
 
 def _resolve_archive_relative_path(archive: ProjectArchive, raw_path: str) -> Path:
@@ -1223,40 +1402,573 @@ def _commit_lock_path(repo_root: Path, rel_paths: Sequence[str]) -> Path:
     return repo_root / ".commit.lock"
 
 
-async def _commit(repo: Repo, settings: Settings, message: str, rel_paths: Sequence[str]) -> None:
+def _agent_trailer(message: str) -> str | None:
+    """Derive an ``Agent:`` trailer from a canonical commit subject, if it names one.
+
+    Expected message formats include:
+      mail: <Agent> -> ... | <Subject>
+      file_reservation: <Agent> ...
+    """
+    try:
+        # Avoid duplicating trailers if already embedded
+        if "\nagent:" in message.lower():
+            return None
+        if message.startswith("mail: "):
+            agent_part = message[len("mail: ") :].split("->", 1)[0].strip()
+        elif message.startswith("file_reservation: "):
+            agent_part = message[len("file_reservation: ") :].split(" ", 1)[0].strip()
+        else:
+            return None
+    except Exception:
+        return None
+    return f"Agent: {agent_part}" if agent_part else None
+
+
+def _commit_subjects(message: str) -> list[str]:
+    """Return the per-write subject lines recorded in a commit message.
+
+    Coalesced commits (``archive: N writes ...``) list every write's subject as a
+    ``- `` bullet in the body; any other commit contributes its own subject line.
+    """
+    lines = message.split("\n")
+    if not lines[0].startswith("archive: "):
+        return [lines[0]]
+    subjects: list[str] = []
+    for line in lines[2:]:
+        if not line.startswith("- "):
+            break
+        subjects.append(line[2:])
+    return subjects
+
+
+_INDEX_STALE_MARKER = "mcp_agent_mail_index_stale"
+
+
+def _git_blob_sha(data: bytes) -> str:
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+class _FastImportWriter:
+    """One long-lived ``git fast-import`` process per archive repo.
+
+    Commits stream the working-tree contents of ``rel_paths`` straight into the
+    object store and advance the current branch, without loading, stat-ing or
+    rewriting ``.git/index``. Each commit ends with a ``checkpoint`` so the new
+    ref and objects are visible to other readers before the caller returns.
+    The index is left behind HEAD; a marker in the git dir tells the GitPython
+    backend to resynchronise it before its next commit.
+    """
+
+    def __init__(self, repo_root: Path) -> None:
+        self.repo_root = repo_root
+        self._lock = threading.Lock()
+        self._proc: subprocess.Popen[bytes] | None = None
+
+    def _process(self) -> subprocess.Popen[bytes]:
+        proc = self._proc
+        if proc is None or proc.poll() is not None:
+            proc = self._proc = subprocess.Popen(
+                ["git", "fast-import", "--quiet", "--date-format=raw"],
+                cwd=self.repo_root,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+            )
+        return proc
+
+    @staticmethod
+    def _readline(proc: subprocess.Popen[bytes]) -> bytes:
+        assert proc.stdout is not None
+        line = proc.stdout.readline()
+        if not line:
+            raise RuntimeError(f"git fast-import exited with status {proc.wait()}")
+        return line.rstrip(b"\n")
+
+    def commit(self, repo: Repo, actor: Actor, message: str, rel_paths: Sequence[str]) -> bool:
+        """Commit ``rel_paths`` as they are on disk; return False when nothing changed."""
+        with self._lock:
+            try:
+                return self._commit_locked(repo, actor, message, rel_paths)
+            except BaseException:
+                self.close()
+                raise
+
+    def _commit_locked(self, repo: Repo, actor: Actor, message: str, rel_paths: Sequence[str]) -> bool:
+        branch = repo.head.ref.path  # raises TypeError on a detached HEAD
+        parent = repo.head.commit.hexsha if repo.head.is_valid() else None
+        contents: dict[str, bytes | None] = {}
+        for rel_path in dict.fromkeys(rel_paths):
+            path = self.repo_root / rel_path
+            contents[rel_path] = path.read_bytes() if path.is_file() else None
+        proc = self._process()
+        assert proc.stdin is not None
+        if parent is not None:
+            # Skip the commit when every path already matches HEAD (mirrors the is_dirty check)
+            for rel_path in contents:
+                proc.stdin.write(b"ls %s %s\n" % (parent.encode(), _fast_import_path(rel_path)))
+            proc.stdin.flush()
+            unchanged = True
+            for rel_path, data in contents.items():
+                line = self._readline(proc)
+                current = None if line.startswith(b"missing ") else line.split(b" ", 2)[2].split(b"\t", 1)[0].decode()
+                if current != (None if data is None else _git_blob_sha(data)):
+                    unchanged = False
+            if unchanged:
+                return False
+        stamp = f"{int(time.time())} +0000".encode()
+        ident = f"{actor.name} <{actor.email}>".encode()
+        encoded_message = message.encode("utf-8")
+        chunks = [
+            b"commit %s\n" % branch.encode(),
+            b"author %s %s\n" % (ident, stamp),
+            b"committer %s %s\n" % (ident, stamp),
+            b"data %d\n%s\n" % (len(encoded_message), encoded_message),
+        ]
+        if parent is not None:
+            chunks.append(b"from %s\n" % parent.encode())
+        for rel_path, data in contents.items():
+            if data is None:
+                chunks.append(b"D %s\n" % _fast_import_path(rel_path))
+            else:
+                chunks.append(b"M 100644 inline %s\ndata %d\n%s\n" % (_fast_import_path(rel_path), len(data), data))
+        chunks.append(b"\ncheckpoint\nprogress committed\n")
+        proc.stdin.write(b"".join(chunks))
+        proc.stdin.flush()
+        if self._readline(proc) != b"progress committed":
+            raise RuntimeError("git fast-import did not acknowledge the commit")
+        git_dir = Path(repo.git_dir)
+        marker = git_dir / _INDEX_STALE_MARKER
+        if not marker.exists():
+            marker.touch()
+        return True
+
+    def close(self) -> None:
+        proc = self._proc
+        self._proc = None
+        if proc is None:
+            return
+        with contextlib.suppress(Exception):
+            if proc.stdin is not None:
+                proc.stdin.close()
+            proc.wait(timeout=5)
+        if proc.poll() is None:
+            proc.kill()
+        with contextlib.suppress(Exception):
+            if proc.stdout is not None:
+                proc.stdout.close()
+
+
+def _fast_import_path(rel_path: str) -> bytes:
+    """Encode a path for the fast-import stream, C-quoting it only when required."""
+    encoded = rel_path.encode("utf-8")
+    if b"\n" not in encoded and not encoded.startswith(b'"'):
+        return encoded
+    escaped = encoded.replace(b"\\", b"\\\\").replace(b'"', b'\\"').replace(b"\n", b"\\n")
+    return b'"' + escaped + b'"'
+
+
+_FAST_IMPORT_WRITERS: dict[str, _FastImportWriter] = {}
+_FAST_IMPORT_WRITERS_LOCK = threading.Lock()
+
+
+def _fast_import_writer(repo_root: Path) -> _FastImportWriter:
+    key = str(repo_root)
+    with _FAST_IMPORT_WRITERS_LOCK:
+        writer = _FAST_IMPORT_WRITERS.get(key)
+        if writer is None:
+            writer = _FAST_IMPORT_WRITERS[key] = _FastImportWriter(repo_root)
+        return writer
+
+
+def close_fast_import_writers() -> int:
+    """Stop every ``git fast-import`` process started by the fast-import commit backend."""
+    with _FAST_IMPORT_WRITERS_LOCK:
+        writers = list(_FAST_IMPORT_WRITERS.values())
+        _FAST_IMPORT_WRITERS.clear()
+    for writer in writers:
+        writer.close()
+    return len(writers)
+
+
+atexit.register(close_fast_import_writers)
+
+
+# =============================================================================
+# Object reader pool for the read-only history helpers
+# =============================================================================
+
+# Persistent ``git cat-file`` readers kept per repo, and the byte budget of the
+# object cache shared by all of them. Git objects are immutable, so cached
+# blobs and trees never need invalidating.
+_OBJECT_READERS_PER_REPO = 4
+_OBJECT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+_HEX_SHA_RE = re.compile(r"^[0-9a-f]{40}$")
+
+
+class _CatFileReader:
+    """A long-lived ``git cat-file --batch-check`` / ``--batch`` pair for one repo."""
+
+    def __init__(self, git_dir: Path) -> None:
+        self.git_dir = git_dir
+        self._procs: dict[str, subprocess.Popen[bytes]] = {}
+
+    def _process(self, mode: str) -> subprocess.Popen[bytes]:
+        proc = self._procs.get(mode)
+        if proc is None or proc.poll() is not None:
+            proc = self._procs[mode] = subprocess.Popen(
+                ["git", "--git-dir", str(self.git_dir), "cat-file", mode],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+            )
+        return proc
+
+    @staticmethod
+    def _readline(proc: subprocess.Popen[bytes]) -> bytes:
+        assert proc.stdout is not None
+        line = proc.stdout.readline()
+        if not line:
+            raise RuntimeError(f"git cat-file exited with status {proc.wait()}")
+        return line.rstrip(b"\n")
+
+    def info(self, specs: Sequence[str]) -> list[tuple[str, str, int] | None]:
+        """Resolve ``<rev>``, ``<rev>:<path>`` or SHA specs to (sha, type, size) in one round trip."""
+        proc = self._process("--batch-check")
+        assert proc.stdin is not None
+        proc.stdin.write(b"".join(spec.encode("utf-8") + b"\n" for spec in specs))
+        proc.stdin.flush()
+        results: list[tuple[str, str, int] | None] = []
+        for _ in specs:
+            parts = self._readline(proc).rsplit(b" ", 2)
+            if len(parts) == 3 and _HEX_SHA_RE.match(parts[0].decode("ascii", "replace")) and parts[2].isdigit():
+                results.append((parts[0].decode("ascii"), parts[1].decode("ascii"), int(parts[2])))
+            else:
+                results.append(None)  # "<spec> missing" / "<spec> ambiguous"
+        return results
+
+    def read(self, sha: str) -> tuple[str, bytes] | None:
+        proc = self._process("--batch")
+        assert proc.stdin is not None and proc.stdout is not None
+        proc.stdin.write(sha.encode("ascii") + b"\n")
+        proc.stdin.flush()
+        header = self._readline(proc).split(b" ")
+        if len(header) != 3:
+            return None
+        data = proc.stdout.read(int(header[2]))
+        proc.stdout.read(1)  # trailing newline
+        return header[1].decode("ascii"), data
+
+    def close(self) -> None:
+        procs = list(self._procs.values())
+        self._procs.clear()
+        for proc in procs:
+            with contextlib.suppress(Exception):
+                if proc.stdin is not None:
+                    proc.stdin.close()
+                proc.wait(timeout=5)
+            if proc.poll() is None:
+                proc.kill()
+            with contextlib.suppress(Exception):
+                if proc.stdout is not None:
+                    proc.stdout.close()
+
+
+class _ObjectReaderPool:
+    """Up to ``_OBJECT_READERS_PER_REPO`` idle-reusable cat-file readers for one repo."""
+
+    def __init__(self, git_dir: Path) -> None:
+        self.git_dir = git_dir
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(_OBJECT_READERS_PER_REPO)
+        self._idle: list[_CatFileReader] = []
+
+    @contextlib.contextmanager
+    def reader(self) -> Iterator[_CatFileReader]:
+        with self._slots:
+            with self._lock:
+                reader = self._idle.pop() if self._idle else _CatFileReader(self.git_dir)
+            try:
+                yield reader
+            except BaseException:
+                # The request/response stream may be out of step; don't hand it out again
+                reader.close()
+                raise
+            with self._lock:
+                self._idle.append(reader)
+
+    def close(self) -> None:
+        with self._lock:
+            readers, self._idle = self._idle, []
+        for reader in readers:
+            reader.close()
+
+
+class _ObjectCache:
+    """Byte-bounded LRU of decoded git objects keyed by SHA."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[str, bytes]] = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, sha: str) -> tuple[str, bytes] | None:
+        with self._lock:
+            entry = self._entries.get(sha)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(sha)
+            self._hits += 1
+            return entry
+
+    def put(self, sha: str, obj_type: str, data: bytes) -> None:
+        # Objects bigger than a quarter of the budget would only churn the cache
+        if len(data) > self._max_bytes // 4:
+            return
+        with self._lock:
+            if sha in self._entries:
+                return
+            self._entries[sha] = (obj_type, data)
+            self._bytes += len(data)
+            while self._bytes > self._max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    @property
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "objects": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self._max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+
+_OBJECT_READER_POOLS: dict[str, _ObjectReaderPool] = {}
+_OBJECT_READER_POOLS_LOCK = threading.Lock()
+_OBJECT_CACHE = _ObjectCache(_OBJECT_CACHE_MAX_BYTES)
+
+
+def _object_reader_pool(repo: Repo) -> _ObjectReaderPool:
+    git_dir = Path(repo.git_dir).resolve()
+    key = str(git_dir)
+    with _OBJECT_READER_POOLS_LOCK:
+        pool = _OBJECT_READER_POOLS.get(key)
+        if pool is None:
+            pool = _OBJECT_READER_POOLS[key] = _ObjectReaderPool(git_dir)
+        return pool
+
+
+def close_object_readers() -> int:
+    """Stop every pooled ``git cat-file`` reader. Returns the number of pools closed."""
+    with _OBJECT_READER_POOLS_LOCK:
+        pools = list(_OBJECT_READER_POOLS.values())
+        _OBJECT_READER_POOLS.clear()
+    for pool in pools:
+        pool.close()
+    return len(pools)
+
+
+atexit.register(close_object_readers)
+
+
+def archive_object_cache_stats() -> dict[str, Any]:
+    """Hit/miss counters and size of the shared archive object cache."""
+    stats: dict[str, Any] = dict(_OBJECT_CACHE.stats)
+    with _OBJECT_READER_POOLS_LOCK:
+        stats["reader_pools"] = len(_OBJECT_READER_POOLS)
+    return stats
+
+
+def _git_objects_info(repo: Repo, specs: Sequence[str]) -> list[tuple[str, str, int] | None]:
+    """Batch-resolve specs to (sha, type, size); None for missing or malformed specs."""
+    valid = [spec for spec in specs if spec and "\n" not in spec]
+    if not valid:
+        return [None] * len(specs)
+    with _object_reader_pool(repo).reader() as reader:
+        resolved = dict(zip(valid, reader.info(valid)))
+    return [resolved.get(spec) for spec in specs]
+
+
+def _read_git_object(repo: Repo, spec: str) -> tuple[str, str, bytes] | None:
+    """Return (sha, type, data) for ``spec``, served from the object cache when possible."""
+    sha = spec if _HEX_SHA_RE.match(spec) else None
+    if sha is not None:
+        cached = _OBJECT_CACHE.get(sha)
+        if cached is not None:
+            return sha, cached[0], cached[1]
+    elif not spec or "\n" in spec:
+        return None
+    with _object_reader_pool(repo).reader() as reader:
+        if sha is None:
+            info = reader.info([spec])[0]
+            if info is None:
+                return None
+            sha = info[0]
+            cached = _OBJECT_CACHE.get(sha)
+            if cached is not None:
+                return sha, cached[0], cached[1]
+        obj = reader.read(sha)
+    if obj is None:
+        return None
+    _OBJECT_CACHE.put(sha, obj[0], obj[1])
+    return sha, obj[0], obj[1]
+
+
+def _read_git_tree(repo: Repo, spec: str) -> list[tuple[int, str, str]] | None:
+    """Return a tree's (mode, name, sha) entries, or None when ``spec`` is not a tree."""
+    obj = _read_git_object(repo, spec)
+    if obj is None or obj[1] != "tree":
+        return None
+    data = obj[2]
+    entries: list[tuple[int, str, str]] = []
+    pos = 0
+    while pos < len(data):
+        space = data.index(b" ", pos)
+        nul = data.index(b"\0", space)
+        entries.append((int(data[pos:space], 8), data[space + 1 : nul].decode("utf-8", "surrogateescape"), data[nul + 1 : nul + 21].hex()))
+        pos = nul + 21
+    return entries
+
+
+def _tree_entry_type(mode: int) -> str:
+    if mode == 0o40000:
+        return "tree"
+    return "commit" if mode == 0o160000 else "blob"
+
+
+def _resolve_commit_sha(repo: Repo, commit_sha: str | None) -> str:
+    """Validate ``commit_sha`` (or use HEAD) and return the full commit SHA."""
+    if not commit_sha:
+        return repo.head.commit.hexsha
+    if not (7 <= len(commit_sha) <= 40) or not all(c in "0123456789abcdef" for c in commit_sha.lower()):
+        raise ValueError("Invalid commit SHA format")
+    info = _git_objects_info(repo, [f"{commit_sha}^{{commit}}"])[0]
+    if info is None:
+        raise ValueError(f"Commit not found: {commit_sha}")
+    return info[0]
+
+
+_GIT_IDENT_RE = re.compile(r"^(?P<name>.*) <(?P<email>[^>]*)> (?P<time>\d+) [+-]\d{4}$")
+
+
+def _parse_git_commit(data: bytes) -> dict[str, Any]:
+    """Parse a raw commit object into tree, parents, author and message."""
+    headers, _, message = data.partition(b"\n\n")
+    commit: dict[str, Any] = {"tree": "", "parents": [], "author_name": "", "author_email": "", "author_time": 0}
+    for line in headers.split(b"\n"):
+        if line.startswith(b" "):
+            continue  # continuation of a multi-line header (e.g. gpgsig)
+        key, _, value = line.decode("utf-8", "replace").partition(" ")
+        if key == "tree":
+            commit["tree"] = value
+        elif key == "parent":
+            commit["parents"].append(value)
+        elif key == "author":
+            match = _GIT_IDENT_RE.match(value)
+            if match:
+                commit["author_name"] = match.group("name")
+                commit["author_email"] = match.group("email")
+                commit["author_time"] = int(match.group("time"))
+    commit["message"] = message.decode("utf-8", "replace")
+    return commit
+
+
+def _diff_git_trees(
+    repo: Repo, old_tree: str | None, new_tree: str | None, prefix: str = ""
+) -> list[tuple[str, str, str | None, str | None]]:
+    """List changed blobs between two trees as (a_path, b_path, a_sha, b_sha).
+
+    Subtrees with equal SHAs are skipped without being read. A deleted and an
+    added blob with the same content are reported as one rename.
+    """
+    old_entries = {name: (mode, sha) for mode, name, sha in (_read_git_tree(repo, old_tree) or [])} if old_tree else {}
+    new_entries = {name: (mode, sha) for mode, name, sha in (_read_git_tree(repo, new_tree) or [])} if new_tree else {}
+    changes: list[tuple[str, str, str | None, str | None]] = []
+    for name in sorted(old_entries.keys() | new_entries.keys()):
+        old = old_entries.get(name)
+        new = new_entries.get(name)
+        if old == new:
+            continue
+        path = f"{prefix}{name}"
+        old_is_tree = old is not None and _tree_entry_type(old[0]) == "tree"
+        new_is_tree = new is not None and _tree_entry_type(new[0]) == "tree"
+        if old_is_tree or new_is_tree:
+            changes.extend(
+                _diff_git_trees(repo, old[1] if old_is_tree else None, new[1] if new_is_tree else None, f"{path}/")
+            )
+        if (old is not None and not old_is_tree) or (new is not None and not new_is_tree):
+            changes.append((
+                path,
+                path,
+                old[1] if old is not None and not old_is_tree else None,
+                new[1] if new is not None and not new_is_tree else None,
+            ))
+    if prefix:
+        return changes
+    # Exact renames: pair each deletion with an addition of the same blob
+    added = {b_sha: idx for idx, (_, _, a_sha, b_sha) in enumerate(changes) if a_sha is None and b_sha}
+    paired: list[tuple[str, str, str | None, str | None]] = []
+    consumed: set[int] = set()
+    for a_path, b_path, a_sha, b_sha in changes:
+        if b_sha is None and a_sha in added and added[a_sha] not in consumed:
+            idx = added[a_sha]
+            consumed.add(idx)
+            paired.append((a_path, changes[idx][1], a_sha, a_sha))
+        else:
+            paired.append((a_path, b_path, a_sha, b_sha))
+    return [change for idx, change in enumerate(paired) if idx not in consumed]
+
+
+def _unified_hunks(old: bytes, new: bytes) -> tuple[str, int, int]:
+    """Return the ``@@`` hunks between two blobs plus inserted/deleted line counts."""
+    if b"\0" in old[:8000] or b"\0" in new[:8000]:
+        return ("Binary files differ\n" if old != new else ""), 0, 0
+    old_lines = old.decode("utf-8", "replace").splitlines(keepends=True)
+    new_lines = new.decode("utf-8", "replace").splitlines(keepends=True)
+    for lines in (old_lines, new_lines):
+        if lines and not lines[-1].endswith("\n"):
+            lines[-1] += "\n\\ No newline at end of file\n"
+    hunk_lines = list(difflib.unified_diff(old_lines, new_lines, n=3))[2:]
+    added = sum(1 for line in hunk_lines if line.startswith("+"))
+    removed = sum(1 for line in hunk_lines if line.startswith("-"))
+    return "".join(hunk_lines), added, removed
+
+
+async def _commit(repo: Repo, settings: Settings, message: str, rel_paths: Sequence[str]) -> str | None:
+    """Commit ``rel_paths``; return the new commit's SHA, or None when nothing changed."""
     if not rel_paths:
-        return
+        return None
     actor = Actor(settings.storage.git_author_name, settings.storage.git_author_email)
+    fast_import = settings.storage.commit_backend == "fast-import"
+
+    def _final_message() -> str:
+        # Append an Agent trailer derived from the message subject line when present
+        trailer = _agent_trailer(message)
+        return message + "\n\n" + trailer + "\n" if trailer else message
 
-    def _perform_commit(target_repo: Repo) -> None:
+    def _perform_commit(target_repo: Repo) -> str | None:
+        if fast_import and not target_repo.head.is_detached:
+            if _fast_import_writer(repo_root).commit(target_repo, actor, _final_message(), rel_paths):
+                return target_repo.head.commit.hexsha
+            return None
+        stale_marker = Path(target_repo.git_dir) / _INDEX_STALE_MARKER
+        if stale_marker.exists():
+            # fast-import commits advanced HEAD without the index; resync before staging
+            target_repo.git.read_tree("HEAD")
+            stale_marker.unlink()
         target_repo.index.add(rel_paths)
         if target_repo.is_dirty(index=True, working_tree=True):
-            # Append commit trailers with Agent and optional Thread if present in message text
-            trailers: list[str] = []
-            # Extract simple Agent/Thread heuristics from the message subject line
-            # Expected message formats include:
-            #   mail: <Agent> -> ... | <Subject>
-            #   file_reservation: <Agent> ...
-            try:
-                # Avoid duplicating trailers if already embedded
-                lower_msg = message.lower()
-                have_agent_line = "\nagent:" in lower_msg
-                if message.startswith("mail: ") and not have_agent_line:
-                    head = message[len("mail: ") :]
-                    agent_part = head.split("->", 1)[0].strip()
-                    if agent_part:
-                        trailers.append(f"Agent: {agent_part}")
-                elif message.startswith("file_reservation: ") and not have_agent_line:
-                    head = message[len("file_reservation: ") :]
-                    agent_part = head.split(" ", 1)[0].strip()
-                    if agent_part:
-                        trailers.append(f"Agent: {agent_part}")
-            except Exception:
-                pass
-            final_message = message
-            if trailers:
-                final_message = message + "\n\n" + "\n".join(trailers) + "\n"
-            target_repo.index.commit(final_message, author=actor, committer=actor)
+            return target_repo.index.commit(_final_message(), author=actor, committer=actor).hexsha
+        return None
     # Serialize commits across all projects sharing the same Git repo to avoid index races
     working_tree = repo.working_tree_dir
     if working_tree is None:
@@ -1268,9 +1980,10 @@ async def _commit(repo: Repo, settings: Settings, message: str, rel_paths: Seque
         import errno
 
         attempt_repo = repo
+        sha: str | None = None
         for attempt in range(2):
             try:
-                await _to_thread(_perform_commit, attempt_repo)
+                sha = await _to_thread(_perform_commit, attempt_repo)
                 break
             except OSError as exc:
                 if exc.errno != errno.EMFILE or attempt >= 1:
@@ -1292,6 +2005,312 @@ async def _commit(repo: Repo, settings: Settings, message: str, rel_paths: Seque
         if attempt_repo is not repo:
             with contextlib.suppress(Exception):
                 attempt_repo.close()
+    return sha
+
+
+def _coalesced_commit_message(messages: Sequence[str]) -> str:
+    """Fold several archive commit messages into one.
+
+    The subject counts the writes, the body lists each write's subject line and
+    then carries each write's original audit body, and the trailers name every
+    agent involved (deduplicated, in first-seen order).
+    """
+    if len(messages) == 1:
+        return messages[0]
+    subjects = [m.split("\n", 1)[0] for m in messages]
+    lines = [f"archive: {len(messages)} writes | {subjects[0]} (+{len(messages) - 1} more)", ""]
+    lines.extend(f"- {subject}" for subject in subjects)
+    trailers: list[str] = []
+    for subject, message in zip(subjects, messages, strict=True):
+        body = message.split("\n", 1)[1].strip() if "\n" in message else ""
+        if body:
+            lines.extend(["", f"[{subject}]", body])
+        for line in body.splitlines():
+            if line.lower().startswith("agent:") and line not in trailers:
+                trailers.append(line)
+        trailer = _agent_trailer(message)
+        if trailer and trailer not in trailers:
+            trailers.append(trailer)
+    if trailers:
+        lines.extend(["", *trailers])
+    return "\n".join(lines) + "\n"
+
+
+@dataclass(slots=True)
+class _PendingCommit:
+    repo: Repo
+    settings: Settings
+    message: str
+    rel_paths: list[str]
+    future: asyncio.Future[str | None]
+
+
+class _CommitCoalescer:
+    """Accumulate archive writes that share a commit lock and commit them together.
+
+    The first write to arrive starts a window of ``window_ms``; every write that
+    lands before it closes (or until ``max_entries`` are pending) is folded into a
+    single commit whose paths are the union of all writes. Each waiter is released
+    only after that commit succeeds, or receives its exception.
+    """
+
+    def __init__(self, *, window_ms: int, max_entries: int) -> None:
+        self.window = max(0, window_ms) / 1000.0
+        self.max_entries = max(1, max_entries)
+        self.loop = asyncio.get_running_loop()
+        self._pending: list[_PendingCommit] = []
+        self._full = asyncio.Event()
+        self._flusher: asyncio.Task[None] | None = None
+        self.commits_written = 0
+        self.entries_committed = 0
+
+    def enqueue(
+        self, repo: Repo, settings: Settings, message: str, rel_paths: Sequence[str]
+    ) -> asyncio.Future[str | None]:
+        future: asyncio.Future[str | None] = self.loop.create_future()
+        self._pending.append(_PendingCommit(repo, settings, message, list(rel_paths), future))
+        if len(self._pending) >= self.max_entries:
+            self._full.set()
+        if self._flusher is None or self._flusher.done():
+            self._flusher = self.loop.create_task(self._flush())
+        return future
+
+    async def _flush(self) -> None:
+        if not self._full.is_set():
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._full.wait(), timeout=self.window)
+        batch = self._pending[: self.max_entries]
+        self._pending = self._pending[self.max_entries :]
+        if len(self._pending) < self.max_entries:
+            self._full.clear()
+        self._flusher = None
+        if self._pending:
+            self._flusher = self.loop.create_task(self._flush())
+        rel_paths = list(dict.fromkeys(path for entry in batch for path in entry.rel_paths))
+        last = batch[-1]
+        try:
+            sha = await _commit(last.repo, last.settings, _coalesced_commit_message([e.message for e in batch]), rel_paths)
+        except BaseException as exc:
+            for entry in batch:
+                if not entry.future.done():
+                    entry.future.set_exception(exc)
+            if isinstance(exc, asyncio.CancelledError):
+                raise
+            return
+        self.commits_written += 1
+        self.entries_committed += len(batch)
+        for entry in batch:
+            if not entry.future.done():
+                entry.future.set_result(sha)
+
+
+_COMMIT_COALESCERS: dict[str, _CommitCoalescer] = {}
+_DEFERRED_COMMITS: ContextVar[list[asyncio.Future[str | None]] | None] = ContextVar("_DEFERRED_COMMITS", default=None)
+
+
+@asynccontextmanager
+async def deferred_archive_commits() -> AsyncIterator[None]:
+    """Wait for coalesced commits queued inside the block only once the block exits.
+
+    Tools wrap their archive lock in this so a send does not hold the project lock
+    while its commit window is open; otherwise no other write to that project could
+    join the batch. Nested scopes defer to the outermost one. Without
+    ``STORAGE_COMMIT_MODE=coalesce`` commits happen inline and this is a no-op.
+    """
+    if _DEFERRED_COMMITS.get() is not None:
+        yield
+        return
+    pending: list[asyncio.Future[str | None]] = []
+    token = _DEFERRED_COMMITS.set(pending)
+    try:
+        yield
+    finally:
+        _DEFERRED_COMMITS.reset(token)
+        if pending:
+            await asyncio.gather(*pending)
+
+
+async def _archive_commit(repo: Repo, settings: Settings, message: str, rel_paths: Sequence[str]) -> str | None:
+    """Commit an archive write, coalescing with concurrent writes when ``STORAGE_COMMIT_MODE=coalesce``.
+
+    Returns the commit SHA, or None when nothing changed or the commit was deferred
+    to the enclosing ``deferred_archive_commits`` block.
+    """
+    if not rel_paths:
+        return None
+    if settings.storage.commit_mode != "coalesce":
+        return await _commit(repo, settings, message, rel_paths)
+    working_tree = repo.working_tree_dir
+    if working_tree is None:
+        raise ValueError("Repository has no working tree directory")
+    key = str(_commit_lock_path(Path(working_tree).resolve(), rel_paths))
+    coalescer = _COMMIT_COALESCERS.get(key)
+    if coalescer is None or coalescer.loop is not asyncio.get_running_loop():
+        coalescer = _CommitCoalescer(
+            window_ms=settings.storage.commit_coalesce_window_ms,
+            max_entries=settings.storage.commit_coalesce_max_entries,
+        )
+        _COMMIT_COALESCERS[key] = coalescer
+    future = coalescer.enqueue(repo, settings, message, rel_paths)
+    deferred = _DEFERRED_COMMITS.get()
+    if deferred is not None:
+        deferred.append(future)
+        return None
+    return await future
+
+
+async def split_shared_archive(settings: Settings, slugs: Sequence[str] | None = None) -> dict[str, Any]:
+    """Split projects out of the shared archive repo into per-project repos.
+
+    Each project's history is replayed with ``git fast-export -- projects/<slug>``
+    piped into ``git fast-import`` in ``repos/<slug>``, so the commits that touched
+    the project keep their messages, authors and dates. The shared repo is left
+    untouched and projects that already have their own repo are skipped.
+    """
+    import shutil
+
+    root = Path(settings.storage.root).expanduser().resolve()
+    summary: dict[str, Any] = {"split": [], "skipped": [], "errors": {}}
+    if not (root / ".git").exists():
+        return summary
+
+    def _split_project(branch: str, slug: str, target: Path) -> int:
+        target.mkdir(parents=True)
+        repo = Repo.init(str(target))
+        try:
+            with repo.config_writer() as cw:
+                cw.set_value("commit", "gpgsign", "false")
+            export = subprocess.Popen(
+                ["git", "fast-export", f"refs/heads/{branch}", "--", f"projects/{slug}", ".gitattributes"],
+                cwd=root,
+                stdout=subprocess.PIPE,
+            )
+            try:
+                subprocess.run(["git", "fast-import", "--quiet"], cwd=target, stdin=export.stdout, check=True)
+            finally:
+                if export.stdout is not None:
+                    export.stdout.close()
+            if export.wait() != 0:
+                raise subprocess.CalledProcessError(export.returncode, "git fast-export")
+            repo.git.symbolic_ref("HEAD", f"refs/heads/{branch}")
+            # Bring over the working tree as-is (including writes not yet committed),
+            # minus lock artifacts, then sync the index to the imported HEAD.
+            shutil.copytree(
+                root / "projects" / slug,
+                target / "projects" / slug,
+                ignore=shutil.ignore_patterns("*.lock", "*.lock.owner.json"),
+            )
+            if (root / ".gitattributes").exists():
+                shutil.copy2(root / ".gitattributes", target / ".gitattributes")
+            repo.git.reset("-q")
+            return int(repo.git.rev_list("--count", "HEAD"))
+        finally:
+            repo.close()
+
+    def _split() -> None:
+        shared = Repo(str(root))
+        try:
+            branch = shared.active_branch.name
+        finally:
+            shared.close()
+        projects_dir = root / "projects"
+        if slugs:
+            targets = list(slugs)
+        else:
+            targets = sorted(p.name for p in projects_dir.iterdir() if p.is_dir()) if projects_dir.is_dir() else []
+        for slug in targets:
+            target = root / "repos" / slug
+            if (target / ".git").exists():
+                summary["skipped"].append(slug)
+                continue
+            if not (projects_dir / slug).is_dir():
+                summary["errors"][slug] = "project not found in shared archive"
+                continue
+            try:
+                commits = _split_project(branch, slug, target)
+            except Exception as exc:
+                shutil.rmtree(target, ignore_errors=True)
+                summary["errors"][slug] = str(exc)
+                continue
+            summary["split"].append({"slug": slug, "path": str(target), "commits": commits})
+
+    await _to_thread(_split)
+    return summary
+
+
+_MAINTENANCE_STATE_FILE = "mcp_agent_mail_maintenance.json"
+# Commit-graph with changed-path Bloom filters (split, so each run only adds a layer),
+# then pack loose objects and drop the packed copies, and repack incrementally via the
+# multi-pack-index.
+_MAINTENANCE_STEPS: tuple[tuple[str, ...], ...] = (
+    ("commit-graph", "write", "--reachable", "--changed-paths", "--split"),
+    ("maintenance", "run", "--task=loose-objects"),
+    ("prune-packed", "--quiet"),
+    ("multi-pack-index", "write"),
+    ("maintenance", "run", "--task=incremental-repack"),
+)
+_MAINTENANCE_STATS: dict[str, Any] = {"runs": 0, "last_run": None, "last_duration_ms": None, "repos": {}}
+
+
+def _maintain_repo(repo_root: Path, min_new_commits: int) -> dict[str, Any] | None:
+    git_dir = repo_root / ".git"
+    state_path = git_dir / _MAINTENANCE_STATE_FILE
+    state: dict[str, Any] = {}
+    with contextlib.suppress(OSError, ValueError):
+        state = json.loads(state_path.read_text(encoding="utf-8"))
+    count = subprocess.run(
+        ["git", "rev-list", "--count", "HEAD"], cwd=repo_root, capture_output=True, text=True, check=False
+    )
+    commits = int(count.stdout.strip() or 0) if count.returncode == 0 else 0
+    last_commits = int(state.get("commits", 0))
+    # Adaptive: larger archives tolerate a proportionally longer tail of commits
+    # outside the commit-graph before the next run pays off.
+    if commits == 0 or commits - last_commits < max(min_new_commits, last_commits // 10):
+        return None
+    started = time.monotonic()
+    for step in _MAINTENANCE_STEPS:
+        subprocess.run(["git", *step], cwd=repo_root, capture_output=True, check=True)
+    result = {
+        "repo": str(repo_root),
+        "commits": commits,
+        "new_commits": commits - last_commits,
+        "last_run": datetime.now(timezone.utc).isoformat(),
+        "duration_ms": round((time.monotonic() - started) * 1000, 1),
+    }
+    state_path.write_text(json.dumps(result), encoding="utf-8")
+    return result
+
+
+async def run_archive_maintenance(
+    settings: Settings, *, min_new_commits: int | None = None, slugs: Sequence[str] | None = None
+) -> list[dict[str, Any]]:
+    """Run git maintenance on every archive repo that has grown enough since its last run.
+
+    A repo is due once ``min_new_commits`` (default ``STORAGE_MAINTENANCE_MIN_COMMITS``;
+    ``0`` forces a run) or a tenth of its size at the last run, whichever is larger,
+    have landed. ``slugs`` limits per-project layouts to those projects' repos.
+    """
+    threshold = settings.storage.maintenance_min_commits if min_new_commits is None else min_new_commits
+    roots = archive_repo_roots(settings)
+    if slugs and settings.storage.layout == "per-project":
+        roots = [root for root in roots if root.name in set(slugs)]
+    started = time.monotonic()
+    results: list[dict[str, Any]] = []
+    for root in roots:
+        result = await _to_thread(_maintain_repo, root, threshold)
+        if result is not None:
+            results.append(result)
+            _MAINTENANCE_STATS["repos"][result["repo"]] = result
+    if results:
+        _MAINTENANCE_STATS["runs"] += 1
+        _MAINTENANCE_STATS["last_run"] = datetime.now(timezone.utc).isoformat()
+        _MAINTENANCE_STATS["last_duration_ms"] = round((time.monotonic() - started) * 1000, 1)
+    return results
+
+
+def archive_maintenance_stats() -> dict[str, Any]:
+    """Return when archive maintenance last ran in this process and how long it took."""
+    return {**_MAINTENANCE_STATS, "repos": dict(_MAINTENANCE_STATS["repos"])}
 
 
 async def heal_archive_locks(settings: Settings) -> dict[str, Any]:
@@ -1442,56 +2461,67 @@ async def get_commit_detail(
         if not sha or not (7 <= len(sha) <= 40) or not all(c in "0123456789abcdef" for c in sha.lower()):
             raise ValueError("Invalid commit SHA format")
 
-        commit = repo.commit(sha)
+        full_sha = _resolve_commit_sha(repo, sha)
+        commit_obj = _read_git_object(repo, full_sha)
+        if commit_obj is None:
+            raise ValueError(f"Commit not found: {sha}")
+        commit = _parse_git_commit(commit_obj[2])
 
-        # Get parent for diff (use empty tree if initial commit)
-        if commit.parents:
-            parent = commit.parents[0]
-            diffs = parent.diff(commit, create_patch=True)
-        else:
-            # Initial commit - diff against empty tree
-            diffs = commit.diff(None, create_patch=True)
+        # Diff against the first parent (or the empty tree for the initial commit)
+        parent_tree: str | None = None
+        if commit["parents"]:
+            parent_obj = _read_git_object(repo, commit["parents"][0])
+            if parent_obj is not None:
+                parent_tree = _parse_git_commit(parent_obj[2])["tree"]
+        changes = _diff_git_trees(repo, parent_tree, commit["tree"])
 
         # Build unified diff string
         diff_text = ""
         changed_files = []
+        insertions = deletions = 0
+        truncated = False
 
-        for diff in diffs:
-            # File metadata
-            a_path = diff.a_path or "/dev/null"
-            b_path = diff.b_path or "/dev/null"
-
+        for a_path, b_path, a_sha, b_sha in changes:
             # Change type
-            if diff.new_file:
+            if a_sha is None:
                 change_type = "added"
-            elif diff.deleted_file:
+            elif b_sha is None:
                 change_type = "deleted"
-            elif diff.renamed_file:
+            elif a_path != b_path:
                 change_type = "renamed"
             else:
                 change_type = "modified"
+            a_label = a_path if a_sha is not None else "/dev/null"
+            b_label = b_path if b_sha is not None else "/dev/null"
 
             changed_files.append({
-                "path": b_path if b_path != "/dev/null" else a_path,
+                "path": b_label if b_label != "/dev/null" else a_label,
                 "change_type": change_type,
-                "a_path": a_path,
-                "b_path": b_path,
+                "a_path": a_label,
+                "b_path": b_label,
             })
 
+            old = _read_git_object(repo, a_sha) if a_sha else None
+            new = _read_git_object(repo, b_sha) if b_sha else None
+            hunks, added, removed = _unified_hunks(old[2] if old else b"", new[2] if new else b"")
+            insertions += added
+            deletions += removed
+
             # Get diff text with size limit
-            if diff.diff:
-                diff_bytes = diff.diff
-                if isinstance(diff_bytes, bytes):
-                    decoded_diff = diff_bytes.decode("utf-8", errors="replace")
-                else:
-                    decoded_diff = str(diff_bytes)
-                if len(diff_text) + len(decoded_diff) > max_diff_size:
+            if hunks and not truncated:
+                header = (
+                    f"diff --git a/{a_path} b/{b_path}\n"
+                    f"--- {'a/' + a_path if a_sha else '/dev/null'}\n"
+                    f"+++ {'b/' + b_path if b_sha else '/dev/null'}\n"
+                )
+                if len(diff_text) + len(header) + len(hunks) > max_diff_size:
                     diff_text += "\n\n[... Diff truncated - exceeds size limit ...]\n"
-                    break
-                diff_text += decoded_diff
+                    truncated = True
+                else:
+                    diff_text += header + hunks
 
         # Parse commit body into message and trailers
-        message_str = _ensure_str(commit.message)
+        message_str = commit["message"]
         lines = message_str.split("\n")
         subject = lines[0] if lines else ""
 
@@ -1556,13 +2586,13 @@ async def get_commit_detail(
                 if len(parts) == 2:
                     trailers[parts[0].strip()] = parts[1].strip()
 
-        commit_time = datetime.fromtimestamp(commit.authored_date, tz=timezone.utc)
+        commit_time = datetime.fromtimestamp(commit["author_time"], tz=timezone.utc)
 
         return {
-            "sha": commit.hexsha,
-            "short_sha": commit.hexsha[:8],
-            "author": commit.author.name,
-            "email": commit.author.email,
+            "sha": full_sha,
+            "short_sha": full_sha[:8],
+            "author": commit["author_name"],
+            "email": commit["author_email"],
             "date": commit_time.isoformat(),
             "subject": subject,
             "body": body,
@@ -1570,9 +2600,9 @@ async def get_commit_detail(
             "files_changed": changed_files,
             "diff": diff_text,
             "stats": {
-                "files": len(commit.stats.files),
-                "insertions": commit.stats.total["insertions"],
-                "deletions": commit.stats.total["deletions"],
+                "files": len(changed_files),
+                "insertions": insertions,
+                "deletions": deletions,
             },
         }
 
@@ -1631,6 +2661,58 @@ async def get_message_commit_sha(archive: ProjectArchive, message_id: int) -> st
     return result
 
 
+async def get_archive_path_commit_sha(archive: ProjectArchive, rel_path: str) -> str | None:
+    """Return the commit that added ``rel_path`` to the archive (None if it is not committed)."""
+
+    def _find() -> str | None:
+        if not archive.repo.head.is_valid():
+            return None
+        log = archive.repo.git.log("--diff-filter=A", "--format=%H", "--", rel_path)
+        shas = log.split()
+        return shas[-1] if shas else None
+
+    return await _to_thread(_find)
+
+
+async def collect_message_archive_refs(archive: ProjectArchive) -> dict[int, ArchivedMessage]:
+    """Map message ids to their canonical archive copies and the commits that added them.
+
+    One ``git log --diff-filter=A`` pass over ``messages/`` replaces a directory
+    scan plus history walk per message; used to rebuild ``message_archive_refs``.
+    """
+
+    def _collect() -> dict[int, ArchivedMessage]:
+        messages_dir = archive.root / "messages"
+        if not messages_dir.is_dir():
+            return {}
+        paths: dict[int, str] = {}
+        # Sorted so the ISO-prefixed name wins over a legacy "<id>.md" in the same month
+        for md_file in sorted(messages_dir.glob("[0-9]*/[0-9]*/*.md")):
+            # YYYY/MM only: thread digest segments (threads/<id>/NNNN.md) also sit three levels down
+            match = _MESSAGE_FILE_ID_RE.search(md_file.name)
+            if match:
+                paths[int(match.group(1))] = md_file.relative_to(archive.repo_root).as_posix()
+        added: dict[str, str] = {}
+        if archive.repo.head.is_valid():
+            log = archive.repo.git.log(
+                "--diff-filter=A",
+                "--name-only",
+                "--format=%x00%H",
+                "--",
+                messages_dir.relative_to(archive.repo_root).as_posix(),
+            )
+            sha: str | None = None
+            # Newest first: a later (older) add of the same path overwrites, leaving the first add
+            for line in log.splitlines():
+                if line.startswith("\x00"):
+                    sha = line[1:]
+                elif line and sha:
+                    added[line] = sha
+        return {mid: ArchivedMessage(path=path, commit_sha=added.get(path)) for mid, path in paths.items()}
+
+    return await _to_thread(_collect)
+
+
 async def get_archive_tree(
     archive: ProjectArchive,
     path: str = "",
@@ -1665,43 +2747,50 @@ async def get_archive_tree(
         else:
             safe_path = ""
 
-        # Get commit (HEAD if not specified)
-        if commit_sha:
-            # Validate SHA format
-            if not (7 <= len(commit_sha) <= 40) or not all(c in "0123456789abcdef" for c in commit_sha.lower()):
-                raise ValueError("Invalid commit SHA format")
-            commit = archive.repo.commit(commit_sha)
-        else:
-            commit = archive.repo.head.commit
+        commit = _resolve_commit_sha(archive.repo, commit_sha)
 
         # Navigate to the requested path within project root
         project_rel = f"projects/{archive.slug}"
-        tree_path = f"{project_rel}/{safe_path}" if safe_path else project_rel
-
-        # Get tree object at path
-        try:
-            tree_obj = commit.tree / tree_path
-        except KeyError:
-            # Path doesn't exist
-            return []
+        tree_path = f"{project_rel}/{safe_path.rstrip('/')}" if safe_path.rstrip("/") else project_rel
 
-        # Ensure we have a tree object (not a blob)
-        if not isinstance(tree_obj, Tree):
+        # None when the path doesn't exist or is a blob rather than a tree
+        tree_entries = _read_git_tree(archive.repo, f"{commit}:{tree_path}")
+        if tree_entries is None:
             return []
 
+        # One batch-check round trip sizes every entry (directories report their tree object size)
+        sizes = _git_objects_info(archive.repo, [sha for _, _, sha in tree_entries])
         entries = []
-        for item in tree_obj:
-            entry_type = "dir" if item.type == "tree" else "file"
-            size = item.size if hasattr(item, "size") else 0
-
+        for (mode, name, _sha), info in zip(tree_entries, sizes, strict=True):
             entries.append({
-                "name": item.name,
-                "path": f"{path}/{item.name}" if path else item.name,
-                "type": entry_type,
-                "size": size,
-                "mode": item.mode,
+                "name": name,
+                "path": f"{path}/{name}" if path else name,
+                "type": "dir" if _tree_entry_type(mode) == "tree" else "file",
+                "size": info[2] if info is not None else 0,
+                "mode": mode,
             })
 
+        if safe_path.rstrip("/") == "messages/threads":
+            # List each segmented digest once more as the single file it replaces
+            names = {entry["name"] for entry in entries}
+            for mode, name, sha in tree_entries:
+                stitched_name = f"{name}.md"
+                if _tree_entry_type(mode) != "tree" or stitched_name in names:
+                    continue
+                members = _read_git_tree(archive.repo, sha) or []
+                if not any(member == _THREAD_DIGEST_INDEX for _, member, _ in members):
+                    continue
+                segment_sizes = _git_objects_info(
+                    archive.repo, [blob for _, member, blob in members if member != _THREAD_DIGEST_INDEX]
+                )
+                entries.append({
+                    "name": stitched_name,
+                    "path": f"{path.rstrip('/')}/{stitched_name}",
+                    "type": "file",
+                    "size": sum(info[2] for info in segment_sizes if info is not None),
+                    "mode": 0o100644,
+                })
+
         # Sort: directories first, then files, both alphabetically
         entries.sort(key=lambda x: (x["type"] != "dir", str(x["name"]).lower()))
 
@@ -1747,32 +2836,43 @@ async def get_file_content(
         else:
             return None
 
-        if commit_sha:
-            # Validate SHA format
-            if not (7 <= len(commit_sha) <= 40) or not all(c in "0123456789abcdef" for c in commit_sha.lower()):
-                raise ValueError("Invalid commit SHA format")
-            commit = archive.repo.commit(commit_sha)
-        else:
-            commit = archive.repo.head.commit
-
+        commit = _resolve_commit_sha(archive.repo, commit_sha)
         project_rel = f"projects/{archive.slug}/{safe_path}"
 
-        try:
-            obj = commit.tree / project_rel
-            # Check if it's a file (blob), not a directory (tree)
-            if obj.type != "blob":
-                raise ValueError("Path is a directory, not a file")
-            # Check size before reading
-            if obj.size > max_size_bytes:
-                raise ValueError(f"File too large: {obj.size} bytes (max {max_size_bytes})")
-
-            stream = obj.data_stream
-            try:
-                return str(stream.read().decode("utf-8", errors="replace"))
-            finally:
-                stream.close()
-        except KeyError:
+        digest_match = _THREAD_DIGEST_PATH_RE.match(safe_path)
+        if digest_match:
+            # Segmented thread digests are served stitched under their pre-segmentation name
+            stitched = _tree_thread_digest(
+                archive.repo, commit, f"projects/{archive.slug}/messages/threads", digest_match.group(1)
+            )
+            if stitched is not None:
+                if len(stitched.encode("utf-8")) > max_size_bytes:
+                    raise ValueError(f"File too large (max {max_size_bytes} bytes)")
+                return stitched
+
+        info = _git_objects_info(archive.repo, [f"{commit}:{project_rel}"])[0]
+        if info is None:
+            return None
+        # Check if it's a file (blob), not a directory (tree)
+        if info[1] != "blob":
+            raise ValueError("Path is a directory, not a file")
+        # Check size before reading
+        if info[2] > max_size_bytes:
+            raise ValueError(f"File too large: {info[2]} bytes (max {max_size_bytes})")
+        obj = _read_git_object(archive.repo, info[0])
+        if obj is None:
             return None
+        text_content = obj[2].decode("utf-8", errors="replace")
+
+        canonical_rel = _mailbox_stub_target(text_content) if _MAILBOX_COPY_PATH_RE.match(safe_path) else None
+        if canonical_rel is not None:
+            # Inbox/outbox stubs show the canonical message they point at
+            canonical = _git_objects_info(archive.repo, [f"{commit}:projects/{archive.slug}/{canonical_rel}"])[0]
+            if canonical is not None and canonical[1] == "blob" and canonical[2] <= max_size_bytes:
+                canonical_obj = _read_git_object(archive.repo, canonical[0])
+                if canonical_obj is not None:
+                    return canonical_obj[2].decode("utf-8", errors="replace")
+        return text_content
 
     result: str | None = await _to_thread(_get_content)
     return result
@@ -1805,45 +2905,45 @@ async def get_agent_communication_graph(
             # Parse commit message to extract sender and recipients
             # Format: "mail: Sender -> Recipient1, Recipient2 | Subject"
             message_str = _ensure_str(commit.message)
-            subject = message_str.split("\n")[0]
-
-            if not subject.startswith("mail: "):
-                continue
+            # Coalesced commits carry one "mail: " line per message in their body
+            for subject in _commit_subjects(message_str):
+                if not subject.startswith("mail: "):
+                    continue
 
-            # Extract sender and recipients
-            try:
-                rest = subject[len("mail: "):]
-                sender_part, _ = rest.split(" | ", 1) if " | " in rest else (rest, "")
+                # Extract sender and recipients
+                try:
+                    rest = subject[len("mail: "):]
+                    sender_part, _ = rest.split(" | ", 1) if " | " in rest else (rest, "")
 
-                if " -> " not in sender_part:
-                    continue
+                    if " -> " not in sender_part:
+                        continue
 
-                sender, recipients_str = sender_part.split(" -> ", 1)
-                sender = str(sender).strip()
-                recipients = [r.strip() for r in recipients_str.split(",")]
+                    sender, recipients_str = sender_part.split(" -> ", 1)
+                    sender = str(sender).strip()
+                    recipients = [r.strip() for r in recipients_str.split(",")]
 
-                # Update sender stats
-                if sender not in agent_stats:
-                    agent_stats[sender] = {"sent": 0, "received": 0}
-                agent_stats[sender]["sent"] = agent_stats[sender].get("sent", 0) + 1
+                    # Update sender stats
+                    if sender not in agent_stats:
+                        agent_stats[sender] = {"sent": 0, "received": 0}
+                    agent_stats[sender]["sent"] = agent_stats[sender].get("sent", 0) + 1
 
-                # Update recipient stats and connections
-                for recipient in recipients:
-                    if not recipient:
-                        continue
+                    # Update recipient stats and connections
+                    for recipient in recipients:
+                        if not recipient:
+                            continue
 
-                    recipient = str(recipient)
-                    if recipient not in agent_stats:
-                        agent_stats[recipient] = {"sent": 0, "received": 0}
-                    agent_stats[recipient]["received"] = agent_stats[recipient].get("received", 0) + 1
+                        recipient = str(recipient)
+                        if recipient not in agent_stats:
+                            agent_stats[recipient] = {"sent": 0, "received": 0}
+                        agent_stats[recipient]["received"] = agent_stats[recipient].get("received", 0) + 1
 
-                    # Track connection
-                    conn_key: tuple[str, str] = (sender, recipient)
-                    connections[conn_key] = int(connections.get(conn_key, 0)) + 1
+                        # Track connection
+                        conn_key: tuple[str, str] = (sender, recipient)
+                        connections[conn_key] = int(connections.get(conn_key, 0)) + 1
 
-            except Exception:
-                # Skip malformed commit messages
-                continue
+                except Exception:
+                    # Skip malformed commit messages
+                    continue
 
         # Build nodes list
         nodes = []
@@ -2018,21 +3118,19 @@ async def get_historical_inbox_snapshot(
 
         messages = []
         try:
-            # Navigate to the inbox folder in the commit tree
-            tree = closest_commit.tree
-            for part in inbox_path.split("/"):
-                tree = tree / part
+            # Navigate to the inbox folder in the commit tree (read through the pooled cat-file readers)
+            tree = _read_git_tree(archive.repo, f"{closest_commit.hexsha}:{inbox_path}")
 
             # Recursively traverse inbox subdirectories (YYYY/MM/) to find message files
-            def traverse_tree(subtree: Any, depth: int = 0) -> None:
+            def traverse_tree(subtree: list[tuple[int, str, str]], depth: int = 0) -> None:
                 """Recursively traverse git tree looking for .md files"""
                 if depth > 3:  # Safety limit: inbox/YYYY/MM is 2 levels, add buffer
                     return
 
-                for item in subtree:
-                    if item.type == "blob" and item.name.endswith(".md"):
+                for mode, name, sha in subtree:
+                    if _tree_entry_type(mode) == "blob" and name.endswith(".md"):
                         # Parse filename: YYYY-MM-DDTHH-MM-SSZ__subject-slug__id.md
-                        parts = item.name.rsplit("__", 2)
+                        parts = name.rsplit("__", 2)
 
                         if len(parts) >= 2:
                             date_str = parts[0]
@@ -2053,11 +3151,9 @@ async def get_historical_inbox_snapshot(
                             importance = "normal"
 
                             try:
-                                stream = item.data_stream
-                                try:
-                                    blob_content = stream.read().decode('utf-8', errors='ignore')
-                                finally:
-                                    stream.close()
+                                # Stub mailbox copies carry the same frontmatter, so they parse alike
+                                blob = _read_git_object(archive.repo, sha)
+                                blob_content = blob[2].decode('utf-8', errors='ignore') if blob else ''
 
                                 # Parse JSON frontmatter (format: ---json\n{...}\n---)
                                 if blob_content.startswith('---json\n') or blob_content.startswith('---json\r\n'):
@@ -2102,14 +3198,15 @@ async def get_historical_inbox_snapshot(
                             if len(messages) >= limit:
                                 return  # Stop when we hit the limit
 
-                    elif item.type == "tree":
+                    elif _tree_entry_type(mode) == "tree":
                         # Recursively traverse subdirectory
-                        traverse_tree(item, depth + 1)
+                        traverse_tree(_read_git_tree(archive.repo, sha) or [], depth + 1)
                         if len(messages) >= limit:
                             return  # Stop when we hit the limit
 
             # Start recursive traversal
-            traverse_tree(tree)
+            if tree is not None:
+                traverse_tree(tree)
 
         except (KeyError, AttributeError):
             # Inbox directory didn't exist at that time
@@ -2145,6 +3242,7 @@ class BackupManifest:
     project_bundles: list[str]
     storage_root: str
     restore_instructions: str
+    layout: str = "shared"
 
 
 async def create_diagnostic_backup(
@@ -2208,37 +3306,32 @@ async def create_diagnostic_backup(
         await _to_thread(_copy_db)
         database_copied = str(db_backup)
 
-    # Create git bundles for projects
-    repo_path = archive_root
-    if repo_path.exists() and (repo_path / ".git").exists():
+    # Create git bundles: one per project repo in the per-project layout,
+    # otherwise a single bundle of the shared repo.
+    if settings.storage.layout == "per-project":
+        repo_paths = [archive_repo_root(settings, project_slug)] if project_slug else archive_repo_roots(settings)
+        bundle_targets = [(path.name, path) for path in repo_paths if (path / ".git").exists()]
+    elif (archive_root / ".git").exists():
+        bundle_targets = [(project_slug or "archive", archive_root)]
+    else:
+        bundle_targets = []
 
-        def _create_bundles() -> list[str]:
-            bundles: list[str] = []
+    def _create_bundles() -> list[str]:
+        bundles: list[str] = []
+        for name, repo_path in bundle_targets:
+            bundle_path = backup_path / f"{name}.bundle"
             repo = Repo(repo_path)
             try:
-                if project_slug:
-                    # Single project bundle
-                    bundle_path = backup_path / f"{project_slug}.bundle"
-                    try:
-                        # Create bundle of the entire repo (includes all history)
-                        repo.git.bundle("create", str(bundle_path), "--all")
-                        bundles.append(str(bundle_path))
-                    except Exception:
-                        pass  # Skip if bundle creation fails
-                else:
-                    # Bundle entire archive
-                    bundle_path = backup_path / "archive.bundle"
-                    try:
-                        repo.git.bundle("create", str(bundle_path), "--all")
-                        bundles.append(str(bundle_path))
-                    except Exception:
-                        pass
+                # Create bundle of the entire repo (includes all history)
+                repo.git.bundle("create", str(bundle_path), "--all")
+                bundles.append(str(bundle_path))
+            except Exception:
+                pass  # Skip if bundle creation fails
             finally:
                 repo.close()
+        return bundles
 
-            return bundles
-
-        project_bundles = await _to_thread(_create_bundles)
+    project_bundles = await _to_thread(_create_bundles)
 
     # Write manifest
     manifest = BackupManifest(
@@ -2255,6 +3348,7 @@ async def create_diagnostic_backup(
             "3. Use 'git clone --bare <bundle> <target>' to restore archive\n"
             "4. Restart MCP Agent Mail"
         ),
+        layout=settings.storage.layout,
     )
 
     manifest_path = backup_path / "manifest.json"
@@ -2270,6 +3364,7 @@ async def create_diagnostic_backup(
                     "project_bundles": manifest.project_bundles,
                     "storage_root": manifest.storage_root,
                     "restore_instructions": manifest.restore_instructions,
+                    "layout": manifest.layout,
                 },
                 f,
                 indent=2,
@@ -2395,6 +3490,7 @@ async def restore_from_backup(
     # Restore git bundles
     bundles = manifest_data.get("project_bundles", [])
     archive_root = Path(settings.storage.root)
+    per_project = manifest_data.get("layout") == "per-project"
 
     def _restore_bundle(bundle_to_restore: Path, target_root: Path) -> None:
         """Restore a git bundle to target directory."""
@@ -2418,8 +3514,15 @@ async def restore_from_backup(
             results["errors"].append(f"Bundle not found: {bundle_path_str}")
             continue
 
+        target_root = archive_root
+        if per_project:
+            # Per-project bundles are named after the project slug.
+            if target_project and bundle_path.stem != target_project:
+                continue
+            target_root = archive_root / "repos" / bundle_path.stem
+
         try:
-            await _to_thread(_restore_bundle, bundle_path, archive_root)
+            await _to_thread(_restore_bundle, bundle_path, target_root)
             results["bundles_restored"].append(str(bundle_path))
         except Exception as e:
             results["errors"].append(f"Bundle restore failed for {bundle_path}: {e}")
@@ -157,3 +157,33 @@ def _global_resource_cleanup():
             if isinstance(obj, Repo):
                 with contextlib.suppress(Exception):
                     obj.close()
+
+
+@pytest.fixture
+def seed_mailbox():
+    """Return ``seed(client, project_key, messages)`` that creates a sender/recipient pair and sends to it.
+
+    Each entry in ``messages`` is merged over a default send_message payload from
+    sender to recipient; the helper returns ``(sender, recipient)`` names.
+    """
+
+    async def seed(client, project_key: str, messages=()) -> tuple[str, str]:
+        await client.call_tool("ensure_project", {"human_key": project_key})
+        names = []
+        for _ in range(2):
+            res = await client.call_tool("register_agent", {"project_key": project_key, "program": "x", "model": "y"})
+            names.append(res.data["name"])
+        sender, recipient = names
+        for fields in messages:
+            payload = {
+                "project_key": project_key,
+                "sender_name": sender,
+                "to": [recipient],
+                "subject": "message",
+                "body_md": "body",
+            }
+            payload.update(fields)
+            await client.call_tool("send_message", payload)
+        return sender, recipient
+
+    return seed
@@ -17,7 +17,7 @@ from rich.table import Table
 from sqlalchemy import text
 
 from mcp_agent_mail import share
-from mcp_agent_mail.app import ToolExecutionError, _compile_pathspec, _patterns_overlap, build_mcp_server
+from mcp_agent_mail.app import ToolExecutionError, _glob_automata_intersect, _patterns_overlap, build_mcp_server
 from mcp_agent_mail.cli import _collect_preview_status
 from mcp_agent_mail.config import clear_settings_cache, get_settings
 from mcp_agent_mail.db import ensure_schema, get_session, reset_database_state
@@ -64,17 +64,17 @@ def _parse_search_html(html: str) -> dict[str, Any]:
 
 
 def _cache_hit_ratio() -> float:
-    """Return PathSpec cache hit ratio, or 0.0 when no samples collected."""
-    info = _compile_pathspec.cache_info()
+    """Return the pattern-overlap cache hit ratio, or 0.0 when no samples collected."""
+    info = _glob_automata_intersect.cache_info()
     total = info.hits + info.misses
     return (info.hits / total) if total else 0.0
 
 
 def _render_cache_stats_table(console) -> None:
     """Render cache stats with Rich for log visibility."""
-    info = _compile_pathspec.cache_info()
+    info = _glob_automata_intersect.cache_info()
     ratio = _cache_hit_ratio()
-    table = Table(title="PathSpec Cache Stats")
+    table = Table(title="Pattern Overlap Cache Stats")
     table.add_column("Hits", justify="right")
     table.add_column("Misses", justify="right")
     table.add_column("Maxsize", justify="right")
@@ -430,15 +430,15 @@ async def test_isomorphism_e2e_suite(isolated_env, tmp_path: Path, monkeypatch)
         )
 
         render_phase(console, "phase2_checks", {"pathspec_cache": "warmup", "commit_batching": "measure"})
-        _compile_pathspec.cache_clear()
+        _glob_automata_intersect.cache_clear()
         for _ in range(20):
             _patterns_overlap("src/**", "src/file.txt")
             _patterns_overlap("docs/**", "docs/readme.md")
             _patterns_overlap("assets/*.png", "assets/logo.png")
-        cache_info = _compile_pathspec.cache_info()
+        cache_info = _glob_automata_intersect.cache_info()
         cache_ratio = _cache_hit_ratio()
         _render_cache_stats_table(console)
-        assert cache_ratio >= 0.9, f"PathSpec cache hit ratio too low: {cache_ratio:.2%}"
+        assert cache_ratio >= 0.9, f"Pattern overlap cache hit ratio too low: {cache_ratio:.2%}"
 
         perf_project = _tool_data(
             await client.call_tool(
@@ -0,0 +1,61 @@
+"""Tests for archive git maintenance (commit-graph with Bloom filters, repacks)."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from fastmcp import Client
+from typer.testing import CliRunner
+
+from mcp_agent_mail.app import build_mcp_server
+from mcp_agent_mail.cli import app as cli_app
+from mcp_agent_mail.config import clear_settings_cache, get_settings
+from mcp_agent_mail.storage import ensure_archive, get_recent_commits, run_archive_maintenance
+
+
+def _commit_graph_files(repo_root: Path) -> list[Path]:
+    return sorted((repo_root / ".git" / "objects" / "info" / "commit-graphs").glob("*.graph"))
+
+
+@pytest.mark.asyncio
+async def test_maintenance_writes_bloom_commit_graph_when_due(isolated_env, monkeypatch, seed_mailbox):
+    monkeypatch.setenv("STORAGE_MAINTENANCE_MIN_COMMITS", "3")
+    clear_settings_cache()
+    async with Client(build_mcp_server()) as client:
+        await seed_mailbox(client, "/maint", [{"subject": "hello"}])
+        archive = await ensure_archive(get_settings(), "maint")
+
+        [result] = await run_archive_maintenance(get_settings())
+        assert result["new_commits"] == result["commits"] >= 3
+        [graph] = _commit_graph_files(archive.repo_root)
+        assert b"BIDX" in graph.read_bytes()  # changed-path Bloom filter index chunk
+        assert (archive.repo_root / ".git" / "objects" / "pack" / "multi-pack-index").exists()
+        loose = [p for p in (archive.repo_root / ".git" / "objects").glob("??/*") if p.is_file()]
+        assert loose == []
+
+        # Nothing new since the last run: not due.
+        assert await run_archive_maintenance(get_settings()) == []
+        # Path-limited walks read through the new graph (everything but the init commit).
+        assert len(await get_recent_commits(archive.repo, project_slug="maint")) == result["commits"] - 1
+
+        metrics = json.loads((await client.read_resource("resource://tooling/metrics"))[0].text)
+        maintenance = metrics["archive_maintenance"]
+        assert maintenance["last_run"] is not None
+        assert maintenance["repos"][str(archive.repo_root)]["duration_ms"] == result["duration_ms"]
+
+
+def test_maintain_cli_force(isolated_env):
+    import asyncio
+
+    asyncio.run(ensure_archive(get_settings(), "maint"))
+    runner = CliRunner()
+    skipped = runner.invoke(cli_app, ["archive", "maintain", "--json"])
+    assert skipped.exit_code == 0, skipped.output
+    assert json.loads(skipped.output) == []
+
+    forced = runner.invoke(cli_app, ["archive", "maintain", "--force", "--json"])
+    assert forced.exit_code == 0, forced.output
+    [result] = json.loads(forced.output)
+    assert result["commits"] == 1
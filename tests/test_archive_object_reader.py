@@ -0,0 +1,91 @@
+"""Tests for the pooled cat-file readers behind the archive history helpers."""
+
+from __future__ import annotations
+
+import pytest
+
+from mcp_agent_mail import storage
+from mcp_agent_mail.config import get_settings
+from mcp_agent_mail.storage import (
+    archive_object_cache_stats,
+    ensure_archive,
+    get_archive_tree,
+    get_commit_detail,
+    get_file_content,
+    write_agent_profile,
+    write_message_bundle,
+)
+
+MESSAGE = {
+    "id": 1,
+    "subject": "Reader",
+    "thread_id": None,
+    "project": "reader",
+    "created": "2025-01-01T00:00:00+00:00",
+}
+FILENAME = "2025-01-01T00-00-00Z__reader__1.md"
+
+
+@pytest.mark.asyncio
+async def test_history_helpers_match_git(isolated_env):
+    archive = await ensure_archive(get_settings(), "reader")
+    await write_agent_profile(archive, {"name": "BlueLake", "program": "test", "model": "test"})
+    await write_message_bundle(archive, dict(MESSAGE), "line one\nline two", "BlueLake", ["RedStone"])
+    first = archive.repo.head.commit.hexsha
+    await write_message_bundle(archive, dict(MESSAGE), "line one\nline 2\nline three", "BlueLake", ["RedStone"])
+    head = archive.repo.head.commit
+
+    rel = f"messages/2025/01/{FILENAME}"
+    assert await get_file_content(archive, rel) == (archive.root / rel).read_text()
+    assert "line two" in (await get_file_content(archive, rel, commit_sha=first[:10]) or "")
+    assert await get_file_content(archive, "messages/2025/01/missing.md") is None
+    with pytest.raises(ValueError):
+        await get_file_content(archive, "messages")
+    with pytest.raises(ValueError):
+        await get_file_content(archive, rel, commit_sha="0" * 40)
+
+    tree = await get_archive_tree(archive)
+    assert [(entry["name"], entry["type"]) for entry in tree] == [("agents", "dir"), ("messages", "dir")]
+    [profile] = [entry for entry in await get_archive_tree(archive, "agents/BlueLake") if entry["type"] == "file"]
+    expected = head.tree / f"projects/reader/agents/BlueLake/{profile['name']}"
+    assert (profile["size"], profile["mode"]) == (expected.size, expected.mode)
+
+    detail = await get_commit_detail(archive.repo, head.hexsha[:12])
+    assert detail["sha"] == head.hexsha
+    assert detail["author"] == head.author.name
+    assert detail["subject"] == head.summary
+    assert sorted(f["path"] for f in detail["files_changed"]) == sorted(head.stats.files)
+    assert {f["change_type"] for f in detail["files_changed"]} == {"modified"}
+    assert detail["stats"] == {
+        "files": len(head.stats.files),
+        "insertions": head.stats.total["insertions"],
+        "deletions": head.stats.total["deletions"],
+    }
+    assert f"diff --git a/projects/reader/{rel} b/projects/reader/{rel}\n" in detail["diff"]
+    assert "-line two\n+line 2\n+line three\n" in detail["diff"]
+
+
+@pytest.mark.asyncio
+async def test_readers_are_pooled_and_objects_cached(isolated_env, monkeypatch):
+    archive = await ensure_archive(get_settings(), "reader")
+    await write_message_bundle(archive, dict(MESSAGE), "cached body", "BlueLake", ["RedStone"])
+    rel = f"messages/2025/01/{FILENAME}"
+
+    spawned: list[list[str]] = []
+    real_popen = storage.subprocess.Popen
+
+    def _popen(args, *a, **kw):
+        spawned.append(list(args))
+        return real_popen(args, *a, **kw)
+
+    monkeypatch.setattr(storage.subprocess, "Popen", _popen)
+    for _ in range(5):
+        assert "cached body" in (await get_file_content(archive, rel) or "")
+    # One --batch-check and one --batch process serve every read.
+    assert sorted(args[-1] for args in spawned) == ["--batch", "--batch-check"]
+
+    before = archive_object_cache_stats()
+    await get_file_content(archive, rel)
+    after = archive_object_cache_stats()
+    assert after["hits"] > before["hits"]
+    assert after["reader_pools"] >= 1
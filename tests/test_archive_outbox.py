@@ -0,0 +1,118 @@
+"""Tests for the durable archive outbox (STORAGE_ARCHIVE_OUTBOX_ENABLED)."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+from fastmcp import Client
+from sqlalchemy import text
+from typer.testing import CliRunner
+
+from mcp_agent_mail import app as app_module
+from mcp_agent_mail.app import build_mcp_server, drain_archive_outbox
+from mcp_agent_mail.cli import app as cli_app
+from mcp_agent_mail.config import clear_settings_cache, get_settings
+from mcp_agent_mail.db import get_message_archive_ref, get_session
+
+
+def _archived_messages(slug: str) -> list[Path]:
+    root = Path(get_settings().storage.root).expanduser().resolve() / "projects" / slug / "messages"
+    return sorted(root.rglob("*.md")) if root.exists() else []
+
+
+async def _jobs() -> list[tuple[int, int, str | None]]:
+    async with get_session() as session:
+        rows = await session.execute(text("SELECT message_id, attempts, last_error FROM archive_jobs ORDER BY id"))
+        return [tuple(row) for row in rows.all()]
+
+
+@pytest.fixture
+def outbox_env(isolated_env, monkeypatch):
+    monkeypatch.setenv("STORAGE_ARCHIVE_OUTBOX_ENABLED", "true")
+    clear_settings_cache()
+    # Keep the background worker out of the way so each test drains explicitly.
+    monkeypatch.setattr(app_module, "_kick_archive_outbox", lambda: None)
+
+
+@pytest.mark.asyncio
+async def test_send_returns_before_archive_write_and_drain_catches_up(outbox_env, seed_mailbox):
+    async with Client(build_mcp_server()) as client:
+        _, recipient = await seed_mailbox(client, "/outbox", [{"subject": "queued"}])
+
+        assert _archived_messages("outbox") == []
+        [(message_id, attempts, _)] = await _jobs()
+        assert attempts == 0
+        inbox = await client.call_tool("fetch_inbox", {"project_key": "/outbox", "agent_name": recipient})
+        assert [item["id"] for item in inbox.structured_content["result"]] == [message_id]
+
+        queue = json.loads((await client.read_resource("resource://tooling/archive_queue"))[0].text)
+        assert queue["enabled"] is True
+        assert queue["depth"] == 1
+        assert queue["projects"] == {"outbox": 1}
+
+        assert await drain_archive_outbox() == 1
+        assert await _jobs() == []
+        [archived] = _archived_messages("outbox")
+        assert archived.name.endswith(f"__{message_id}.md")
+        ref = await get_message_archive_ref(message_id)
+        assert ref is not None and ref[0].endswith(archived.name) and ref[1]
+
+        queue = json.loads((await client.read_resource("resource://tooling/archive_queue"))[0].text)
+        assert queue["depth"] == 0
+        assert queue["lag_seconds"] == 0.0
+
+
+@pytest.mark.asyncio
+async def test_failed_jobs_stay_queued_for_retry(outbox_env, seed_mailbox, monkeypatch):
+    async with Client(build_mcp_server()) as client:
+        await seed_mailbox(client, "/outbox", [{"subject": "flaky"}])
+
+    async def _boom(*args, **kwargs):
+        raise OSError("disk full")
+
+    real_write = app_module.write_message_bundle
+    monkeypatch.setattr(app_module, "write_message_bundle", _boom)
+    assert await drain_archive_outbox() == 0
+    [(_, attempts, last_error)] = await _jobs()
+    assert (attempts, last_error) == (1, "disk full")
+
+    monkeypatch.setattr(app_module, "write_message_bundle", real_write)
+    assert await drain_archive_outbox() == 1
+    assert len(_archived_messages("outbox")) == 1
+
+
+@pytest.mark.asyncio
+async def test_pending_jobs_replay_on_startup(isolated_env, monkeypatch, seed_mailbox):
+    monkeypatch.setenv("STORAGE_ARCHIVE_OUTBOX_ENABLED", "true")
+    clear_settings_cache()
+    with monkeypatch.context() as patch:
+        patch.setattr(app_module, "_kick_archive_outbox", lambda: None)
+        async with Client(build_mcp_server()) as client:
+            await seed_mailbox(client, "/outbox", [{"subject": "left behind"}])
+    assert len(await _jobs()) == 1
+
+    # A fresh server lifespan replays the backlog without any new send.
+    async with Client(build_mcp_server()):
+        for _ in range(100):
+            if not await _jobs():
+                break
+            await asyncio.sleep(0.05)
+    assert await _jobs() == []
+    assert len(_archived_messages("outbox")) == 1
+
+
+def test_doctor_reports_archive_lag(outbox_env, seed_mailbox):
+    async def _seed() -> None:
+        async with Client(build_mcp_server()) as client:
+            await seed_mailbox(client, "/outbox", [{"subject": "behind"}])
+
+    asyncio.run(_seed())
+
+    result = CliRunner().invoke(cli_app, ["doctor", "check", "--json"])
+    assert result.exit_code == 0, result.output
+    checks = {d["name"]: d for d in json.loads(result.output)["diagnostics"]}
+    assert checks["Archive Queue"]["status"] == "info"
+    assert checks["Archive Queue"]["message"].startswith("1 message(s) awaiting archive write")
@@ -0,0 +1,92 @@
+"""Tests for moving old messages into monthly cold-tier databases and reading them back."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+from fastmcp import Client
+from fastmcp.exceptions import ToolError
+from sqlalchemy import text
+from typer.testing import CliRunner
+
+from mcp_agent_mail.app import build_mcp_server
+from mcp_agent_mail.cli import app as cli_app
+from mcp_agent_mail.db import get_session, list_cold_partitions, move_messages_to_cold_tier
+
+MESSAGES = [
+    {"subject": f"incident {idx}", "body_md": "rollback the canary", "thread_id": "INC-7"} for idx in range(3)
+]
+
+
+async def _backdate(subject: str, created_ts: str) -> None:
+    async with get_session() as session:
+        await session.execute(
+            text("UPDATE messages SET created_ts = :ts WHERE subject = :subject"), {"ts": created_ts, "subject": subject}
+        )
+        await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_old_messages_move_and_stay_readable(isolated_env, seed_mailbox):
+    server = build_mcp_server()
+    async with Client(server) as client:
+        _, recipient = await seed_mailbox(client, "/tiers", MESSAGES)
+        await _backdate("incident 0", "2024-01-15 08:00:00.000000")
+        await _backdate("incident 1", "2024-02-03 09:30:00.000000")
+
+        moved = await move_messages_to_cold_tier(30)
+        assert moved == {"2024-01": 1, "2024-02": 1}
+        assert [part.month for part in await list_cold_partitions()] == ["2024-01", "2024-02"]
+        async with get_session() as session:
+            hot = (await session.execute(text("SELECT subject FROM messages"))).scalars().all()
+            inbox_rows = (await session.execute(text("SELECT COUNT(*) FROM inbox_entries"))).scalar()
+        assert hot == ["incident 2"]
+        assert inbox_rows == 1
+
+        inbox = await client.call_tool("fetch_inbox", {"project_key": "/tiers", "agent_name": recipient})
+        assert [item["subject"] for item in inbox.structured_content["result"]] == ["incident 2"]
+
+        search = await client.call_tool("search_messages", {"project_key": "/tiers", "query": "canary"})
+        assert sorted(item["subject"] for item in search.structured_content["result"]) == [
+            "incident 0",
+            "incident 1",
+            "incident 2",
+        ]
+        cold_id = next(item["id"] for item in search.structured_content["result"] if item["subject"] == "incident 0")
+
+        message = json.loads((await client.read_resource(f"resource://message/{cold_id}?project=tiers"))[0].text)
+        assert message["subject"] == "incident 0"
+        assert message["body_md"] == "rollback the canary"
+        assert message["created_ts"].startswith("2024-01-15")
+
+        thread = json.loads((await client.read_resource("resource://thread/INC-7?project=tiers&limit=2"))[0].text)
+        assert [m["subject"] for m in thread["messages"]] == ["incident 0", "incident 1"]
+        rest = json.loads(
+            (await client.read_resource(f"resource://thread/INC-7?project=tiers&limit=2&cursor={thread['next_cursor']}"))[
+                0
+            ].text
+        )
+        assert [m["subject"] for m in rest["messages"]] == ["incident 2"]
+
+        # Cold copies are read-only: state-changing tools only see hot rows.
+        with pytest.raises(ToolError):
+            await client.call_tool(
+                "acknowledge_message", {"project_key": "/tiers", "agent_name": recipient, "message_id": cold_id}
+            )
+
+
+def test_cold_tier_cli_moves_and_lists(isolated_env, seed_mailbox):
+    async def _seed() -> None:
+        async with Client(build_mcp_server()) as client:
+            await seed_mailbox(client, "/tiers", MESSAGES[:1])
+        await _backdate("incident 0", "2024-03-01 00:00:00.000000")
+
+    asyncio.run(_seed())
+
+    result = CliRunner().invoke(cli_app, ["archive", "cold-tier", "--older-than-days", "30", "--json"])
+    assert result.exit_code == 0, result.output
+    payload = json.loads(result.output)
+    assert payload["moved"] == {"2024-03": 1}
+    assert payload["partitions"][0]["message_count"] == 1
@@ -0,0 +1,115 @@
+"""Tests for the opt-in archive commit coalescer (STORAGE_COMMIT_MODE=coalesce)."""
+
+from __future__ import annotations
+
+import asyncio
+import re
+
+import pytest
+from fastmcp import Client
+
+from mcp_agent_mail.app import build_mcp_server
+from mcp_agent_mail.config import clear_settings_cache, get_settings
+from mcp_agent_mail.storage import (
+    _commit_subjects,
+    ensure_archive,
+    get_agent_communication_graph,
+    write_message_bundle,
+)
+
+
+def _bundle(idx: int) -> tuple[dict[str, object], str]:
+    message = {
+        "id": idx,
+        "subject": f"note {idx}",
+        "thread_id": None,
+        "project": "coalesce",
+        "created": f"2025-01-01T00:00:0{idx}+00:00",
+    }
+    return message, f"body {idx}"
+
+
+def _mail_commits(repo) -> list[str]:
+    return [str(c.message) for c in repo.iter_commits(paths=["projects/coalesce/messages"])]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writes_share_one_commit(isolated_env, monkeypatch):
+    monkeypatch.setenv("STORAGE_COMMIT_MODE", "coalesce")
+    monkeypatch.setenv("STORAGE_COMMIT_COALESCE_WINDOW_MS", "200")
+    clear_settings_cache()
+    archive = await ensure_archive(get_settings(), "coalesce")
+
+    await asyncio.gather(
+        *(write_message_bundle(archive, msg, body, "BlueLake", ["RedStone"]) for msg, body in map(_bundle, range(4)))
+    )
+
+    commits = _mail_commits(archive.repo)
+    assert len(commits) == 1
+    message = commits[0]
+    assert re.match(r"archive: 4 writes \| mail: BlueLake -> RedStone \| note \d \(\+3 more\)\n", message)
+    assert sorted(_commit_subjects(message)) == [f"mail: BlueLake -> RedStone | note {idx}" for idx in range(4)]
+    # The per-message audit lines ride along in the body; the Agent trailer is not repeated.
+    assert message.count("TOOL: send_message") == 4
+    assert message.rstrip().endswith("Agent: BlueLake")
+    assert not archive.repo.is_dirty(untracked_files=True)
+
+    graph = await get_agent_communication_graph(archive.repo, "coalesce")
+    assert graph["edges"] == [{"from": "BlueLake", "to": "RedStone", "count": 4}]
+
+
+@pytest.mark.asyncio
+async def test_max_entries_splits_batches(isolated_env, monkeypatch):
+    monkeypatch.setenv("STORAGE_COMMIT_MODE", "coalesce")
+    monkeypatch.setenv("STORAGE_COMMIT_COALESCE_WINDOW_MS", "200")
+    monkeypatch.setenv("STORAGE_COMMIT_COALESCE_MAX_ENTRIES", "2")
+    clear_settings_cache()
+    archive = await ensure_archive(get_settings(), "coalesce")
+
+    await asyncio.gather(
+        *(write_message_bundle(archive, msg, body, "BlueLake", ["RedStone"]) for msg, body in map(_bundle, range(5)))
+    )
+
+    assert sorted(len(_commit_subjects(m)) for m in _mail_commits(archive.repo)) == [1, 2, 2]
+
+
+@pytest.mark.asyncio
+async def test_strict_mode_commits_each_write(isolated_env):
+    archive = await ensure_archive(get_settings(), "coalesce")
+
+    await asyncio.gather(
+        *(write_message_bundle(archive, msg, body, "BlueLake", ["RedStone"]) for msg, body in map(_bundle, range(3)))
+    )
+
+    assert len(_mail_commits(archive.repo)) == 3
+
+
+@pytest.mark.asyncio
+async def test_concurrent_sends_in_one_project_coalesce(isolated_env, monkeypatch, seed_mailbox):
+    monkeypatch.setenv("STORAGE_COMMIT_MODE", "coalesce")
+    monkeypatch.setenv("STORAGE_COMMIT_COALESCE_WINDOW_MS", "500")
+    clear_settings_cache()
+    async with Client(build_mcp_server()) as client:
+        sender, recipient = await seed_mailbox(client, "/coalesce")
+        archive = await ensure_archive(get_settings(), "coalesce")
+        before = len(_mail_commits(archive.repo))
+
+        await asyncio.gather(
+            *(
+                client.call_tool(
+                    "send_message",
+                    {
+                        "project_key": "/coalesce",
+                        "sender_name": sender,
+                        "to": [recipient],
+                        "subject": f"parallel {idx}",
+                        "body_md": "hello",
+                    },
+                )
+                for idx in range(3)
+            )
+        )
+
+        # The project archive lock is released before the commit window closes, so the
+        # sends queue behind each other only for their file writes and share a commit.
+        assert len(_mail_commits(archive.repo)) - before < 3
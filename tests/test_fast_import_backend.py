@@ -0,0 +1,69 @@
+"""Tests for the git fast-import archive commit backend (STORAGE_COMMIT_BACKEND=fast-import)."""
+
+from __future__ import annotations
+
+import pytest
+
+from mcp_agent_mail.config import clear_settings_cache, get_settings
+from mcp_agent_mail.storage import (
+    _FAST_IMPORT_WRITERS,
+    ensure_archive,
+    write_agent_profile,
+    write_message_bundle,
+)
+
+
+def _message(idx: int) -> dict[str, object]:
+    return {"id": idx, "subject": f"note {idx}", "thread_id": None, "project": "fast", "created": "2025-01-01T00:00:00+00:00"}
+
+
+@pytest.mark.asyncio
+async def test_fast_import_commits_without_touching_the_index(isolated_env, monkeypatch):
+    monkeypatch.setenv("STORAGE_COMMIT_BACKEND", "fast-import")
+    clear_settings_cache()
+    archive = await ensure_archive(get_settings(), "fast")
+    index_path = archive.repo_root / ".git" / "index"
+    # Even the archive's initial commit went through fast-import, so no index was ever written.
+    assert not index_path.exists()
+
+    await write_message_bundle(archive, _message(1), "hello", "BlueLake", ["RedStone"])
+    await write_message_bundle(archive, _message(2), "again", "BlueLake", ["RedStone"])
+
+    assert len(_FAST_IMPORT_WRITERS) == 1
+    assert not index_path.exists()
+    head = archive.repo.head.commit
+    assert head.summary == "mail: BlueLake -> RedStone | note 2"
+    assert head.parents[0].summary == "mail: BlueLake -> RedStone | note 1"
+    assert head.author.name == "test-agent"
+    files = {blob.path: blob.data_stream.read().decode() for blob in head.tree.traverse() if blob.type == "blob"}
+    message_files = [path for path in files if path.startswith("projects/fast/messages/")]
+    assert len(message_files) == 2
+    assert any("again" in files[path] for path in message_files)
+    # Working-tree copies are still written for humans.
+    assert all((archive.repo_root / path).exists() for path in message_files)
+
+    # Re-writing identical content is a no-op, like the is_dirty check in the GitPython backend.
+    await write_agent_profile(archive, {"name": "BlueLake", "program": "codex"})
+    profile_head = archive.repo.head.commit.hexsha
+    await write_agent_profile(archive, {"name": "BlueLake", "program": "codex"})
+    assert archive.repo.head.commit.hexsha == profile_head
+
+
+@pytest.mark.asyncio
+async def test_gitpython_backend_resyncs_index_after_fast_import(isolated_env, monkeypatch):
+    monkeypatch.setenv("STORAGE_COMMIT_BACKEND", "fast-import")
+    clear_settings_cache()
+    archive = await ensure_archive(get_settings(), "fast")
+    await write_message_bundle(archive, _message(1), "hello", "BlueLake", ["RedStone"])
+
+    monkeypatch.setenv("STORAGE_COMMIT_BACKEND", "gitpython")
+    clear_settings_cache()
+    archive = await ensure_archive(get_settings(), "fast")
+    await write_message_bundle(archive, _message(2), "again", "BlueLake", ["RedStone"])
+
+    head = archive.repo.head.commit
+    # The GitPython commit must not drop the files fast-import added behind the index's back.
+    assert len([p for p in head.stats.files if "messages/" in str(p)]) == 1
+    message_blobs = [b for b in head.tree.traverse() if b.type == "blob" and b.path.startswith("projects/fast/messages/")]
+    assert len(message_blobs) == 2
+    assert not archive.repo.is_dirty(index=True, working_tree=True)
@@ -0,0 +1,73 @@
+"""Tests for the fts_messages index: project scoping and external content."""
+
+from __future__ import annotations
+
+import pytest
+from fastmcp import Client
+from sqlalchemy import text
+
+from mcp_agent_mail.app import build_mcp_server
+from mcp_agent_mail.db import ensure_schema, fts_project_query, get_session, rebuild_fts_index, reset_database_state
+
+
+@pytest.mark.asyncio
+async def test_search_is_scoped_inside_match(isolated_env, seed_mailbox):
+    server = build_mcp_server()
+    async with Client(server) as client:
+        await seed_mailbox(client, "/alpha", [{"subject": "deploy alpha", "body_md": "deploy"}])
+        await seed_mailbox(client, "/beta", [{"subject": "deploy beta", "body_md": "deploy"}])
+
+        res = await client.call_tool("search_messages", {"project_key": "/alpha", "query": "deploy"})
+        assert [item["subject"] for item in res.structured_content["result"]] == ["deploy alpha"]
+
+    async with get_session() as session:
+        pid = (await session.execute(text("SELECT id FROM projects WHERE human_key = '/beta'"))).scalar()
+        rows = (
+            await session.execute(
+                text("SELECT subject FROM fts_messages WHERE fts_messages MATCH :q"),
+                {"q": fts_project_query("deploy", [pid])},
+            )
+        ).all()
+    assert [row[0] for row in rows] == ["deploy beta"]
+
+
+@pytest.mark.asyncio
+async def test_legacy_fts_table_is_migrated(isolated_env, seed_mailbox):
+    server = build_mcp_server()
+    async with Client(server) as client:
+        await seed_mailbox(client, "/alpha", [{"subject": "deploy alpha", "body_md": "deploy"}])
+
+    async with get_session() as session:
+        for trigger in ("fts_messages_ai", "fts_messages_ad", "fts_messages_au"):
+            await session.execute(text(f"DROP TRIGGER {trigger}"))
+        await session.execute(text("DROP TABLE fts_messages"))
+        await session.execute(text("CREATE VIRTUAL TABLE fts_messages USING fts5(message_id UNINDEXED, subject, body)"))
+        await session.commit()
+
+    reset_database_state()
+    await ensure_schema()
+    async with get_session() as session:
+        columns = [row[1] for row in (await session.execute(text("PRAGMA table_info(fts_messages)"))).all()]
+        count = (await session.execute(text("SELECT COUNT(*) FROM fts_messages_docsize"))).scalar()
+    assert "project_id" in columns
+    assert count == 1
+
+
+@pytest.mark.asyncio
+async def test_bodies_are_not_duplicated_into_the_index(isolated_env, seed_mailbox):
+    server = build_mcp_server()
+    async with Client(server) as client:
+        await seed_mailbox(client, "/alpha", [{"subject": "deploy alpha", "body_md": "deploy"}])
+        async with get_session() as session:
+            tables = {row[0] for row in (await session.execute(text("SELECT name FROM sqlite_master"))).all()}
+            await session.execute(text("UPDATE messages SET body_md = 'rollback'"))
+            await session.commit()
+        assert "fts_messages_content" not in tables
+
+        res = await client.call_tool("search_messages", {"project_key": "/alpha", "query": "rollback"})
+        assert [item["subject"] for item in res.structured_content["result"]] == ["deploy alpha"]
+
+    async with get_session() as session:
+        await session.execute(text("INSERT INTO fts_messages(fts_messages) VALUES('delete-all')"))
+        await session.commit()
+    assert await rebuild_fts_index() == 1
@@ -0,0 +1,170 @@
+"""Tests for the opt-in single-writer group-commit mode (DATABASE_WRITE_MODE=group)."""
+
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+from contextlib import closing
+
+import pytest
+from fastmcp import Client
+from sqlalchemy import text
+
+from mcp_agent_mail.app import build_mcp_server
+from mcp_agent_mail.config import clear_settings_cache, get_settings
+from mcp_agent_mail.db import (
+    ensure_schema,
+    get_database_path,
+    get_group_writer,
+    get_session,
+    run_write,
+    shutdown_group_writer,
+)
+
+
+@pytest.fixture
+def group_mode(isolated_env, monkeypatch):
+    monkeypatch.setenv("DATABASE_WRITE_MODE", "group")
+    monkeypatch.setenv("DATABASE_GROUP_COMMIT_MAX_DELAY_MS", "20")
+    clear_settings_cache()
+    yield
+    clear_settings_cache()
+
+
+def test_write_mode_defaults_to_direct(isolated_env):
+    settings = get_settings()
+    assert settings.database.write_mode == "direct"
+    assert settings.database.group_commit_max_batch == 64
+
+
+def test_write_mode_invalid_value_falls_back(monkeypatch):
+    monkeypatch.setenv("DATABASE_WRITE_MODE", "bogus")
+    clear_settings_cache()
+    try:
+        assert get_settings().database.write_mode == "direct"
+    finally:
+        clear_settings_cache()
+
+
+@pytest.mark.asyncio
+async def test_group_writer_coalesces_concurrent_writes(group_mode):
+    await ensure_schema()
+    async with get_session() as session:
+        await session.execute(text("INSERT INTO projects (slug, human_key, created_at) VALUES ('gc', '/gc', '2025-01-01')"))
+        await session.commit()
+
+    async def _touch(idx: int):
+        async def _job(session):
+            await session.execute(
+                text("UPDATE projects SET human_key = :hk WHERE slug = 'gc'"),
+                {"hk": f"/gc-{idx}"},
+            )
+            return idx
+
+        return await run_write(_job)
+
+    results = await asyncio.gather(*(_touch(i) for i in range(10)))
+    assert results == list(range(10))
+    writer = get_group_writer()
+    assert writer is not None
+    stats = writer.stats()
+    assert stats["jobs_committed"] == 10
+    assert stats["batches_committed"] < 10
+    await shutdown_group_writer()
+    assert get_group_writer() is None
+
+
+@pytest.mark.asyncio
+async def test_group_writer_commits_batch_in_one_transaction(group_mode):
+    await ensure_schema()
+    db_path = get_database_path()
+    assert db_path is not None
+
+    def _committed_projects() -> int:
+        with closing(sqlite3.connect(db_path)) as conn:
+            return int(conn.execute("SELECT COUNT(*) FROM projects").fetchone()[0])
+
+    async def _insert(session):
+        await session.execute(
+            text("INSERT INTO projects (slug, human_key, created_at) VALUES ('one', '/one', '2025-01-01')")
+        )
+        return "inserted"
+
+    async def _observe(session):
+        # Runs after _insert's SAVEPOINT was released; an independent reader must not see it yet.
+        return _committed_projects()
+
+    results = await asyncio.gather(run_write(_insert), run_write(_observe))
+    assert results == ["inserted", 0]
+    assert _committed_projects() == 1
+    writer = get_group_writer()
+    assert writer is not None
+    assert writer.stats()["batches_committed"] == 1
+    await shutdown_group_writer()
+
+
+@pytest.mark.asyncio
+async def test_group_writer_isolates_failing_job(group_mode):
+    await ensure_schema()
+
+    async def _ok(session):
+        await session.execute(
+            text("INSERT INTO projects (slug, human_key, created_at) VALUES ('ok', '/ok', '2025-01-01')")
+        )
+        return "ok"
+
+    async def _bad(session):
+        await session.execute(
+            text("INSERT INTO projects (slug, human_key, created_at) VALUES ('bad', '/bad', '2025-01-01')")
+        )
+        raise ValueError("boom")
+
+    results = await asyncio.gather(run_write(_ok), run_write(_bad), return_exceptions=True)
+    assert results[0] == "ok"
+    assert isinstance(results[1], ValueError)
+    async with get_session() as session:
+        slugs = {row[0] for row in (await session.execute(text("SELECT slug FROM projects"))).all()}
+    assert slugs == {"ok"}
+    await shutdown_group_writer()
+
+
+@pytest.mark.asyncio
+async def test_send_and_ack_through_group_writer(group_mode):
+    server = build_mcp_server()
+    async with Client(server) as client:
+        await client.call_tool("ensure_project", {"human_key": "/group-commit"})
+        names = []
+        for _ in range(3):
+            res = await client.call_tool(
+                "register_agent",
+                {"project_key": "/group-commit", "program": "x", "model": "y"},
+            )
+            names.append(res.data["name"])
+        sender, *recipients = names
+        sends = [
+            client.call_tool(
+                "send_message",
+                {
+                    "project_key": "/group-commit",
+                    "sender_name": sender,
+                    "to": recipients,
+                    "subject": f"batch {i}",
+                    "body_md": "hello",
+                    "ack_required": True,
+                },
+            )
+            for i in range(4)
+        ]
+        await asyncio.gather(*sends)
+        inbox = await client.call_tool(
+            "fetch_inbox",
+            {"project_key": "/group-commit", "agent_name": recipients[0], "limit": 10},
+        )
+        items = inbox.structured_content["result"]
+        assert len(items) == 4
+        ack = await client.call_tool(
+            "acknowledge_message",
+            {"project_key": "/group-commit", "agent_name": recipients[0], "message_id": items[0]["id"]},
+        )
+        assert ack.data["acknowledged"] is True
+    await shutdown_group_writer()
@@ -0,0 +1,97 @@
+"""Tests for the denormalized inbox_entries index backing inbox listings."""
+
+from __future__ import annotations
+
+import pytest
+from fastmcp import Client
+from sqlalchemy import text
+
+from mcp_agent_mail.app import build_mcp_server
+from mcp_agent_mail.db import ensure_schema, get_session, rebuild_inbox_entries, reset_database_state
+
+
+MESSAGES = [
+    {"subject": f"msg {idx}", "body_md": f"body {idx}", "importance": importance}
+    for idx, importance in enumerate(["normal", "urgent", "high"])
+]
+
+
+@pytest.mark.asyncio
+async def test_inbox_entries_track_recipient_rows(isolated_env, seed_mailbox):
+    server = build_mcp_server()
+    async with Client(server) as client:
+        sender, recipient = await seed_mailbox(client, "/inbox-index", MESSAGES)
+        async with get_session() as session:
+            rows = (
+                await session.execute(
+                    text("SELECT subject, sender_name, kind, read_ts FROM inbox_entries ORDER BY message_id")
+                )
+            ).all()
+        assert [(r[0], r[1], r[2], r[3]) for r in rows] == [
+            ("msg 0", sender, "to", None),
+            ("msg 1", sender, "to", None),
+            ("msg 2", sender, "to", None),
+        ]
+
+        inbox = await client.call_tool(
+            "fetch_inbox",
+            {"project_key": "/inbox-index", "agent_name": recipient, "include_bodies": True},
+        )
+        items = inbox.structured_content["result"]
+        assert [item["subject"] for item in items] == ["msg 2", "msg 1", "msg 0"]
+        assert items[0]["from"] == sender
+        assert items[0]["body_md"] == "body 2"
+        assert items[0]["attachments"] == []
+
+        await client.call_tool(
+            "mark_message_read",
+            {"project_key": "/inbox-index", "agent_name": recipient, "message_id": items[0]["id"]},
+        )
+        urgent = await client.read_resource(f"resource://views/urgent-unread/{recipient}?project=inbox-index")
+        payload = urgent[0].text
+        assert "msg 1" in payload
+        assert "msg 2" not in payload
+
+
+@pytest.mark.asyncio
+async def test_inbox_entries_backfilled_for_existing_databases(isolated_env, seed_mailbox):
+    server = build_mcp_server()
+    async with Client(server) as client:
+        await seed_mailbox(client, "/inbox-index", MESSAGES)
+
+    async with get_session() as session:
+        await session.execute(text("DELETE FROM inbox_entries"))
+        await session.commit()
+    reset_database_state()
+    await ensure_schema()
+
+    async with get_session() as session:
+        count = (await session.execute(text("SELECT COUNT(*) FROM inbox_entries"))).scalar()
+    assert count == 3
+    assert await rebuild_inbox_entries() == 3
+
+
+@pytest.mark.asyncio
+async def test_inbox_entries_follow_rekeyed_redated_and_renamed_rows(isolated_env, seed_mailbox):
+    server = build_mcp_server()
+    async with Client(server) as client:
+        sender, recipient = await seed_mailbox(client, "/inbox-index", MESSAGES)
+        await client.call_tool("ensure_project", {"human_key": "/inbox-adopted"})
+        # Same re-keying `projects adopt --apply` performs.
+        async with get_session() as session:
+            dst = (await session.execute(text("SELECT id FROM projects WHERE human_key = '/inbox-adopted'"))).scalar()
+            src = (await session.execute(text("SELECT id FROM projects WHERE human_key = '/inbox-index'"))).scalar()
+            for table in ("agents", "messages"):
+                await session.execute(
+                    text(f"UPDATE {table} SET project_id = :dst WHERE project_id = :src"), {"dst": dst, "src": src}
+                )
+            await session.execute(text("UPDATE agents SET name = 'RenamedSender' WHERE name = :name"), {"name": sender})
+            await session.execute(
+                text("UPDATE messages SET created_ts = '2024-01-01 00:00:00.000000' WHERE subject = 'msg 2'")
+            )
+            await session.commit()
+
+        inbox = await client.call_tool("fetch_inbox", {"project_key": "/inbox-adopted", "agent_name": recipient})
+        items = inbox.structured_content["result"]
+        assert [item["subject"] for item in items] == ["msg 1", "msg 0", "msg 2"]
+        assert {item["from"] for item in items} == {"RenamedSender"}
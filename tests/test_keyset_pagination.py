@@ -0,0 +1,93 @@
+"""Tests for opaque keyset cursors on inbox, outbox, search, and thread listings."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+from fastmcp import Client
+from fastmcp.exceptions import ToolError
+
+from mcp_agent_mail.app import build_mcp_server
+
+
+def _rollout(count: int) -> list[dict]:
+    return [{"subject": f"rollout step {idx}", "body_md": "rollout notes", "thread_id": "TKT-1"} for idx in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_fetch_inbox_and_search_walk_all_pages(isolated_env, seed_mailbox):
+    server = build_mcp_server()
+    async with Client(server) as client:
+        _, recipient = await seed_mailbox(client, "/paging", _rollout(5))
+
+        plain = await client.call_tool("fetch_inbox", {"project_key": "/paging", "agent_name": recipient, "limit": 2})
+        assert len(plain.structured_content["result"]) == 2
+        assert "next_cursor" not in plain.structured_content
+
+        seen: list[int] = []
+        cursor = ""
+        while cursor is not None:
+            page = await client.call_tool(
+                "fetch_inbox",
+                {"project_key": "/paging", "agent_name": recipient, "limit": 2, "cursor": cursor},
+            )
+            seen.extend(item["id"] for item in page.structured_content["result"])
+            cursor = page.structured_content["next_cursor"]
+        assert seen == sorted(seen, reverse=True)
+        assert len(set(seen)) == 5
+
+        found: list[int] = []
+        search_cursor = None
+        while True:
+            args = {"project_key": "/paging", "query": "rollout", "limit": 2}
+            if search_cursor:
+                args["cursor"] = search_cursor
+            res = await client.call_tool("search_messages", args)
+            found.extend(item["id"] for item in res.structured_content["result"])
+            search_cursor = res.structured_content["next_cursor"]
+            if search_cursor is None:
+                break
+        assert sorted(found) == sorted(seen)
+
+
+@pytest.mark.asyncio
+async def test_outbox_and_thread_resources_page(isolated_env, seed_mailbox):
+    server = build_mcp_server()
+    async with Client(server) as client:
+        sender, _ = await seed_mailbox(client, "/paging", _rollout(3))
+
+        outbox = json.loads((await client.read_resource(f"resource://outbox/{sender}?project=paging&limit=2"))[0].text)
+        assert outbox["count"] == 2
+        rest = json.loads(
+            (
+                await client.read_resource(
+                    f"resource://outbox/{sender}?project=paging&limit=2&cursor={outbox['next_cursor']}"
+                )
+            )[0].text
+        )
+        assert rest["count"] == 1
+        assert rest["next_cursor"] is None
+        assert {m["id"] for m in outbox["messages"]}.isdisjoint(m["id"] for m in rest["messages"])
+
+        first = json.loads((await client.read_resource("resource://thread/TKT-1?project=paging&limit=2"))[0].text)
+        assert [m["subject"] for m in first["messages"]] == ["rollout step 0", "rollout step 1"]
+        second = json.loads(
+            (await client.read_resource(f"resource://thread/TKT-1?project=paging&limit=2&cursor={first['next_cursor']}"))[
+                0
+            ].text
+        )
+        assert [m["subject"] for m in second["messages"]] == ["rollout step 2"]
+        assert second["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_invalid_cursor_is_rejected(isolated_env, seed_mailbox):
+    server = build_mcp_server()
+    async with Client(server) as client:
+        _, recipient = await seed_mailbox(client, "/paging", _rollout(1))
+        with pytest.raises(ToolError, match="cursor"):
+            await client.call_tool(
+                "fetch_inbox",
+                {"project_key": "/paging", "agent_name": recipient, "cursor": "not-a-cursor"},
+            )
@@ -0,0 +1,101 @@
+"""Tests for the trigger-maintained mailbox_counters table and resource://counts."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+from fastmcp import Client
+from sqlalchemy import text
+
+from mcp_agent_mail.app import build_mcp_server
+from mcp_agent_mail.db import ensure_schema, get_session, rebuild_mailbox_counters, reset_database_state
+
+
+async def _counts(client: Client, agent: str) -> dict:
+    blocks = await client.read_resource(f"resource://counts/{agent}?project=counters")
+    return json.loads(blocks[0].text)
+
+
+@pytest.mark.asyncio
+async def test_counts_follow_send_read_and_ack(isolated_env, seed_mailbox):
+    server = build_mcp_server()
+    async with Client(server) as client:
+        sender, recipient = await seed_mailbox(
+            client,
+            "/counters",
+            [
+                {"subject": f"{importance} note", "importance": importance, "ack_required": ack}
+                for importance, ack in [("normal", False), ("urgent", True), ("high", True)]
+            ],
+        )
+        counts = await _counts(client, recipient)
+        assert counts == {
+            "project": "/counters",
+            "agent": recipient,
+            "total": 3,
+            "unread": 3,
+            "urgent_unread": 2,
+            "ack_pending": 2,
+        }
+
+        inbox = await client.call_tool("fetch_inbox", {"project_key": "/counters", "agent_name": recipient})
+        urgent_id = next(item["id"] for item in inbox.structured_content["result"] if item["importance"] == "urgent")
+        await client.call_tool(
+            "acknowledge_message",
+            {"project_key": "/counters", "agent_name": recipient, "message_id": urgent_id},
+        )
+        counts = await _counts(client, recipient)
+        assert (counts["unread"], counts["urgent_unread"], counts["ack_pending"]) == (2, 1, 1)
+
+        view = await client.read_resource(f"resource://views/ack-required/{recipient}?project=counters&limit=1")
+        assert json.loads(view[0].text)["pending_total"] == 1
+
+        sender_counts = await _counts(client, sender)
+        assert sender_counts["total"] == 0
+
+
+@pytest.mark.asyncio
+async def test_counters_drop_with_deleted_recipients_and_rebuild(isolated_env, seed_mailbox):
+    server = build_mcp_server()
+    async with Client(server) as client:
+        await seed_mailbox(client, "/counters", [{"subject": "s", "body_md": "b"}])
+
+    async with get_session() as session:
+        await session.execute(text("DELETE FROM message_recipients"))
+        await session.commit()
+        row = (await session.execute(text("SELECT total, unread FROM mailbox_counters"))).one()
+        assert tuple(row) == (0, 0)
+        await session.execute(text("DELETE FROM mailbox_counters"))
+        await session.commit()
+
+    reset_database_state()
+    await ensure_schema()
+    assert await rebuild_mailbox_counters() == 0
+
+
+@pytest.mark.asyncio
+async def test_counters_move_with_rekeyed_messages(isolated_env, seed_mailbox):
+    server = build_mcp_server()
+    async with Client(server) as client:
+        _, recipient = await seed_mailbox(client, "/counters", [{"subject": "s", "importance": "urgent"}])
+        await client.call_tool("ensure_project", {"human_key": "/counters-adopted"})
+        async with get_session() as session:
+            dst = (await session.execute(text("SELECT id FROM projects WHERE human_key = '/counters-adopted'"))).scalar()
+            src = (await session.execute(text("SELECT id FROM projects WHERE human_key = '/counters'"))).scalar()
+            for table in ("agents", "messages"):
+                await session.execute(
+                    text(f"UPDATE {table} SET project_id = :dst WHERE project_id = :src"), {"dst": dst, "src": src}
+                )
+            await session.commit()
+            rows = (
+                await session.execute(
+                    text("SELECT project_id, total, unread, urgent_unread FROM mailbox_counters ORDER BY project_id")
+                )
+            ).all()
+        assert [tuple(row) for row in rows] == [(src, 0, 0, 0), (dst, 1, 1, 1)]
+
+        counts = json.loads(
+            (await client.read_resource(f"resource://counts/{recipient}?project=counters-adopted"))[0].text
+        )
+        assert (counts["total"], counts["unread"], counts["urgent_unread"]) == (1, 1, 1)
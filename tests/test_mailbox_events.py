@@ -0,0 +1,108 @@
+"""Tests for the mailbox_events log and the time-travel inbox built on it."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from datetime import datetime, timezone
+
+import pytest
+from fastmcp import Client
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+
+from mcp_agent_mail.app import build_mcp_server
+from mcp_agent_mail.config import get_settings
+from mcp_agent_mail.db import _setup_mailbox_events, get_engine, get_session
+from mcp_agent_mail.http import build_http_app
+
+
+async def _tick() -> str:
+    await asyncio.sleep(0.02)
+    stamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+    await asyncio.sleep(0.02)
+    return stamp
+
+
+async def _inbox_at(client: Client, agent: str, ts: str) -> dict:
+    blocks = await client.read_resource(f"resource://inbox-at/{agent}?project=events&ts={ts}")
+    return json.loads(blocks[0].text)
+
+
+async def _event_kinds() -> list[str]:
+    async with get_session() as session:
+        rows = await session.execute(text("SELECT kind FROM mailbox_events ORDER BY event_ts, id"))
+        return [row[0] for row in rows.all()]
+
+
+@pytest.mark.asyncio
+async def test_inbox_at_replays_read_ack_and_reservations(isolated_env, seed_mailbox):
+    async with Client(build_mcp_server()) as client:
+        before = await _tick()
+        _, recipient = await seed_mailbox(client, "/events", [{"subject": "first", "ack_required": True}])
+        sent = await _tick()
+        inbox = await client.call_tool("fetch_inbox", {"project_key": "/events", "agent_name": recipient})
+        message_id = inbox.structured_content["result"][0]["id"]
+        await client.call_tool(
+            "mark_message_read", {"project_key": "/events", "agent_name": recipient, "message_id": message_id}
+        )
+        read = await _tick()
+        await client.call_tool(
+            "acknowledge_message", {"project_key": "/events", "agent_name": recipient, "message_id": message_id}
+        )
+        await client.call_tool(
+            "file_reservation_paths", {"project_key": "/events", "agent_name": recipient, "paths": ["src/*.py"]}
+        )
+        held = await _tick()
+        await client.call_tool("release_file_reservations", {"project_key": "/events", "agent_name": recipient})
+        released = await _tick()
+
+        assert (await _inbox_at(client, recipient, before))["messages"] == []
+
+        at_sent = await _inbox_at(client, recipient, sent)
+        [item] = at_sent["messages"]
+        assert (item["id"], item["subject"], item["ack_required"]) == (message_id, "first", True)
+        assert item["read_ts"] is None and item["ack_ts"] is None
+        assert at_sent["file_reservations"] == []
+
+        [item] = (await _inbox_at(client, recipient, read))["messages"]
+        assert item["read_ts"] is not None and item["ack_ts"] is None
+
+        at_held = await _inbox_at(client, recipient, held)
+        assert at_held["messages"][0]["ack_ts"] is not None
+        assert [r["path_pattern"] for r in at_held["file_reservations"]] == ["src/*.py"]
+
+        assert (await _inbox_at(client, recipient, released))["file_reservations"] == []
+
+    assert await _event_kinds() == ["delivered", "read", "acked", "reservation_granted", "reservation_released"]
+
+    transport = ASGITransport(app=build_http_app(get_settings(), build_mcp_server()))
+    async with AsyncClient(transport=transport, base_url="http://test") as http:
+        resp = await http.get(
+            "/mail/archive/time-travel/snapshot",
+            params={"project": "events", "agent": recipient, "timestamp": read},
+        )
+    snapshot = resp.json()
+    assert snapshot["source"] == "events"
+    assert [(m["id"], m["subject"]) for m in snapshot["messages"]] == [(message_id, "first")]
+    assert snapshot["messages"][0]["read_ts"] is not None
+
+
+@pytest.mark.asyncio
+async def test_existing_state_is_backfilled(isolated_env, seed_mailbox):
+    async with Client(build_mcp_server()) as client:
+        _, recipient = await seed_mailbox(client, "/events", [{"subject": "old"}])
+        inbox = await client.call_tool("fetch_inbox", {"project_key": "/events", "agent_name": recipient})
+        message_id = inbox.structured_content["result"][0]["id"]
+        await client.call_tool(
+            "acknowledge_message", {"project_key": "/events", "agent_name": recipient, "message_id": message_id}
+        )
+
+        # Simulate a database that predates the event log.
+        async with get_engine().begin() as conn:
+            await conn.exec_driver_sql("DELETE FROM mailbox_events")
+            await conn.run_sync(_setup_mailbox_events)
+        assert sorted(await _event_kinds()) == ["acked", "delivered", "read"]
+
+        [item] = (await _inbox_at(client, recipient, await _tick()))["messages"]
+        assert item["id"] == message_id and item["ack_ts"] is not None
@@ -0,0 +1,69 @@
+"""Tests for stub inbox/outbox copies (STORAGE_MAILBOX_COPIES=stub)."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from mcp_agent_mail.config import clear_settings_cache, get_settings
+from mcp_agent_mail.storage import (
+    ensure_archive,
+    get_file_content,
+    get_historical_inbox_snapshot,
+    write_message_bundle,
+)
+
+MESSAGE = {
+    "id": 7,
+    "subject": "Broadcast",
+    "from": "BlueLake",
+    "importance": "high",
+    "thread_id": None,
+    "project": "stubs",
+    "created": "2025-01-01T00:00:00+00:00",
+}
+FILENAME = "2025-01-01T00-00-00Z__broadcast__7.md"
+
+
+@pytest.mark.asyncio
+async def test_stub_copies_point_at_canonical_message(isolated_env, monkeypatch):
+    monkeypatch.setenv("STORAGE_MAILBOX_COPIES", "stub")
+    clear_settings_cache()
+    archive = await ensure_archive(get_settings(), "stubs")
+    body = "payload " * 2000
+    recipients = ["RedStone", "GreenCastle", "PurpleBear"]
+
+    archived = await write_message_bundle(archive, dict(MESSAGE), body, "BlueLake", recipients)
+
+    canonical = archive.repo_root / archived.path
+    assert body.strip() in canonical.read_text()
+    inbox_rel = f"agents/RedStone/inbox/2025/01/{FILENAME}"
+    stub = (archive.root / inbox_rel).read_text()
+    assert "payload" not in stub
+    meta = json.loads(stub[len("---json\n") : stub.index("\n---\n")])
+    assert meta["canonical"] == f"messages/2025/01/{FILENAME}"
+    assert meta["subject"] == "Broadcast"
+    link = stub.rsplit("(", 1)[1].rstrip(")\n")
+    assert ((archive.root / inbox_rel).parent / link).resolve() == canonical.resolve()
+    for name in recipients:
+        assert (archive.root / f"agents/{name}/inbox/2025/01/{FILENAME}").read_text() == stub
+    assert (archive.root / f"agents/BlueLake/outbox/2025/01/{FILENAME}").read_text() == stub
+
+    # Readers see the full message through the stub.
+    assert await get_file_content(archive, inbox_rel) == canonical.read_text()
+    snapshot = await get_historical_inbox_snapshot(archive, "RedStone", "2100-01-01T00:00:00")
+    assert [(m["id"], m["subject"], m["from"], m["importance"]) for m in snapshot["messages"]] == [
+        ("7", "Broadcast", "BlueLake", "high")
+    ]
+
+
+@pytest.mark.asyncio
+async def test_full_copies_remain_the_default(isolated_env):
+    archive = await ensure_archive(get_settings(), "stubs")
+
+    await write_message_bundle(archive, dict(MESSAGE), "full body", "BlueLake", ["RedStone"])
+
+    inbox = (archive.root / f"agents/RedStone/inbox/2025/01/{FILENAME}").read_text()
+    assert inbox.endswith("full body\n")
+    assert "canonical" not in inbox
@@ -0,0 +1,78 @@
+"""Tests for the message -> archive path/commit index (message_archive_refs)."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+from fastmcp import Client
+from sqlalchemy import text
+from typer.testing import CliRunner
+
+from mcp_agent_mail import app as app_module
+from mcp_agent_mail.app import build_mcp_server
+from mcp_agent_mail.cli import app as cli_app
+from mcp_agent_mail.config import get_settings
+from mcp_agent_mail.db import get_message_archive_ref, get_session
+from mcp_agent_mail.storage import ensure_archive, get_message_commit_sha
+
+
+async def _refs() -> dict[int, tuple[str, str | None]]:
+    async with get_session() as session:
+        rows = await session.execute(text("SELECT message_id, path, commit_sha FROM message_archive_refs"))
+        return {int(row[0]): (row[1], row[2]) for row in rows.all()}
+
+
+@pytest.mark.asyncio
+async def test_send_records_path_and_commit(isolated_env, seed_mailbox):
+    async with Client(build_mcp_server()) as client:
+        await seed_mailbox(client, "/refs", [{"subject": "first"}, {"subject": "second"}])
+
+    refs = await _refs()
+    assert len(refs) == 2
+    archive = await ensure_archive(get_settings(), "refs")
+    for message_id, (path, sha) in refs.items():
+        assert path.startswith("projects/refs/messages/") and path.endswith(f"__{message_id}.md")
+        assert (archive.repo_root / path).is_file()
+        # Same answer as the directory scan + history walk it replaces.
+        assert sha == await get_message_commit_sha(archive, message_id)
+
+
+@pytest.mark.asyncio
+async def test_commit_info_uses_index_and_backfills(isolated_env, seed_mailbox, monkeypatch):
+    async with Client(build_mcp_server()) as client:
+        await seed_mailbox(client, "/refs", [{"subject": "indexed"}])
+        [(message_id, (_, sha))] = (await _refs()).items()
+        async with get_session() as session:
+            await session.execute(text("DELETE FROM message_archive_refs"))
+            await session.commit()
+
+        # Un-indexed messages fall back to the scan once and get recorded.
+        project = await app_module._get_project_by_identifier("/refs")
+        message = await app_module._get_message(project, message_id)
+        info = await app_module._commit_info_for_message(get_settings(), project, message)
+        assert info is not None and sha is not None and info["hexsha"] == sha[:12]
+        assert await get_message_archive_ref(message_id) == ((await _refs())[message_id])
+
+        # Indexed lookups never touch the month-directory scan.
+        monkeypatch.setattr(app_module, "_canonical_relpath_for_message", lambda *a: pytest.fail("scanned"))
+        assert (await app_module._commit_info_for_message(get_settings(), project, message))["hexsha"] == sha[:12]
+
+
+def test_rebuild_refs_cli_reindexes_archive(isolated_env, seed_mailbox):
+    async def _seed() -> dict[int, tuple[str, str | None]]:
+        async with Client(build_mcp_server()) as client:
+            await seed_mailbox(client, "/refs", [{"subject": "one"}, {"subject": "two"}])
+        before = await _refs()
+        async with get_session() as session:
+            await session.execute(text("DELETE FROM message_archive_refs"))
+            await session.commit()
+        return before
+
+    before = asyncio.run(_seed())
+
+    result = CliRunner().invoke(cli_app, ["archive", "rebuild-refs", "--json"])
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.output) == {"refs": {"messages": 2, "uncommitted": 0}}
+    assert asyncio.run(_refs()) == before
@@ -0,0 +1,82 @@
+"""Tests for the stored messages.preview/body_len columns used by body-less listings."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+from fastmcp import Client
+from sqlalchemy import text
+
+from mcp_agent_mail.app import build_mcp_server
+from mcp_agent_mail.db import MESSAGE_PREVIEW_CHARS, ensure_schema, get_session, reset_database_state
+
+BODY = "line one\nline two " + "x" * 400
+
+
+@pytest.mark.asyncio
+async def test_listings_without_bodies_return_preview(isolated_env, seed_mailbox):
+    server = build_mcp_server()
+    async with Client(server) as client:
+        sender, recipient = await seed_mailbox(
+            client, "/previews", [{"subject": "logs", "body_md": BODY, "ack_required": True}]
+        )
+
+        inbox = await client.call_tool("fetch_inbox", {"project_key": "/previews", "agent_name": recipient})
+        item = inbox.structured_content["result"][0]
+        assert "body_md" not in item
+        assert item["preview"] == BODY.replace("\n", " ")[:MESSAGE_PREVIEW_CHARS]
+        assert item["body_len"] == len(BODY)
+
+        outbox = json.loads((await client.read_resource(f"resource://outbox/{sender}?project=previews"))[0].text)
+        assert outbox["messages"][0]["body_len"] == len(BODY)
+        view = json.loads(
+            (await client.read_resource(f"resource://views/ack-required/{recipient}?project=previews"))[0].text
+        )
+        assert view["messages"][0]["preview"].startswith("line one line two")
+
+        full = await client.call_tool(
+            "fetch_inbox", {"project_key": "/previews", "agent_name": recipient, "include_bodies": True}
+        )
+        assert full.structured_content["result"][0]["body_md"] == BODY
+
+
+@pytest.mark.asyncio
+async def test_preview_columns_backfilled_and_follow_body_updates(isolated_env):
+    await ensure_schema()
+    async with get_session() as session:
+        await session.execute(text("INSERT INTO projects (slug, human_key, created_at) VALUES ('p', '/p', '2025-01-01')"))
+        await session.execute(
+            text(
+                "INSERT INTO agents (project_id, name, program, model, task_description, inception_ts, last_active_ts, "
+                "attachments_policy, contact_policy) VALUES (1, 'BlueLake', 'x', 'y', '', '2025-01-01', '2025-01-01', "
+                "'auto', 'auto')"
+            )
+        )
+        await session.execute(
+            text(
+                "INSERT INTO messages (project_id, sender_id, subject, body_md, importance, ack_required, created_ts, "
+                "attachments) VALUES (1, 1, 's', 'raw\nbody', 'normal', 0, '2025-01-01', '[]')"
+            )
+        )
+        await session.commit()
+        row = (await session.execute(text("SELECT preview, body_len FROM messages"))).one()
+        assert tuple(row) == ("raw body", 8)
+
+        await session.execute(text("UPDATE messages SET body_md = '[redacted]'"))
+        await session.commit()
+        row = (await session.execute(text("SELECT preview, body_len FROM messages"))).one()
+        assert tuple(row) == ("[redacted]", 10)
+
+        # Simulate a database created before the columns existed.
+        await session.execute(text("DROP TRIGGER messages_preview_ai"))
+        await session.execute(text("DROP TRIGGER messages_preview_au"))
+        await session.execute(text("ALTER TABLE messages DROP COLUMN preview"))
+        await session.execute(text("ALTER TABLE messages DROP COLUMN body_len"))
+        await session.commit()
+
+    reset_database_state()
+    await ensure_schema()
+    async with get_session() as session:
+        row = (await session.execute(text("SELECT preview, body_len FROM messages"))).one()
+    assert tuple(row) == ("[redacted]", 10)
@@ -1,4 +1,4 @@
-from mcp_agent_mail.app import _compile_pathspec, _patterns_overlap
+from mcp_agent_mail.app import _file_reservations_patterns_overlap, _glob_automata_intersect, _patterns_overlap
 
 
 def test_overlap_basic_globs() -> None:
@@ -18,13 +18,33 @@ def test_overlap_cross_match() -> None:
     assert not _patterns_overlap("assets/*.png", "assets/logo.jpg")
 
 
-def test_pathspec_cache_hit_ratio_after_warmup() -> None:
-    _compile_pathspec.cache_clear()
+def test_overlap_between_two_globs() -> None:
+    # Neither pattern matches the other's text, but both cover src/core/api.py.
+    assert _patterns_overlap("src/*/api.py", "src/core/*.py")
+    assert _patterns_overlap("**/fixtures/*.json", "tests/*/data.json")
+    assert _patterns_overlap("src/[a-c]*.py", "src/b?.py")
+    assert not _patterns_overlap("src/[a-c]*.py", "src/[!a-c]*.py")
+    assert not _patterns_overlap("src/*/api.py", "src/core/*.js")
+    assert not _patterns_overlap("lib/**/*.py", "src/**/*.py")
+
+
+def test_overlap_gitwildmatch_anchoring() -> None:
+    # Patterns without an inner slash float to any depth; directory matches cover their contents.
+    assert _patterns_overlap("*.md", "docs/guide/intro.md")
+    assert _patterns_overlap("build/", "pkg/build/out.o")
+    assert _patterns_overlap("src", "src/app.py")
+    assert not _patterns_overlap("src/*.md", "docs/*.md")
+    assert not _patterns_overlap("!src/app.py", "src/app.py")
+    assert _file_reservations_patterns_overlap(["docs/**", "src/*/api.py"], ["src/core/*.py"])
+
+
+def test_overlap_cache_hit_ratio_after_warmup() -> None:
+    _glob_automata_intersect.cache_clear()
     for _ in range(20):
         assert _patterns_overlap("src/**", "src/file.txt")
         assert _patterns_overlap("docs/**", "docs/readme.md")
         assert _patterns_overlap("assets/*.png", "assets/logo.png")
-    info = _compile_pathspec.cache_info()
+    info = _glob_automata_intersect.cache_info()
     total = info.hits + info.misses
     assert total > 0
     ratio = info.hits / total
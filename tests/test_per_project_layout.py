@@ -0,0 +1,128 @@
+"""Tests for the per-project archive layout (STORAGE_LAYOUT=per-project) and its migration."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+from fastmcp import Client
+from git import Repo
+from httpx import ASGITransport, AsyncClient
+from typer.testing import CliRunner
+
+from mcp_agent_mail.app import build_mcp_server
+from mcp_agent_mail.cli import app as cli_app
+from mcp_agent_mail.config import clear_settings_cache, get_settings
+from mcp_agent_mail.http import build_http_app
+from mcp_agent_mail.storage import (
+    archive_repo_roots,
+    create_diagnostic_backup,
+    ensure_archive,
+    get_archive_tree,
+    get_recent_commits,
+    restore_from_backup,
+)
+
+
+def _storage_root() -> Path:
+    return Path(get_settings().storage.root).expanduser().resolve()
+
+
+def _messages(repo_root: Path) -> list[str]:
+    repo = Repo(str(repo_root))
+    try:
+        return [str(commit.message) for commit in repo.iter_commits()]
+    finally:
+        repo.close()
+
+
+@pytest.mark.asyncio
+async def test_projects_get_their_own_repos(isolated_env, monkeypatch, seed_mailbox):
+    monkeypatch.setenv("STORAGE_LAYOUT", "per-project")
+    clear_settings_cache()
+    async with Client(build_mcp_server()) as client:
+        await seed_mailbox(client, "/alpha", [{"subject": "to alpha"}])
+        await seed_mailbox(client, "/beta", [{"subject": "to beta"}])
+
+    root = _storage_root()
+    assert not (root / ".git").exists()
+    assert archive_repo_roots(get_settings()) == [root / "repos" / "alpha", root / "repos" / "beta"]
+    alpha = _messages(root / "repos" / "alpha")
+    assert any("to alpha" in subject for subject in alpha)
+    assert not any("to beta" in subject for subject in alpha)
+
+    archive = await ensure_archive(get_settings(), "beta")
+    assert archive.repo_root == root / "repos" / "beta"
+    assert [entry["name"] for entry in await get_archive_tree(archive)] == ["agents", "messages"]
+    commits = await get_recent_commits(archive.repo, project_slug="beta")
+    assert "to beta" in commits[0]["body"]
+
+    transport = ASGITransport(app=build_http_app(get_settings(), build_mcp_server()))
+    async with AsyncClient(transport=transport, base_url="http://test") as http:
+        activity = await http.get("/mail/archive/activity")
+        assert "to alpha" in activity.text and "to beta" in activity.text
+        detail = await http.get(f"/mail/archive/commit/{commits[0]['sha']}")
+        assert commits[0]["sha"] in detail.text
+        timeline = await http.get("/mail/archive/timeline", params={"project": "alpha"})
+        assert timeline.status_code == 200 and "Archive repository not found" not in timeline.text
+
+
+@pytest.mark.asyncio
+async def test_backup_bundles_each_project_repo(isolated_env, monkeypatch, seed_mailbox):
+    monkeypatch.setenv("STORAGE_LAYOUT", "per-project")
+    clear_settings_cache()
+    async with Client(build_mcp_server()) as client:
+        await seed_mailbox(client, "/alpha", [{"subject": "kept"}])
+        await seed_mailbox(client, "/beta", [{"subject": "other"}])
+
+    settings = get_settings()
+    backup = await create_diagnostic_backup(settings, reason="test")
+    manifest = json.loads((backup / "manifest.json").read_text())
+    assert manifest["layout"] == "per-project"
+    assert sorted(Path(p).name for p in manifest["project_bundles"]) == ["alpha.bundle", "beta.bundle"]
+
+    result = await restore_from_backup(settings, backup, target_project="alpha")
+    assert [Path(p).name for p in result["bundles_restored"]] == ["alpha.bundle"]
+    assert any("kept" in subject for subject in _messages(_storage_root() / "repos" / "alpha"))
+
+
+def test_split_projects_migrates_shared_archive(isolated_env, monkeypatch, seed_mailbox):
+    async def _seed() -> None:
+        async with Client(build_mcp_server()) as client:
+            await seed_mailbox(client, "/alpha", [{"subject": "old alpha"}])
+            await seed_mailbox(client, "/beta", [{"subject": "old beta"}])
+
+    asyncio.run(_seed())
+    root = _storage_root()
+    shared_head = Repo(str(root)).head.commit.hexsha
+
+    result = CliRunner().invoke(cli_app, ["archive", "split-projects", "--json"])
+    assert result.exit_code == 0, result.output
+    summary = json.loads(result.output)
+    assert [entry["slug"] for entry in summary["split"]] == ["alpha", "beta"]
+    assert summary["errors"] == {}
+
+    alpha_root = root / "repos" / "alpha"
+    alpha = _messages(alpha_root)
+    assert alpha[-1].startswith("chore: initialize archive")
+    assert any("old alpha" in subject for subject in alpha)
+    assert not any("old beta" in subject for subject in alpha)
+    assert not Repo(str(alpha_root)).is_dirty(untracked_files=True)
+    assert Repo(str(root)).head.commit.hexsha == shared_head
+
+    # Re-running skips projects that already have their own repo.
+    again = json.loads(CliRunner().invoke(cli_app, ["archive", "split-projects", "--json"]).output)
+    assert again["skipped"] == ["alpha", "beta"]
+
+    monkeypatch.setenv("STORAGE_LAYOUT", "per-project")
+    clear_settings_cache()
+
+    async def _send_after_split() -> None:
+        async with Client(build_mcp_server()) as client:
+            await seed_mailbox(client, "/alpha", [{"subject": "new alpha"}])
+
+    asyncio.run(_send_after_split())
+    assert any("new alpha" in subject for subject in _messages(alpha_root))
+    assert Repo(str(root)).head.commit.hexsha == shared_head
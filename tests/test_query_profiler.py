@@ -0,0 +1,58 @@
+"""Tests for the process-wide statement profiler and resource://tooling/queries."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+from fastmcp import Client
+from sqlalchemy import text
+
+from mcp_agent_mail.app import build_mcp_server
+from mcp_agent_mail.config import clear_settings_cache
+from mcp_agent_mail.db import QueryProfiler, fingerprint_statement, get_session, reset_database_state
+
+
+def test_fingerprint_strips_literals_and_in_lists():
+    a = fingerprint_statement("SELECT * FROM messages WHERE id IN (?, ?, ?) AND subject = 'x'  LIMIT 10")
+    b = fingerprint_statement("SELECT * FROM messages WHERE id IN (?) AND subject = 'it''s' LIMIT 500")
+    assert a == b == "SELECT * FROM messages WHERE id IN (?) AND subject = ? LIMIT ?"
+
+
+def test_profiler_aggregates_percentiles_and_explains_once():
+    profiler = QueryProfiler(slow_query_ms=5.0)
+    calls: list[int] = []
+
+    def explain() -> list[str]:
+        calls.append(1)
+        return ["SCAN messages"]
+
+    for duration in range(1, 21):
+        profiler.record(f"SELECT * FROM messages WHERE id = {duration}", float(duration), explain)
+    (stats,) = profiler.snapshot()["statements"]
+    assert stats["count"] == 20
+    assert stats["total_ms"] == 210.0
+    assert (stats["p50_ms"], stats["p95_ms"], stats["max_ms"]) == (10.0, 19.0, 20.0)
+    assert stats["explain"] == ["SCAN messages"]
+    assert stats["full_scan"] is True
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_tooling_queries_resource_reports_statements(isolated_env, monkeypatch):
+    monkeypatch.setenv("INSTRUMENTATION_ENABLED", "true")
+    monkeypatch.setenv("INSTRUMENTATION_SLOW_QUERY_MS", "0")
+    clear_settings_cache()
+    reset_database_state()
+    server = build_mcp_server()
+    async with Client(server) as client:
+        await client.call_tool("ensure_project", {"human_key": "/profiled"})
+        async with get_session() as session:
+            await session.execute(text("SELECT COUNT(*) FROM messages WHERE body_len > 3"))
+        blocks = await client.read_resource("resource://tooling/queries")
+    payload = json.loads(blocks[0].text)
+    assert payload["enabled"] is True
+    scan = next(s for s in payload["statements"] if s["fingerprint"].startswith("SELECT COUNT(*) FROM messages"))
+    assert scan["count"] == 1
+    assert scan["full_scan"] is True
+    assert any("messages" in step for step in scan["explain"])
@@ -0,0 +1,64 @@
+"""Tests for the dedicated read-only SQLite engine (DATABASE_READ_ENGINE_ENABLED)."""
+
+from __future__ import annotations
+
+import pytest
+from fastmcp import Client
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from mcp_agent_mail.app import build_mcp_server
+from mcp_agent_mail.config import clear_settings_cache
+from mcp_agent_mail.db import ensure_schema, get_engine, get_read_engine, get_session
+
+
+@pytest.fixture
+def read_engine_env(isolated_env, monkeypatch):
+    monkeypatch.setenv("DATABASE_READ_ENGINE_ENABLED", "true")
+    monkeypatch.setenv("DATABASE_READ_POOL_SIZE", "3")
+    clear_settings_cache()
+    yield
+    clear_settings_cache()
+
+
+@pytest.mark.asyncio
+async def test_read_engine_disabled_by_default(isolated_env):
+    await ensure_schema()
+    assert get_read_engine() is None
+    async with get_session(readonly=True) as session:
+        assert session.bind is get_engine()
+
+
+@pytest.mark.asyncio
+async def test_readonly_session_uses_query_only_engine(read_engine_env):
+    await ensure_schema()
+    read_engine = get_read_engine()
+    assert read_engine is not None
+    assert read_engine is not get_engine()
+    async with get_session(readonly=True) as session:
+        assert (await session.execute(text("PRAGMA query_only"))).scalar() == 1
+        with pytest.raises(OperationalError):
+            await session.execute(
+                text("INSERT INTO projects (slug, human_key, created_at) VALUES ('x', '/x', '2025-01-01')")
+            )
+    async with get_session() as session:
+        assert (await session.execute(text("PRAGMA query_only"))).scalar() == 0
+
+
+@pytest.mark.asyncio
+async def test_read_tools_see_committed_writes(read_engine_env, seed_mailbox):
+    server = build_mcp_server()
+    async with Client(server) as client:
+        _, recipient = await seed_mailbox(
+            client, "/read-engine", [{"subject": "routing check", "body_md": "served by the reader pool"}]
+        )
+        inbox = await client.call_tool(
+            "fetch_inbox",
+            {"project_key": "/read-engine", "agent_name": recipient},
+        )
+        assert [item["subject"] for item in inbox.structured_content["result"]] == ["routing check"]
+        search = await client.call_tool(
+            "search_messages",
+            {"project_key": "/read-engine", "query": "routing"},
+        )
+        assert len(search.structured_content["result"]) == 1
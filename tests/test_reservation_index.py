@@ -0,0 +1,112 @@
+"""Tests for the per-project reservation prefix index used by conflict checks."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastmcp import Client
+from sqlalchemy import text
+
+from mcp_agent_mail.app import (
+    _file_reservations_conflict,
+    _reservation_index,
+    _reservation_literal_prefix,
+    _ReservationIndex,
+    build_mcp_server,
+)
+from mcp_agent_mail.db import get_session
+from mcp_agent_mail.models import Agent, FileReservation
+
+PATTERNS = [
+    "src/app.py",
+    "src/api/*.py",
+    "src/api/v1/**",
+    "docs/",
+    "*.md",
+    "**/fixtures/*.json",
+    "/src/api/handlers.py",
+    "agents/BlueLake/inbox/2025/01/*.md",
+    "src/[ab]*/x.py",
+]
+CANDIDATES = [
+    "src/app.py",
+    "src/api/routes.py",
+    "src/api/v1/users/views.py",
+    "docs/readme.txt",
+    "web/docs/index.html",
+    "README.md",
+    "tests/fixtures/data.json",
+    "./src/api/handlers.py",
+    "agents/BlueLake/inbox/2025/01/*.md",
+    "src/a1/x.py",
+    "lib/other.py",
+    "src/*/x.py",
+    "src/api/v1/*",
+]
+
+
+def test_prefixes_follow_gitwildmatch_anchoring():
+    assert _reservation_literal_prefix("src/api/v1/**") == ("src", "api", "v1")
+    assert _reservation_literal_prefix("/src/app.py") == ("src", "app.py")
+    assert _reservation_literal_prefix("src/[ab]*/x.py") == ("src",)
+    # Patterns without an inner slash float to any depth.
+    assert _reservation_literal_prefix("docs/") == ()
+    assert _reservation_literal_prefix("*.md") == ()
+
+
+def test_index_finds_exactly_the_brute_force_conflicts():
+    expires = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(hours=1)
+    holder = Agent(id=1, project_id=1, name="BlueLake", program="x", model="y")
+    requester = Agent(id=2, project_id=1, name="RedStone", program="x", model="y")
+    reservations = [
+        FileReservation(id=i, project_id=1, agent_id=1, path_pattern=p, exclusive=True, expires_ts=expires)
+        for i, p in enumerate(PATTERNS)
+    ]
+    index = _ReservationIndex(0, [(r, holder.name) for r in reservations])
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    for candidate in CANDIDATES:
+        expected = [r.path_pattern for r in reservations if _file_reservations_conflict(r, candidate, True, requester)]
+        found = [r.path_pattern for r, _ in index.conflicts(candidate, True, requester, now=now)]
+        assert sorted(found) == sorted(expected), candidate
+        # Anchored candidates only visit the buckets their literal prefix can reach.
+        if _reservation_literal_prefix(candidate):
+            assert len(list(index.candidates(candidate))) < len(reservations)
+    assert index.conflicts("lib/other.py", True, requester, now=now) == []
+
+
+@pytest.mark.asyncio
+async def test_index_tracks_writes_from_any_path(isolated_env):
+    async with Client(build_mcp_server()) as client:
+        await client.call_tool("ensure_project", {"human_key": "/idx"})
+        names = []
+        for _ in range(2):
+            res = await client.call_tool("register_agent", {"project_key": "/idx", "program": "x", "model": "y"})
+            names.append(res.data["name"])
+        holder, other = names
+
+        await client.call_tool(
+            "file_reservation_paths", {"project_key": "/idx", "agent_name": holder, "paths": ["src/api/*.py"]}
+        )
+        async with get_session() as session:
+            project_id = (await session.execute(text("SELECT id FROM projects WHERE slug = 'idx'"))).scalar_one()
+        index = await _reservation_index(project_id)
+        assert index.size == 1
+
+        res = await client.call_tool(
+            "file_reservation_paths", {"project_key": "/idx", "agent_name": other, "paths": ["src/api/routes.py"]}
+        )
+        assert [c["path"] for c in res.data["conflicts"]] == ["src/api/routes.py"]
+        # Our own grant was folded into the cached index rather than forcing a rebuild.
+        assert await _reservation_index(project_id) is index and index.size == 2
+
+        # A release made outside this code path (e.g. the CLI) invalidates the index.
+        async with get_session() as session:
+            await session.execute(text("UPDATE file_reservations SET released_ts = CURRENT_TIMESTAMP"))
+            await session.commit()
+        fresh = await _reservation_index(project_id)
+        assert fresh is not index and fresh.size == 0
+        res = await client.call_tool(
+            "file_reservation_paths", {"project_key": "/idx", "agent_name": other, "paths": ["src/api/views.py"]}
+        )
+        assert res.data["conflicts"] == []
@@ -0,0 +1,97 @@
+"""Tests for the lifespan sweeper that releases expired and stale file reservations."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from fastmcp import Client
+from sqlalchemy import text
+
+from mcp_agent_mail import app as app_module
+from mcp_agent_mail.app import build_mcp_server
+from mcp_agent_mail.config import get_settings
+from mcp_agent_mail.db import get_session
+from mcp_agent_mail.storage import ensure_archive
+
+
+async def _released() -> dict[str, bool]:
+    async with get_session() as session:
+        rows = await session.execute(text("SELECT path_pattern, released_ts IS NOT NULL FROM file_reservations"))
+        return {row[0]: bool(row[1]) for row in rows.all()}
+
+
+async def _register(client: Client, project_key: str, count: int) -> list[str]:
+    await client.call_tool("ensure_project", {"human_key": project_key})
+    names = []
+    for _ in range(count):
+        res = await client.call_tool("register_agent", {"project_key": project_key, "program": "x", "model": "y"})
+        names.append(res.data["name"])
+    return names
+
+
+@pytest.mark.asyncio
+async def test_request_paths_leave_expiry_to_the_sweeper(isolated_env, monkeypatch):
+    calls: list[int] = []
+    real_expire = app_module._expire_stale_file_reservations
+
+    async def _counting(project_id, **kwargs):
+        calls.append(project_id)
+        return await real_expire(project_id, **kwargs)
+
+    monkeypatch.setattr(app_module, "_expire_stale_file_reservations", _counting)
+    async with Client(build_mcp_server()) as client:
+        holder, other = await _register(client, "/sweep", 2)
+        await client.call_tool(
+            "file_reservation_paths",
+            {"project_key": "/sweep", "agent_name": holder, "paths": ["src/*.py"], "ttl_seconds": 1},
+        )
+        await client.call_tool(
+            "send_message",
+            {"project_key": "/sweep", "sender_name": other, "to": [holder], "subject": "hi", "body_md": "x"},
+        )
+        assert calls == []
+
+        # The grant was pushed onto the sweeper's heap, so it is released right after it lapses.
+        for _ in range(100):
+            if (await _released())["src/*.py"]:
+                break
+            await asyncio.sleep(0.05)
+        assert await _released() == {"src/*.py": True}
+        assert calls
+
+        res = await client.call_tool(
+            "file_reservation_paths", {"project_key": "/sweep", "agent_name": other, "paths": ["src/app.py"]}
+        )
+        assert res.data["conflicts"] == []
+
+
+@pytest.mark.asyncio
+async def test_sweep_batches_releases_into_one_commit(isolated_env):
+    async with Client(build_mcp_server()) as client:
+        [holder] = await _register(client, "/sweep", 1)
+        await client.call_tool(
+            "file_reservation_paths",
+            {"project_key": "/sweep", "agent_name": holder, "paths": ["a/*.py", "b/*.py", "c/*.py"]},
+        )
+        async with get_session() as session:
+            project_id = (await session.execute(text("SELECT id FROM projects WHERE slug = 'sweep'"))).scalar_one()
+            # Lapse two of the three grants behind the sweeper's back.
+            await session.execute(
+                text(
+                    "UPDATE file_reservations SET expires_ts = datetime('now', '-1 minute') "
+                    "WHERE path_pattern IN ('a/*.py', 'b/*.py')"
+                )
+            )
+            await session.commit()
+
+        archive = await ensure_archive(get_settings(), "sweep")
+        before = archive.repo.head.commit.hexsha
+        sweeper = app_module._file_reservation_sweeper
+        assert sweeper is not None
+        assert await sweeper.sweep([project_id]) == frozenset()
+
+        assert await _released() == {"a/*.py": True, "b/*.py": True, "c/*.py": False}
+        head = archive.repo.head.commit
+        assert head.parents[0].hexsha == before
+        assert len([p for p in head.stats.files if "/file_reservations/" in p]) == 2
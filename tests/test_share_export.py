@@ -244,6 +244,30 @@ def test_apply_project_scope_dedup_and_removes(tmp_path: Path) -> None:
         conn.close()
 
 
+@pytest.mark.asyncio
+async def test_apply_project_scope_on_server_database(isolated_env, seed_mailbox, tmp_path: Path) -> None:
+    from fastmcp import Client
+
+    from mcp_agent_mail.app import build_mcp_server
+    from mcp_agent_mail.db import get_database_path
+
+    async with Client(build_mcp_server()) as client:
+        await seed_mailbox(client, "/alpha", [{"subject": "kept"}])
+        await seed_mailbox(client, "/beta", [{"subject": "dropped"}])
+    snapshot = share.create_sqlite_snapshot(get_database_path(), tmp_path / "snapshot.sqlite3")
+
+    # Badge counters and archive refs reference projects/agents; scoping must clear them first.
+    result = share.apply_project_scope(snapshot, ["alpha"])
+
+    assert [project.slug for project in result.projects] == ["alpha"]
+    conn = sqlite3.connect(snapshot)
+    try:
+        assert [row[0] for row in conn.execute("SELECT subject FROM messages")] == ["kept"]
+        assert conn.execute("SELECT COUNT(DISTINCT project_id) FROM mailbox_counters").fetchone()[0] == 1
+    finally:
+        conn.close()
+
+
 def test_detect_hosting_hints_sort_order(monkeypatch, tmp_path: Path) -> None:
     monkeypatch.setattr(share, "_find_repo_root", lambda _start: None)
     monkeypatch.setenv("GITHUB_REPOSITORY", "owner/repo")
@@ -1413,3 +1437,44 @@ def test_build_materialized_views(tmp_path: Path) -> None:
         assert len(attach_indexes) >= 3, f"Expected at least 3 attachment indexes, got {len(attach_indexes)}"
     finally:
         conn.close()
+
+
+def test_snapshot_of_server_database_rebuilds_search_index(isolated_env, seed_mailbox, tmp_path: Path) -> None:
+    import asyncio
+
+    from fastmcp import Client
+
+    from mcp_agent_mail.app import build_mcp_server
+    from mcp_agent_mail.config import get_settings
+
+    async def _seed() -> None:
+        async with Client(build_mcp_server()) as client:
+            await seed_mailbox(
+                client,
+                "/share-fts",
+                [{"subject": "Launch plan", "body_md": "token sk-abcdefghijklmnopqrstuvwxyz123456 rotates"}],
+            )
+
+    asyncio.run(_seed())
+    source = share.resolve_sqlite_database_path(get_settings().database.url)
+
+    ctx = share.create_snapshot_context(
+        source_database=source,
+        snapshot_path=tmp_path / "export" / "mailbox.sqlite3",
+        project_filters=[],
+        scrub_preset="standard",
+    )
+    assert ctx.fts_enabled is True
+    conn = sqlite3.connect(ctx.snapshot_path)
+    try:
+        hits = conn.execute(
+            "SELECT subject, project_slug FROM fts_messages WHERE fts_messages MATCH 'launch'"
+        ).fetchall()
+        leftovers = conn.execute(
+            "SELECT name FROM sqlite_master WHERE name IN "
+            "('messages_fts_source', 'fts_messages_ai', 'fts_messages_ad', 'fts_messages_au')"
+        ).fetchall()
+    finally:
+        conn.close()
+    assert hits == [("Launch plan", "share-fts")]
+    assert leftovers == []
@@ -0,0 +1,83 @@
+"""Tests for segmented thread digests (messages/threads/<thread-id>/NNNN.md + index.json)."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from mcp_agent_mail.config import clear_settings_cache, get_settings
+from mcp_agent_mail.storage import (
+    collect_message_archive_refs,
+    ensure_archive,
+    get_archive_tree,
+    get_file_content,
+    read_thread_digest,
+    write_message_bundle,
+)
+
+
+def _message(idx: int) -> dict[str, object]:
+    return {
+        "id": idx,
+        "subject": f"update {idx}",
+        "thread_id": "T-1",
+        "project": "digest",
+        "created": f"2025-01-01T00:00:{idx:02d}+00:00",
+    }
+
+
+@pytest.mark.asyncio
+async def test_digest_rolls_over_and_only_touches_tail(isolated_env, monkeypatch):
+    monkeypatch.setenv("STORAGE_THREAD_DIGEST_SEGMENT_BYTES", "1024")
+    clear_settings_cache()
+    archive = await ensure_archive(get_settings(), "digest")
+
+    for idx in range(6):
+        await write_message_bundle(archive, _message(idx), "x" * 400, "BlueLake", ["RedStone"])
+
+    digest_dir = archive.root / "messages" / "threads" / "T-1"
+    index = json.loads((digest_dir / "index.json").read_text())
+    names = [segment["name"] for segment in index["segments"]]
+    assert len(names) > 1 and names[0] == "0001.md"
+    assert sum(segment["entries"] for segment in index["segments"]) == 6
+    assert all(segment["bytes"] == (digest_dir / segment["name"]).stat().st_size for segment in index["segments"])
+
+    # The last message rewrote only the tail segment and the index, not earlier segments.
+    touched = set(archive.repo.head.commit.stats.files)
+    assert f"projects/digest/messages/threads/T-1/{names[-1]}" in touched
+    assert f"projects/digest/messages/threads/T-1/{names[0]}" not in touched
+
+    digest = await read_thread_digest(archive, "T-1")
+    assert digest is not None and digest.startswith("# Thread T-1\n\n")
+    assert digest.count("# Thread T-1") == 1
+    positions = [digest.index(f"### update {idx}") for idx in range(6)]
+    assert positions == sorted(positions)
+
+    # Segment files are not mistaken for message files when rebuilding archive refs.
+    assert sorted(await collect_message_archive_refs(archive)) == list(range(6))
+
+    # The archive browser serves the stitched digest under the old single-file name.
+    assert await get_file_content(archive, "messages/threads/T-1.md") == digest
+    tree = await get_archive_tree(archive, "messages/threads")
+    assert {entry["name"]: entry["type"] for entry in tree} == {"T-1": "dir", "T-1.md": "file"}
+
+
+@pytest.mark.asyncio
+async def test_legacy_single_file_digest_is_kept_in_front(isolated_env):
+    archive = await ensure_archive(get_settings(), "digest")
+    legacy = archive.root / "messages" / "threads" / "T-1.md"
+    legacy.parent.mkdir(parents=True)
+    legacy.write_text("# Thread T-1\n\n### old entry\n\n---\n\n")
+    archive.repo.index.add([legacy.relative_to(archive.repo_root).as_posix()])
+    archive.repo.index.commit("digest: legacy single-file thread digest")
+
+    await write_message_bundle(archive, _message(1), "new body", "BlueLake", ["RedStone"])
+
+    assert legacy.read_text() == "# Thread T-1\n\n### old entry\n\n---\n\n"
+    digest = await read_thread_digest(archive, "T-1")
+    assert digest is not None
+    assert digest.startswith("# Thread T-1\n\n### old entry")
+    assert digest.count("# Thread T-1") == 1
+    assert "### update 1" in digest
+    assert await get_file_content(archive, "messages/threads/T-1.md") == digest